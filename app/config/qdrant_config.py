@@ -1,19 +1,69 @@
+from typing import Literal, Optional
 
-from typing import Optional
-
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Named presets for the index/storage settings below. Values set explicitly
+# (constructor or QDRANT_* env vars) take precedence over the profile.
+TUNING_PROFILES = {
+    # Qdrant defaults: HNSW m=16/ef_construct=100, float32 vectors and payloads in RAM
+    "default": {},
+    # Lower latency and ~4x less vector RAM; int8 scores are rescored with the originals
+    "fast": {
+        "hnsw_m": 16, "hnsw_ef_construct": 100, "hnsw_ef": 64,
+        "quantization": "int8", "quantization_always_ram": True,
+        "rescore": True, "oversampling": 2.0,
+    },
+    # Millions of SKUs: originals and payloads on disk, quantized vectors in RAM
+    "low_memory": {
+        "hnsw_m": 16, "hnsw_ef_construct": 100, "hnsw_ef": 64,
+        "quantization": "int8", "quantization_always_ram": True,
+        "rescore": True, "oversampling": 3.0,
+        "vectors_on_disk": True, "payload_on_disk": True,
+        "memmap_threshold": 20000,
+    },
+    # Denser graph and wider search for the best recall at higher latency
+    "high_recall": {
+        "hnsw_m": 32, "hnsw_ef_construct": 256, "hnsw_ef": 256,
+    },
+}
+
 
 class QdrantConfig(BaseSettings):
     """Qdrant configuration"""
 
-    url: str = "http://localhost:6333"  # Local Qdrant
+    url: str = "http://localhost:6333"  # Local Qdrant (":memory:" for in-process)
     api_key: Optional[str] = None  # For cloud
     collection_name: str = "ecommerce_knowledge"
     vector_size: int = 384  # all-MiniLM-L6-v2 dimension
+    prefer_grpc: bool = True  # async client only; sync client stays on REST
+    grpc_port: int = 6334
+    info_cache_ttl_seconds: float = 5.0  # collection_info() reuse window
+
+    # Index / storage tuning (see TUNING_PROFILES); None keeps the server default
+    profile: Literal["default", "fast", "low_memory", "high_recall"] = "default"
+    hnsw_m: Optional[int] = None  # graph edges per node
+    hnsw_ef_construct: Optional[int] = None  # build-time candidate list
+    hnsw_ef: Optional[int] = None  # search-time candidate list
+    quantization: Literal["none", "int8"] = "none"
+    quantization_always_ram: bool = True
+    rescore: bool = True  # re-rank quantized candidates with original vectors
+    oversampling: float = 2.0  # candidates fetched per result before rescoring
+    vectors_on_disk: bool = False
+    payload_on_disk: bool = False
+    indexing_threshold: Optional[int] = None  # KB of vectors before HNSW is built
+    memmap_threshold: Optional[int] = None  # KB per segment before it is memory-mapped
+    migrate_on_start: bool = False  # apply the settings above to the existing collection
 
     model_config = SettingsConfigDict(
         env_file=".env",
         env_prefix="QDRANT_",
         extra="ignore",  # ignore unrelated env vars like OPENAI_API_KEY
     )
+
+    @model_validator(mode="after")
+    def _apply_profile(self):
+        for key, value in TUNING_PROFILES[self.profile].items():
+            if key not in self.model_fields_set:
+                setattr(self, key, value)
+        return self
@@ -0,0 +1,19 @@
+from typing import Literal, Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class VectorStoreConfig(BaseSettings):
+    """Which vector index backs catalog search (see app.service.vector_store)"""
+
+    # qdrant: QdrantService (QDRANT_* settings); numpy: in-process brute-force index
+    backend: Literal["qdrant", "numpy"] = "qdrant"
+    # numpy backend: directory for .npy/.json persistence (None = process memory only)
+    path: Optional[str] = None
+    mmap: bool = True  # load persisted vectors with mmap_mode="r" (shared page cache)
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_prefix="VECTOR_STORE_",
+        extra="ignore",
+    )
@@ -0,0 +1,283 @@
+"""
+Shared outbound HTTP clients
+
+One keep-alive connection pool per provider ("llm" for the OpenRouter /
+OpenAI-compatible chat endpoint, "openai" for Whisper / TTS), shared by
+every service in the process: connections (and the DNS lookup and TLS
+handshake behind them) are paid once instead of per client or per job.
+Timeouts, pool limits, HTTP/2 and retries come from HTTP_* env vars.
+
+Every request is traced through httpcore's trace extension:
+
+- voicebot_http_requests_total{provider, connection="new"|"reused"}
+- voicebot_http_connect_seconds{provider, phase="tcp"|"tls"}
+- voicebot_http_pool_connections{provider, state="active"|"idle"}
+
+Once the pools are warm, "reused" should account for nearly every request
+and the tls histogram count should stop growing.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from app.core.settings import settings
+from app.core.telemetry import registry
+
+logger = logging.getLogger(__name__)
+
+HTTP_REQUESTS = registry.counter(
+    "voicebot_http_requests_total",
+    "Outbound provider requests by provider and whether they opened a new connection",
+    ("provider", "connection"),
+)
+HTTP_CONNECT_SECONDS = registry.histogram(
+    "voicebot_http_connect_seconds",
+    "Time spent opening outbound connections (TCP connect, TLS handshake)",
+    ("provider", "phase"),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+HTTP_POOL_CONNECTIONS = registry.gauge(
+    "voicebot_http_pool_connections",
+    "Open connections per provider pool (sampled on every response)",
+    ("provider", "state"),
+)
+
+# httpcore trace events -> connect phase label
+_PHASES = {"connection.connect_tcp": "tcp", "connection.start_tls": "tls"}
+
+
+class HTTPClientConfig(BaseSettings):
+    """Outbound HTTP pool / timeout / retry policy shared by all providers"""
+
+    http2: bool = True  # multiplex concurrent turns over one TLS connection (https only)
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry_seconds: float = 120.0  # idle time before a pooled connection is dropped
+    connect_timeout_seconds: float = 5.0
+    read_timeout_seconds: float = 30.0
+    write_timeout_seconds: float = 30.0
+    pool_timeout_seconds: float = 5.0  # wait for a free connection when the pool is full
+    connect_retries: int = 1  # transport-level retries of failed connects
+    max_retries: int = 2  # SDK retries (429 / 5xx / timeouts) with exponential backoff
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_prefix="HTTP_",
+        extra="ignore",
+    )
+
+
+class _ConnectionTrace:
+    """Per-request httpcore trace: notes connect phases and whether one happened"""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.connected = False
+        self._started: Dict[str, float] = {}
+
+    def record(self, event: str, info: Dict[str, Any]):
+        name, _, stage = event.rpartition(".")
+        phase = _PHASES.get(name)
+        if phase is None:
+            return
+        if stage == "started":
+            self._started[phase] = time.perf_counter()
+        elif stage == "complete" and phase in self._started:
+            self.connected = True
+            HTTP_CONNECT_SECONDS.observe(time.perf_counter() - self._started.pop(phase),
+                                         provider=self.provider, phase=phase)
+
+    async def record_async(self, event: str, info: Dict[str, Any]):
+        self.record(event, info)
+
+
+def _trace_request(request: httpx.Request, provider: str, is_async: bool):
+    trace = _ConnectionTrace(provider)
+    request.extensions["trace"] = trace.record_async if is_async else trace.record
+    request.extensions["connection_trace"] = trace
+
+
+def _observe_response(client: Any, provider: str, response: httpx.Response):
+    trace = response.request.extensions.get("connection_trace")
+    HTTP_REQUESTS.inc(provider=provider,
+                      connection="new" if trace is not None and trace.connected else "reused")
+    pool = getattr(client._transport, "_pool", None)
+    if pool is not None:
+        connections = pool.connections
+        idle = sum(1 for c in connections if c.is_idle())
+        HTTP_POOL_CONNECTIONS.set(len(connections) - idle, provider=provider, state="active")
+        HTTP_POOL_CONNECTIONS.set(idle, provider=provider, state="idle")
+
+
+class HTTPClients:
+    """
+    Process-wide httpx clients, one async and one sync pool per provider
+
+    Clients are created on first use and live until aclose()/close() (app
+    shutdown). Pass them to SDK clients via openai_client() /
+    async_openai_client() or their http_client arguments; never close
+    them from a consumer.
+    """
+
+    def __init__(self, config: Optional[HTTPClientConfig] = None):
+        self.config = config or HTTPClientConfig()
+        self._async: Dict[str, httpx.AsyncClient] = {}
+        self._sync: Dict[str, httpx.Client] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        c = self.config
+        return httpx.Timeout(connect=c.connect_timeout_seconds, read=c.read_timeout_seconds,
+                             write=c.write_timeout_seconds, pool=c.pool_timeout_seconds)
+
+    @property
+    def limits(self) -> httpx.Limits:
+        c = self.config
+        return httpx.Limits(max_connections=c.max_connections,
+                            max_keepalive_connections=c.max_keepalive_connections,
+                            keepalive_expiry=c.keepalive_expiry_seconds)
+
+    def _http2(self) -> bool:
+        if not self.config.http2:
+            return False
+        try:
+            import h2  # noqa: F401  (httpx[http2]; installed with qdrant-client)
+        except ImportError:
+            logger.warning("⚠️  HTTP/2 requested but the h2 package is missing; using HTTP/1.1")
+            self.config.http2 = False
+        return self.config.http2
+
+    def async_client(self, provider: str) -> httpx.AsyncClient:
+        """
+        Shared async client for a provider
+
+        Args:
+            provider: Pool name ("llm", "openai", ...)
+
+        Returns:
+            httpx.AsyncClient (created on first call)
+        """
+        client = self._async.get(provider)
+        if client is not None:
+            return client
+        with self._lock:
+            if provider not in self._async:
+                async def on_request(request: httpx.Request):
+                    _trace_request(request, provider, is_async=True)
+
+                async def on_response(response: httpx.Response):
+                    _observe_response(client, provider, response)
+
+                client = self._async[provider] = httpx.AsyncClient(
+                    timeout=self.timeout,
+                    transport=httpx.AsyncHTTPTransport(
+                        http2=self._http2(), limits=self.limits, retries=self.config.connect_retries),
+                    follow_redirects=True,
+                    event_hooks={"request": [on_request], "response": [on_response]},
+                )
+            return self._async[provider]
+
+    def sync_client(self, provider: str) -> httpx.Client:
+        """
+        Shared blocking client for a provider (thread-safe)
+
+        Args:
+            provider: Pool name ("llm", "openai", ...)
+
+        Returns:
+            httpx.Client (created on first call)
+        """
+        client = self._sync.get(provider)
+        if client is not None:
+            return client
+        with self._lock:
+            if provider not in self._sync:
+                def on_request(request: httpx.Request):
+                    _trace_request(request, provider, is_async=False)
+
+                def on_response(response: httpx.Response):
+                    _observe_response(client, provider, response)
+
+                client = self._sync[provider] = httpx.Client(
+                    timeout=self.timeout,
+                    transport=httpx.HTTPTransport(
+                        http2=self._http2(), limits=self.limits, retries=self.config.connect_retries),
+                    follow_redirects=True,
+                    event_hooks={"request": [on_request], "response": [on_response]},
+                )
+            return self._sync[provider]
+
+    async def aclose(self):
+        """Close every pool (app shutdown)"""
+        clients, self._async = list(self._async.values()), {}
+        for client in clients:
+            await client.aclose()
+        self.close()
+
+    def close(self):
+        """Close the blocking pools"""
+        clients, self._sync = list(self._sync.values()), {}
+        for client in clients:
+            client.close()
+
+
+http_clients = HTTPClients()
+
+
+def provider_credentials(provider: str, api_key: Optional[str] = None) -> Dict[str, Optional[str]]:
+    """api_key / base_url for a provider ("llm": OpenRouter settings, else OpenAI env vars)"""
+    if provider == "llm":
+        return {"api_key": api_key or settings.OPENROUTER_API_KEY, "base_url": settings.LLM_BASE_URL}
+    # base_url None -> the SDK default / OPENAI_BASE_URL
+    return {"api_key": api_key or settings.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY"),
+            "base_url": os.getenv("OPENAI_BASE_URL")}
+
+
+def async_openai_client(provider: str = "openai", api_key: Optional[str] = None) -> AsyncOpenAI:
+    """
+    AsyncOpenAI client on the provider's shared pool
+
+    Args:
+        provider: "openai" (OPENAI_API_KEY) or "llm" (OPENROUTER_API_KEY, LLM_BASE_URL)
+        api_key: Overrides the provider's key
+
+    Returns:
+        AsyncOpenAI with the shared timeout / retry policy
+    """
+    return AsyncOpenAI(**provider_credentials(provider, api_key),
+                       http_client=http_clients.async_client(provider),
+                       timeout=http_clients.timeout,
+                       max_retries=http_clients.config.max_retries)
+
+
+def openai_client(provider: str = "openai", api_key: Optional[str] = None) -> OpenAI:
+    """Blocking OpenAI client on the provider's shared pool (see async_openai_client)"""
+    return OpenAI(**provider_credentials(provider, api_key),
+                  http_client=http_clients.sync_client(provider),
+                  timeout=http_clients.timeout,
+                  max_retries=http_clients.config.max_retries)
+
+
+async def warm_connections(provider: str = "llm"):
+    """
+    Open (and TLS-handshake) a pooled connection before the first turn
+
+    Sends a token-free GET /models; failures are only logged.
+
+    Args:
+        provider: Pool to warm
+    """
+    start = time.perf_counter()
+    try:
+        await async_openai_client(provider).with_options(max_retries=0).models.list()
+        logger.info(f"🔌 {provider} connection warmed in {time.perf_counter() - start:.3f}s")
+    except Exception as e:
+        logger.warning(f"⚠️  Could not warm {provider} connection: {e}")
@@ -0,0 +1,135 @@
+"""
+Pre-fork multi-worker launcher
+
+The parent imports the app, runs its preload hook (embedding model
+weights), freezes the GC and then forks N uvicorn workers that accept
+on one shared listening socket. Model weights are shared copy-on-write
+instead of being loaded once per worker. The hook must not run thread
+pools (e.g. torch inference) in the parent: a forked child can inherit
+their locks mid-use and hang.
+"""
+
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Callable, Dict, Tuple
+
+import uvicorn
+
+# A worker that dies sooner than this after starting counts as crash-looping
+MIN_UPTIME_SECONDS = 10.0
+# Consecutive quick crashes before a worker slot is given up on
+MAX_QUICK_CRASHES = 5
+RESTART_BACKOFF_SECONDS = 0.5
+MAX_RESTART_BACKOFF_SECONDS = 30.0
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _limit_torch_threads(workers: int):
+    # N workers x all-core intra-op pools oversubscribe the CPU; split the cores instead
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+
+
+def _run_worker(app_path: str, sock: socket.socket, workers: int, log_level: str):
+    _limit_torch_threads(workers)
+    config = uvicorn.Config(app_path, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(app_path: str, preload: Callable[[], None], workers: int,
+          host: str = "0.0.0.0", port: int = 8000, log_level: str = "info"):
+    """
+    Run app_path ("module:attr") in `workers` forked processes
+
+    Args:
+        app_path: ASGI app import string, imported once in the parent
+        preload: Called in the parent before forking (load models; no inference)
+        workers: Number of worker processes
+        host: Bind address
+        port: Bind port
+        log_level: uvicorn log level
+    """
+    start = time.perf_counter()
+    preload()
+    # Objects allocated so far never get touched by the cyclic GC again,
+    # so their pages stay shared with the children instead of being copied
+    gc.freeze()
+
+    sock = _bind(host, port)
+    children: Dict[int, Tuple[int, float]] = {}  # pid -> (worker index, start time)
+    quick_crashes: Dict[int, int] = {}  # worker index -> consecutive quick crashes
+    stopping = False
+
+    def spawn(index: int):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            code = 1
+            try:
+                _run_worker(app_path, sock, workers, log_level)
+                code = 0
+            finally:
+                os._exit(code)
+        children[pid] = (index, time.monotonic())
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for i in range(workers):
+        spawn(i)
+    print(f"🚀 {workers} workers listening on {host}:{port} "
+          f"(preload {time.perf_counter() - start:.1f}s, pid {os.getpid()})")
+
+    # Supervise: restart workers that die unexpectedly, backing off
+    # exponentially while one keeps crashing right after start
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        child = children.pop(pid, None)
+        if child is None or stopping:
+            continue
+        index, started = child
+        if time.monotonic() - started >= MIN_UPTIME_SECONDS:
+            quick_crashes[index] = 0
+        else:
+            quick_crashes[index] = quick_crashes.get(index, 0) + 1
+        crashes = quick_crashes[index]
+        if crashes > MAX_QUICK_CRASHES:
+            print(f"❌ Worker {index} crashed {crashes} times in a row within "
+                  f"{MIN_UPTIME_SECONDS:.0f}s of starting; not restarting it")
+            continue
+        delay = min(RESTART_BACKOFF_SECONDS * 2 ** (crashes - 1), MAX_RESTART_BACKOFF_SECONDS) if crashes else 0.0
+        print(f"⚠️  Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}; "
+              f"restarting in {delay:.1f}s")
+        time.sleep(delay)
+        if not stopping:
+            spawn(index)
+
+    sock.close()
@@ -4,16 +4,34 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     APP_PORT: str = "8080"
 
+    # Accept connections before services finish loading; endpoints answer
+    # 503 until ready (poll /ready)
+    FAST_BOOT: bool = False
+
     # OpenAI / OpenRouter
     OPENAI_API_KEY: str | None = None
     OPENROUTER_API_KEY: str | None = None
+    LLM_BASE_URL: str = "https://openrouter.ai/api/v1"
     LLM_MODEL: str = "openai/gpt-4o-mini"
     LLM_TEMPERATURE: float = 0.7
     LLM_MAX_TOKENS: int = 256
+    # "rag": retrieve products/policies/orders up front, one LLM call per turn;
+    # "tools": the LLM calls the MCP tool server (MCP_* settings) as needed
+    CHAT_MODE: str = "rag"
 
     # Qdrant
     QDRANT_URL: str = "http://localhost:6333"
 
+    # Sessions ("memory", "sqlite" or "redis" - use a shared backend with several workers)
+    SESSION_BACKEND: str = "memory"
+    SESSION_SQLITE_PATH: str = "./sessions.db"
+    SESSION_TTL_SECONDS: int = 86400
+    REDIS_URL: str = "redis://localhost:6379"
+
+    # Tracing ("none", "json" or "otlp")
+    TRACE_EXPORTER: str = "none"
+    TRACE_JSON_PATH: str = "./traces.jsonl"
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
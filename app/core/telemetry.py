@@ -0,0 +1,328 @@
+"""
+Lightweight tracing and metrics
+
+OpenTelemetry-style spans around each pipeline stage (STT, retrieval,
+LLM, TTS). Every finished span is recorded into a per-stage latency
+histogram exposed in Prometheus text format at /metrics, and can be
+exported as JSON lines or forwarded to an OTLP collector.
+"""
+
+import json
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.settings import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape_label_value(value: str) -> str:
+    # Prometheus text format: one unescaped quote or newline corrupts the whole exposition
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# ============================================================================
+# METRICS
+# ============================================================================
+
+class _Metric(ABC):
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(label, "")) for label in self.label_names)
+
+    def _format_labels(self, key: Tuple[str, ...], extra: str = "") -> str:
+        parts = [f'{label}="{_escape_label_value(value)}"' for label, value in zip(self.label_names, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    @abstractmethod
+    def render(self) -> List[str]:
+        """Sample lines in Prometheus text format"""
+
+
+class Counter(_Metric):
+    """Monotonic counter with labels"""
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        super().__init__(name, help_text, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{self._format_labels(key)} {value}"
+                    for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    """Point-in-time value with labels"""
+    type_name = "gauge"
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        super().__init__(name, help_text, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{self._format_labels(key)} {value}"
+                    for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with labels (Prometheus semantics)"""
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, series in self._values.items():
+                # Counts are whole numbers; :g would round them to 6 significant digits
+                for i, bound in enumerate(self.buckets):
+                    labels = self._format_labels(key, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {int(series[i])}")
+                labels = self._format_labels(key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {int(series[-1])}")
+                lines.append(f"{self.name}_sum{self._format_labels(key)} {series[-2]}")
+                lines.append(f"{self.name}_count{self._format_labels(key)} {int(series[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide collection of metrics rendered at /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            # Re-registering returns the existing metric (safe on module reload)
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help_text, label_names))
+
+    def gauge(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, label_names))
+
+    def histogram(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, label_names, buckets))
+
+    def render_prometheus(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            help_text = metric.help_text.replace("\\", "\\\\").replace("\n", "\\n")
+            lines.append(f"# HELP {metric.name} {help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_LATENCY = registry.histogram(
+    "voicebot_stage_duration_seconds",
+    "Latency of each pipeline stage",
+    ("stage",),
+)
+STAGE_ERRORS = registry.counter(
+    "voicebot_stage_errors_total",
+    "Number of pipeline stages that raised",
+    ("stage",),
+)
+
+
+# ============================================================================
+# TRACING
+# ============================================================================
+
+class Span:
+    """A timed pipeline stage with attributes"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes",
+                 "start_time", "duration", "status", "_start")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str],
+                 attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_time = time.time()
+        self.duration = 0.0
+        self.status = "ok"
+        self._start = time.perf_counter()
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class _JsonLogExporter:
+    """Appends one JSON object per finished span"""
+
+    def __init__(self, path: str):
+        self._file = open(path, "a", buffering=1, encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+
+_exporter: Optional[_JsonLogExporter] = None
+_otel_tracer = None
+_configured = False
+
+
+def configure(exporter: Optional[str] = None, json_path: Optional[str] = None):
+    """
+    Select where finished spans are exported
+
+    Args:
+        exporter: "none", "json" or "otlp" (defaults to TRACE_EXPORTER)
+        json_path: JSON lines file for the "json" exporter
+    """
+    global _exporter, _otel_tracer, _configured
+
+    exporter = (exporter or settings.TRACE_EXPORTER).lower()
+    _configured = True
+
+    if exporter == "json":
+        _exporter = _JsonLogExporter(json_path or settings.TRACE_JSON_PATH)
+    elif exporter == "otlp":
+        try:
+            from opentelemetry import trace
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+            # Endpoint comes from OTEL_EXPORTER_OTLP_ENDPOINT (default localhost:4318)
+            provider = TracerProvider(resource=Resource.create({"service.name": "ecommerce-voicebot"}))
+            provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+            trace.set_tracer_provider(provider)
+            _otel_tracer = trace.get_tracer("app.core.telemetry")
+        except ImportError:
+            print("⚠️  TRACE_EXPORTER=otlp but opentelemetry-sdk is not installed; spans are metrics-only")
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """
+    Time a pipeline stage
+
+    Nested spans share the parent's trace ID. The duration is always
+    recorded into the per-stage latency histogram.
+
+    Args:
+        name: Stage name (e.g. "stt.transcribe", "qdrant.query_points")
+        **attributes: Initial span attributes
+
+    Yields:
+        Span whose attributes can be updated while the stage runs
+    """
+    if not _configured:
+        configure()
+
+    parent = _current_span.get()
+    current = Span(
+        name,
+        trace_id=parent.trace_id if parent else uuid.uuid4().hex,
+        parent_id=parent.span_id if parent else None,
+        attributes=attributes,
+    )
+    token = _current_span.set(current)
+    otel_cm = _otel_tracer.start_as_current_span(name) if _otel_tracer else None
+    otel_span = otel_cm.__enter__() if otel_cm else None
+
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.attributes["error"] = repr(e)
+        STAGE_ERRORS.inc(stage=name)
+        raise
+    finally:
+        current.duration = time.perf_counter() - current._start
+        _current_span.reset(token)
+        STAGE_LATENCY.observe(current.duration, stage=name)
+
+        if otel_span is not None:
+            for key, value in current.attributes.items():
+                if isinstance(value, (str, bool, int, float)):
+                    otel_span.set_attribute(key, value)
+            otel_cm.__exit__(None, None, None)
+
+        if _exporter is not None:
+            _exporter.export(current)
+
+
+def current_span() -> Optional[Span]:
+    """Return the active span, if any"""
+    return _current_span.get()
@@ -1,17 +1,17 @@
 from fastapi import Request
 
 from app.config.qdrant_config import QdrantConfig
-from app.service.qdrant_service import QdrantService
 from app.service.rag_service import RAGService
+from app.service.vector_store import VectorStore, create_vector_store
 
 
-def get_qdrant_service(request: Request) -> QdrantService:
+def get_qdrant_service(request: Request) -> VectorStore:
     """
-    Provide a singleton QdrantService instance attached to app state.
+    Provide a singleton vector store (QdrantService by default) attached to app state.
     """
     if not hasattr(request.app.state, "qdrant_service"):
         config = QdrantConfig()
-        request.app.state.qdrant_service = QdrantService(config=config)
+        request.app.state.qdrant_service = create_vector_store(config)
     return request.app.state.qdrant_service
 
 
@@ -1,6 +1,8 @@
 import asyncio
+from itertools import zip_longest
 import os
 import sys
+import time
 import logging
 from typing import Annotated
 from dotenv import load_dotenv
@@ -8,46 +10,57 @@ from dotenv import load_dotenv
 # Ensure the project root is in the python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from livekit.agents import JobContext, WorkerOptions, cli, voice, llm
+from livekit.agents import JobContext, JobProcess, StopResponse, WorkerOptions, cli, voice, llm
 from livekit.plugins import openai, silero
 
+from app.core.http_clients import async_openai_client, warm_connections
+from app.core.settings import settings
+from app.core.telemetry import span
+from app.service.intent_service import extract_intent, normalize_order_id, split_subqueries
+from app.service.qdrant_service import BatchQuery, source_filter
+from app.service.response_templates import candidate_intent, fast_path_reply, record_response
+from app.service.service_container import ServiceContainer
+
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("voice-agent")
 
-# Global variables for shared resources (lazy-loaded on first use)
-_embedding_model = None
-_qdrant_service = None
-_order_service = None
-_services_lock = asyncio.Lock()
+# Shared resources: loaded once per worker process by prewarm, lazily (with
+# retry/backoff) if that failed. Reads are lock-free once everything is loaded.
+services = ServiceContainer()
 
-async def get_services():
-    """Get or initialize services (lazy loading)"""
-    global _embedding_model, _qdrant_service, _order_service
-    
-    async with _services_lock:
-        if _embedding_model is None:
-            logger.info("⏳ Loading services (first time)...")
-            try:
-                # Import heavy modules only when needed
-                from sentence_transformers import SentenceTransformer
-                from app.config.qdrant_config import QdrantConfig
-                from app.service.qdrant_service import QdrantService
-                from app.service.orders_service import OrderService
-                
-                # Load in separate thread to avoid blocking
-                _embedding_model = await asyncio.to_thread(
-                    SentenceTransformer, "all-MiniLM-L6-v2"
-                )
-                _qdrant_service = QdrantService(QdrantConfig())
-                _order_service = OrderService(csv_path="./data/orders.csv")
-                logger.info("✅ Services loaded!")
-            except Exception as e:
-                logger.error(f"❌ Failed to load services: {e}")
-                return None, None, None
-    
-    return _embedding_model, _qdrant_service, _order_service
+# search_products only reads the summary rendered at ingestion; products in
+# indexes built before summaries existed get these keys in a second-stage fetch
+SUMMARY_FIELDS = ("summary", "source")
+LEGACY_SUMMARY_FIELDS = ("name", "price", "category", "text")
+
+# How often a turn checks for a catalog version published by the server's indexer
+TABLE_REFRESH_SECONDS = float(os.getenv("CATALOG_TABLE_REFRESH_SECONDS", 5))
+
+def prewarm(proc: JobProcess):
+    """
+    Load VAD, embedding model, Qdrant client and order store once per worker process.
+
+    LiveKit only hands jobs to processes whose prewarm finished, so raising
+    here keeps a process that failed to warm up from ever receiving a room.
+    """
+    start = time.perf_counter()
+    logger.info(f"⏳ Prewarming worker process {proc.pid}...")
+
+    proc.userdata["vad"] = silero.VAD.load()
+
+    loaded = services.load_sync()
+    if not loaded.complete:
+        raise RuntimeError(f"Worker prewarm failed: {services.health()}")
+    points = loaded.qdrant.count()
+    services.build_retrieval()
+
+    proc.userdata["ready"] = True
+    logger.info(
+        f"✅ Worker process {proc.pid} ready in {time.perf_counter() - start:.1f}s "
+        f"({points} catalog points, {len(loaded.orders.orders)} orders)"
+    )
 
 class ECommerceTools:
     """E-commerce function tools for the voice agent"""
@@ -59,17 +72,48 @@ class ECommerceTools:
     ):
         """Search the product catalog"""
         logger.info(f"🔍 Searching products for: {query}")
-        model, qdrant, _ = await get_services()
+        svc = await services.get()
+        model, qdrant = svc.embedding_model, svc.qdrant
         
         if not model or not qdrant:
             return "Product catalog is currently loading. Please try again in a moment."
         
         try:
-            # Encode query
-            query_vector = await asyncio.to_thread(model.encode, [query])
-            
-            # Search in Qdrant
-            results = qdrant.search(query_vector[0].tolist(), limit=10)
+            # "compare X and Y" -> one retrieval per item, sent as a single batch
+            subqueries = split_subqueries(query)
+            with span("agent.search_products", query_chars=len(query),
+                      subqueries=len(subqueries)) as s:
+                # Encode query
+                with span("embedding.encode", chars=len(query)):
+                    vectors = await asyncio.to_thread(model.encode, subqueries)
+                
+                # Search in Qdrant without blocking the event loop (audio for every room runs on it)
+                if len(subqueries) == 1:
+                    results = await qdrant.search_async(vectors[0].tolist(), limit=10,
+                                                        with_payload=SUMMARY_FIELDS)
+                else:
+                    batches = await qdrant.search_batch_async([
+                        BatchQuery(v.tolist(), limit=3, query_filter=source_filter("products"),
+                                   with_payload=SUMMARY_FIELDS)
+                        for v in vectors
+                    ])
+                    # Interleave so every compared item is represented in the top 5
+                    results, seen = [], set()
+                    for r in (r for group in zip_longest(*batches) for r in group if r):
+                        if r.id not in seen:
+                            seen.add(r.id)
+                            results.append(r)
+                s.set_attribute("results", len(results))
+                
+                legacy = [r.id for r in results
+                          if r.payload.get('source') == 'products' and not r.payload.get('summary')]
+                if legacy:
+                    fetched = await qdrant.retrieve_async(legacy, with_payload=LEGACY_SUMMARY_FIELDS)
+                    payloads = {p.id: p.payload for p in fetched}
+                    for r in results:
+                        if r.id in payloads:
+                            r.payload = payloads[r.id]
+                    s.set_attribute("legacy_fetched", len(fetched))
             
             if not results:
                 return "No products found matching your search."
@@ -77,10 +121,16 @@ class ECommerceTools:
             # Format results
             products = []
             for r in results:
+                # Summary is pre-rendered at ingestion; rebuild only for older indexes
+                summary = r.payload.get('summary')
+                if summary:
+                    products.append(summary)
+                    continue
+                
                 name = r.payload.get('name', '')
                 price = r.payload.get('price', '')
                 category = r.payload.get('category', '')
-                desc = r.payload.get('description', '')
+                desc = r.payload.get('text', '')
                 
                 if name and price:
                     products.append(f"• {name} - ${price} ({category}): {desc}")
@@ -88,7 +138,7 @@ class ECommerceTools:
             if not products:
                 return "No products found matching your search."
             
-            return "Here are the products I found:\n\n" + "\n".join(products[:5])
+            return "Here are the products I found:\n\n" + "\n".join(products[:max(5, 2 * len(subqueries))])
             
         except Exception as e:
             logger.error(f"Error searching products: {e}")
@@ -101,17 +151,18 @@ class ECommerceTools:
     ):
         """Track order status"""
         logger.info(f"📦 Tracking order: {order_id}")
-        _, _, orders = await get_services()
+        orders = (await services.get()).orders
         
         if not orders:
             return "Order tracking system is currently loading. Please try again in a moment."
         
         try:
-            # Ensure order ID has ORD prefix
-            if not order_id.upper().startswith("ORD"):
-                order_id = "ORD" + order_id
+            # Same canonical form as the web server ("ord-12345" -> "ORD12345")
+            order_id = normalize_order_id(order_id)
             
-            order = orders.track_order(order_id.upper())
+            with span("agent.track_order", order_id=order_id) as s:
+                order = orders.track_order(order_id)
+                s.set_attribute("found", order is not None)
             
             if not order:
                 return f"Order {order_id} not found. Please check the order ID and try again."
@@ -145,24 +196,61 @@ class ECommerceTools:
             logger.error(f"Error tracking order: {e}")
             return "Sorry, I encountered an error while tracking the order."
 
+class ECommerceAgent(voice.Agent):
+    """Voice agent that answers order status and stock questions from templates"""
+
+    async def on_user_turn_completed(self, turn_ctx: llm.ChatContext, new_message: llm.ChatMessage):
+        """
+        Speak a templated reply and skip the LLM when the turn is a
+        high-confidence order-status or stock question
+        """
+        started = time.perf_counter()
+        text = new_message.text_content or ""
+        if not candidate_intent(text, extract_intent(text)):
+            return
+
+        if not (await services.get()).complete:
+            return
+        try:
+            # Built once per process (prewarm), with the server's catalog tables
+            pipeline = services.retrieval or await asyncio.to_thread(services.build_retrieval)
+            # Pick up catalog versions the server's indexer published since
+            await asyncio.to_thread(pipeline.catalog.refresh_tables, TABLE_REFRESH_SECONDS)
+            ctx = await pipeline.retrieve(text)
+            reply = fast_path_reply(text, ctx)
+        except Exception as e:
+            logger.error(f"Template fast path failed, falling back to the LLM: {e}")
+            return
+        if reply is None:
+            return
+
+        logger.info(f"⚡ Template reply ({reply.intent}), skipping LLM")
+        self.session.say(reply.text)
+        record_response(reply.intent, "template", started)
+        raise StopResponse()
+
 async def entrypoint(ctx: JobContext):
     logger.info(f"🚀 Joining room: {ctx.room.name}")
     
+    # The first job in this process opens the provider connections while it
+    # joins the room; later jobs reuse them from the shared pools
+    warming = None
+    if not ctx.proc.userdata.get("connections_warmed"):
+        ctx.proc.userdata["connections_warmed"] = True
+        warming = asyncio.gather(warm_connections("llm"), warm_connections("openai"))
+    
     # Connect first - this is required!
     await ctx.connect()
     logger.info("✅ Connected to room!")
     
     # Create voice agent with e-commerce context and tools
     logger.info("⏳ Creating voice agent...")
-    agent = voice.Agent(
-        vad=silero.VAD.load(),
-        stt=openai.STT(),
-        llm=openai.LLM(
-            model=os.getenv("LLM_MODEL", "openai/gpt-4o-mini"),
-            base_url="https://openrouter.ai/api/v1",
-            api_key=os.getenv("OPENROUTER_API_KEY"),
-        ),
-        tts=openai.TTS(),
+    agent = ECommerceAgent(
+        vad=ctx.proc.userdata["vad"],
+        # Plugins share this process's pooled clients instead of opening their own per job
+        stt=openai.STT(client=async_openai_client()),
+        llm=openai.LLM(model=settings.LLM_MODEL, client=async_openai_client("llm")),
+        tts=openai.TTS(client=async_openai_client()),
         instructions="""You are a helpful e-commerce voice assistant. When a user first speaks, greet them warmly and explain you can help with products and orders.
 
 IMPORTANT INSTRUCTIONS:
@@ -183,6 +271,8 @@ Examples:
     
     logger.info("✅ Agent created! Starting session...")
     session = voice.AgentSession()
+    if warming is not None:
+        await warming
     
     # Start session - this blocks until room disconnects
     await session.start(agent, room=ctx.room, capture_run=False)
@@ -191,4 +281,12 @@ Examples:
 
 if __name__ == "__main__":
     logger.info("🎬 Starting E-Commerce Voice Agent...")
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
+    worker_options = {
+        "entrypoint_fnc": entrypoint,
+        "prewarm_fnc": prewarm,
+        # Loading the embedding model can take well over LiveKit's 10s default
+        "initialize_process_timeout": float(os.getenv("AGENT_INIT_TIMEOUT", "120")),
+    }
+    if os.getenv("AGENT_NUM_IDLE_PROCESSES"):
+        worker_options["num_idle_processes"] = int(os.getenv("AGENT_NUM_IDLE_PROCESSES"))
+    cli.run_app(WorkerOptions(**worker_options))
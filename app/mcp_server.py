@@ -1,108 +1,280 @@
-# app/mcp_server.py
-
-from mcp.server import Server
-from mcp.server.stdio import stdio_server
-from mcp.types import Tool, TextContent
-
-# Initialize MCP server
-app = Server("ecommerce-assistant")
-
-@app.list_tools()
-async def list_tools():
-    """
-    Declare available tools to the LLM
-    """
-    return [
-        Tool(
-            name="search_products",
-            description="Search the product catalog",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "Search query"
-                    },
-                    "max_price": {
-                        "type": "number",
-                        "description": "Maximum price filter"
-                    }
-                },
-                "required": ["query"]
-            }
-        ),
-        Tool(
-            name="track_order",
-            description="Track order status",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "order_id": {
-                        "type": "string",
-                        "description": "Order ID to track"
-                    }
-                },
-                "required": ["order_id"]
-            }
-        ),
-        Tool(
-            name="get_product_details",
-            description="Get detailed product information",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "product_id": {
-                        "type": "string",
-                        "description": "Product ID"
-                    }
-                },
-                "required": ["product_id"]
-            }
-        )
-    ]
-
-@app.call_tool()
-async def call_tool(name: str, arguments: dict):
-    """
-    Execute tool calls from the LLM
-    """
-    if name == "search_products":
-        results = await rag_service.search_products(
-            query=arguments["query"],
-            max_price=arguments.get("max_price")
-        )
-        return [TextContent(
-            type="text",
-            text=json.dumps(results, indent=2)
-        )]
-    
-    elif name == "track_order":
-        order = orders_service.track_order(arguments["order_id"])
-        return [TextContent(
-            type="text",
-            text=json.dumps(order, indent=2)
-        )]
-    
-    elif name == "get_product_details":
-        product = products_service.get_product(arguments["product_id"])
-        return [TextContent(
-            type="text",
-            text=json.dumps(product, indent=2)
-        )]
-    
-    raise ValueError(f"Unknown tool: {name}")
-
-async def main():
-    """
-    Start MCP server
-    """
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(
-            read_stream,
-            write_stream,
-            app.create_initialization_options()
-        )
-
-if __name__ == "__main__":
-    import asyncio
-    asyncio.run(main())
\ No newline at end of file
+# app/mcp_server.py
+"""
+MCP tool server (stdio) over the same catalog and order data as the web server
+
+Uses the ServiceContainer shared with the LiveKit agent: one embedding
+model, Qdrant client and order index per process, loaded once at startup
+(with retry/backoff) and read lock-free afterwards. Tool calls are async
+and the MCP runtime dispatches each request as its own task, so
+concurrent calls overlap instead of queueing behind each other.
+
+    python -m app.mcp_server
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import uuid
+from io import TextIOWrapper
+from typing import Any, Dict, List, Optional
+
+import anyio
+from jsonschema import Draft202012Validator
+from mcp.server import Server
+from mcp.server.stdio import stdio_server
+from mcp.types import Tool, TextContent
+
+# Ensure the project root is in the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.telemetry import span
+from app.service.intent_service import normalize_order_id
+from app.service.qdrant_service import point_id, source_filter
+from app.service.service_container import ServiceContainer
+
+logger = logging.getLogger("mcp-server")
+
+DEFAULT_RESULTS = 5
+MAX_RESULTS = 20
+
+# Product fields returned to the model; internal payload keys (hashes,
+# row positions, pre-rendered summaries) are left out
+PRODUCT_FIELDS = ("name", "price", "category", "brand", "stock")
+# Everything _product() reads; "source" guards get_product_details against policy rows
+PRODUCT_PAYLOAD = PRODUCT_FIELDS + ("text", "source")
+
+services = ServiceContainer()
+
+# Initialize MCP server
+app = Server("ecommerce-assistant")
+
+# Built once: list_tools is called by every client session
+TOOLS = [
+    Tool(
+        name="search_products",
+        description="Search the product catalog",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Search query"
+                },
+                "max_price": {
+                    "type": "number",
+                    "description": "Maximum price filter"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": f"Number of results (default {DEFAULT_RESULTS}, max {MAX_RESULTS})"
+                }
+            },
+            "required": ["query"]
+        }
+    ),
+    Tool(
+        name="track_order",
+        description="Track order status",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "order_id": {
+                    "type": "string",
+                    "description": "Order ID to track (e.g. 'ORD12345')"
+                }
+            },
+            "required": ["order_id"]
+        }
+    ),
+    Tool(
+        name="get_product_details",
+        description="Get detailed product information",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "product_id": {
+                    "type": "string",
+                    "description": "Product ID from search_products, or the exact product name"
+                }
+            },
+            "required": ["product_id"]
+        }
+    )
+]
+
+# Compiled once per tool: the runtime's built-in check (validate_input)
+# rebuilds a validator on every call, roughly doubling per-call overhead
+_VALIDATORS = {tool.name: Draft202012Validator(tool.inputSchema) for tool in TOOLS}
+
+
+def _dumps(data: Any) -> str:
+    # Compact separators: tool results are read by a model, not a person,
+    # and every byte is a token on the next LLM call
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _product(point_id_: str, payload: Dict[str, Any], score: Optional[float] = None) -> Dict[str, Any]:
+    product = {"id": point_id_}
+    product.update((k, payload[k]) for k in PRODUCT_FIELDS if k in payload)
+    product["description"] = payload.get("text", "")
+    if score is not None:
+        product["score"] = round(score, 3)
+    return product
+
+
+def _product_point_id(product_id: str) -> str:
+    """Search results carry point IDs; names map to the same deterministic ID"""
+    try:
+        return str(uuid.UUID(product_id))
+    except ValueError:
+        return point_id(f"products:{product_id.strip()}")
+
+
+async def search_products(query: str, max_price: Optional[float] = None,
+                          limit: int = DEFAULT_RESULTS) -> List[Dict[str, Any]]:
+    """
+    Semantic product search with the price limit applied inside Qdrant
+
+    Args:
+        query: What the user is looking for
+        max_price: Optional upper price bound
+        limit: Number of results
+
+    Returns:
+        Matching products, best first
+    """
+    from qdrant_client.models import FieldCondition, Range
+
+    svc = await services.get()
+    if svc.embedding_model is None or svc.qdrant is None:
+        raise RuntimeError("Product catalog is currently loading. Please try again in a moment.")
+
+    limit = max(1, min(int(limit), MAX_RESULTS))
+    query_filter = source_filter("products")
+    if max_price is not None:
+        # Filtered during the vector search, so `limit` results all satisfy it
+        query_filter.must.append(FieldCondition(key="price", range=Range(lte=float(max_price))))
+
+    with span("embedding.encode", chars=len(query)):
+        vector = (await asyncio.to_thread(svc.embedding_model.encode, query)).tolist()
+    points = await svc.qdrant.search_async(vector, limit=limit, query_filter=query_filter,
+                                           with_payload=PRODUCT_PAYLOAD)
+    return [_product(str(p.id), p.payload, p.score) for p in points]
+
+
+async def track_order(order_id: str) -> Dict[str, Any]:
+    """
+    Look up an order ("ORD12345", "ord-12345", "12345", ...)
+
+    Args:
+        order_id: Order ID as given by the user
+
+    Returns:
+        The order, or {"error": ...} when it doesn't exist
+    """
+    orders = (await services.get()).orders
+    if orders is None:
+        raise RuntimeError("Order tracking system is currently loading. Please try again in a moment.")
+
+    order_id = normalize_order_id(order_id)
+    order = orders.track_order(order_id)
+    return order if order else {"error": "order not found", "order_id": order_id}
+
+
+async def get_product_details(product_id: str) -> Dict[str, Any]:
+    """
+    Fetch one product by point ID or name (a key lookup, no vector search)
+
+    Args:
+        product_id: ID from search_products or the exact product name
+
+    Returns:
+        The product, or {"error": ...} when it doesn't exist
+    """
+    qdrant = (await services.get()).qdrant
+    if qdrant is None:
+        raise RuntimeError("Product catalog is currently loading. Please try again in a moment.")
+
+    points = await qdrant.retrieve_async([_product_point_id(product_id)], with_payload=PRODUCT_PAYLOAD)
+    if not points or points[0].payload.get("source") != "products":
+        return {"error": "product not found", "product_id": product_id}
+    return _product(str(points[0].id), points[0].payload)
+
+
+@app.list_tools()
+async def list_tools():
+    """
+    Declare available tools to the LLM
+    """
+    return TOOLS
+
+
+@app.call_tool(validate_input=False)
+async def call_tool(name: str, arguments: dict):
+    """
+    Execute tool calls from the LLM
+    """
+    validator = _VALIDATORS.get(name)
+    if validator is None:
+        raise ValueError(f"Unknown tool: {name}")
+    error = next(validator.iter_errors(arguments), None)
+    if error is not None:
+        raise ValueError(f"Input validation error: {error.message}")
+
+    with span("mcp.call_tool", tool=name):
+        if name == "search_products":
+            result = await search_products(
+                query=arguments["query"],
+                max_price=arguments.get("max_price"),
+                limit=arguments.get("limit", DEFAULT_RESULTS),
+            )
+        elif name == "track_order":
+            result = await track_order(arguments["order_id"])
+        else:
+            result = await get_product_details(arguments["product_id"])
+
+    return [TextContent(type="text", text=_dumps(result))]
+
+
+async def warm_up():
+    """Load shared services before the first tool call; index the catalog for in-process Qdrant"""
+    svc = await services.get()
+    if not svc.complete:
+        logger.warning(f"⚠️  Some services failed to load, retrying on demand: {services.health()}")
+        return
+
+    if not svc.qdrant.persistent:
+        from app.service.rag_service import RAGService, catalog_sources
+
+        # An in-process index starts empty, like each web worker's own copy
+        rag = RAGService(svc.qdrant, model=svc.embedding_model)
+        stats = await asyncio.to_thread(rag.sync_catalog, catalog_sources())
+        logger.info(f"✅ Indexed {sum(s.total for s in stats)} catalog rows in memory")
+
+
+async def main():
+    """
+    Start MCP server
+    """
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    # The MCP runtime logs every request at INFO; that's a stderr write per tool call
+    logging.getLogger("mcp").setLevel(logging.WARNING)
+
+    # stdout carries the JSON-RPC stream; services report progress with
+    # print(), so point sys.stdout at stderr and hand the real one to MCP
+    protocol_stdout = anyio.wrap_file(TextIOWrapper(sys.stdout.buffer, encoding="utf-8"))
+    sys.stdout = sys.stderr
+
+    await warm_up()
+
+    async with stdio_server(stdout=protocol_stdout) as (read_stream, write_stream):
+        await app.run(
+            read_stream,
+            write_stream,
+            app.create_initialization_options()
+        )
+
+if __name__ == "__main__":
+    asyncio.run(main())
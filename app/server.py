@@ -1,26 +1,28 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File
-from fastapi.responses import HTMLResponse, Response
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, HTTPException, Header
+from fastapi.responses import HTMLResponse, Response, PlainTextResponse, JSONResponse
 import asyncio
+import multiprocessing
 import os
 import base64
-import re
+import secrets
+import time
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
-from typing import Dict, List
-from qdrant_client.models import Filter, FieldCondition, Range
+from typing import TYPE_CHECKING, Dict, List
 
 load_dotenv()
 
-# Import services
+# Light imports only - sentence_transformers/torch, qdrant_client, langchain,
+# openai, pandas and livekit are imported inside the startup steps that use them
 from app.config.qdrant_config import QdrantConfig
-from app.service.qdrant_service import QdrantService
-from app.service.rag_service import RAGService
-from app.service.stt_service import STTService
-from app.service.tts_service import TTSService, TTSConfig
-from app.service.llm_service import LLMService
-from app.service.orders_service import OrderService
-from app.service.livekit_service import livekit_service
-from langchain_openai import ChatOpenAI
+from app.core.settings import settings
+from app.core.telemetry import span, registry
+from app.service.response_templates import fast_path_reply, intent_label, record_response
+from app.service.conversation_history import ConversationHistory
+from app.service.session_store import SessionStore, create_session_store
+
+if TYPE_CHECKING:
+    from app.service.rag_service import RAGService
+    from app.service.vector_store import VectorStore
 
 # ============================================================================
 # INITIALIZE FASTAPI
@@ -32,231 +34,266 @@ app = FastAPI(title="E-Commerce Voicebot")
 services = {}
 embedding_model = None
 
-# Conversation memory - stores chat history per session
-conversation_memory: Dict[str, List[Dict]] = {}
+# Conversation memory - stores chat history per session (shared across workers
+# when SESSION_BACKEND is sqlite/redis); created in startup, after any fork
+session_store: SessionStore | None = None
+# Recent turns verbatim plus a rolling summary of older ones, over session_store
+conversation_history: ConversationHistory | None = None
+
+# Set by preload() when the parent process already ingested the catalog
+_catalog_ingested = False
+
+# Startup steps and their state ("starting", "ok" or "failed: <error>"),
+# reported by /health and checked by the endpoints before they run
+STARTUP_STEPS = ("embedding_model", "qdrant", "catalog", "sessions",
+                 "stt", "audio", "tts", "llm", "orders")
+# CHAT_MODE=tools: the LLM calls the MCP tool server instead of up-front retrieval
+TOOL_MODE = settings.CHAT_MODE == "tools"
+if TOOL_MODE:
+    STARTUP_STEPS += ("tools",)
+readiness: Dict[str, str] = {name: "starting" for name in STARTUP_STEPS}
+startup_timings: Dict[str, float] = {}
+_warm_up_task: asyncio.Task | None = None
+
+# What each endpoint needs before it can answer
+QUERY_DEPS = ("embedding_model", "catalog", "llm", "orders", "sessions") + (("tools",) if TOOL_MODE else ())
+VOICE_DEPS = QUERY_DEPS + ("audio", "stt", "tts")
 
 # ============================================================================
 # STARTUP
 # ============================================================================
 
+def _load_embedding_model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer("all-MiniLM-L6-v2")
+
+def _ingest_catalog(rag: "RAGService"):
+    from app.service.rag_service import catalog_sources
+    all_stats = rag.sync_catalog(catalog_sources())
+    for stats in all_stats:
+        print(f"✅ Loaded {stats.total} {stats.source} "
+              f"({stats.embedded} embedded, {stats.unchanged} unchanged, {stats.deleted} removed)")
+
+def _ingest_shared_catalog():
+    """Ingest the catalog into the shared index (runs in preload()'s subprocess)"""
+    from app.service.rag_service import RAGService
+    from app.service.vector_store import create_vector_store
+    store = create_vector_store(QdrantConfig())
+    try:
+        _ingest_catalog(RAGService(store, model=_load_embedding_model()))
+    finally:
+        store.close()
+
+def preload():
+    """
+    Load the embedding model and ingest the catalog once, before workers fork.
+
+    Workers inherit the model copy-on-write, so N workers share one copy
+    of the weights; startup() then only creates per-process clients.
+    The parent never runs inference: encoding starts torch's OpenMP pool,
+    and forking a process that has used it can hang the workers, so a
+    shared index is ingested by a short-lived spawned process instead.
+    """
+    global embedding_model, _catalog_ingested
+    from app.service.vector_store import create_vector_store
+    
+    store = create_vector_store(QdrantConfig())
+    shared = store.persistent
+    store.close()
+    ingest = None
+    if shared:
+        # Built once for every worker, while the parent loads its weights
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        ingest = multiprocessing.get_context(method).Process(
+            target=_ingest_shared_catalog, name="catalog-ingest")
+        ingest.start()
+    # Otherwise the index lives in each worker, which ingests its own copy in startup()
+    
+    print("\n📦 Preloading embedding model...")
+    embedding_model = _load_embedding_model()
+    
+    if ingest is not None:
+        ingest.join()
+        if ingest.exitcode != 0:
+            raise RuntimeError(f"Catalog ingestion failed (exit code {ingest.exitcode})")
+        _catalog_ingested = True
+
+# --- individual startup steps (blocking; run in worker threads) -------------
+
+def _create_qdrant():
+    from app.service.vector_store import create_vector_store
+    qdrant = create_vector_store(QdrantConfig())
+    if qdrant.config.migrate_on_start:
+        qdrant.apply_tuning()
+    return qdrant
+
+def _create_rag(qdrant: "VectorStore", model):
+    from app.service.rag_service import RAGService
+    rag = RAGService(qdrant, model=model)
+    if not _catalog_ingested:
+        _ingest_catalog(rag)
+    else:
+        from app.service.rag_service import catalog_sources
+        rag.load_tables(catalog_sources())
+    return rag
+
+def _create_stt():
+    from app.service.stt_service import STTService
+    return STTService()
+
+def _create_audio():
+    from app.service.audio_service import AudioService
+    return AudioService()
+
+def _create_tts():
+    from app.service.tts_service import TTSService, TTSConfig
+    return TTSService(TTSConfig(openai_api_key=os.getenv("OPENAI_API_KEY")))
+
+def _create_llm():
+    from app.service.llm_service import LLMService, create_llm_client
+    return LLMService(client=create_llm_client())
+
+def _create_orders():
+    from app.service.orders_service import OrderService
+    return OrderService(csv_path="./data/orders.csv")
+
+async def _create_tools():
+    from app.service.llm_service_mcp import MCPEnabledLLMService
+    tools = MCPEnabledLLMService()
+    await tools.start()
+    return tools
+
+async def _run_step(name: str, fn, *args):
+    """Run an init step (blocking ones in a thread), recording readiness and duration"""
+    start = time.perf_counter()
+    try:
+        if asyncio.iscoroutinefunction(fn):
+            result = await fn(*args)
+        else:
+            result = await asyncio.to_thread(fn, *args)
+    except Exception as e:
+        readiness[name] = f"failed: {e}"
+        print(f"❌ {name} failed to start: {e}")
+        raise
+    startup_timings[name] = round(time.perf_counter() - start, 3)
+    readiness[name] = "ok"
+    return result
+
+async def _warm_catalog():
+    global embedding_model
+    model = embedding_model
+    model, services["qdrant"] = await asyncio.gather(
+        _run_step("embedding_model", (lambda: model) if model is not None else _load_embedding_model),
+        _run_step("qdrant", _create_qdrant),
+    )
+    embedding_model = model
+    services["rag"] = await _run_step("catalog", _create_rag, services["qdrant"], model)
+    
+    from app.service.catalog_indexer import CatalogIndexer
+    from app.service.rag_service import catalog_sources
+    indexer = CatalogIndexer(services["rag"], catalog_sources())
+    # Shared index: one worker builds and watches (file lock), every worker
+    # reloads its tables when a new version is published
+    if indexer.config.watch:
+        indexer.start_watching()
+    indexer.start_following()
+    services["indexer"] = indexer
+
+async def _summarize(system_prompt: str, text: str) -> str:
+    return await services["llm"].ainvoke(text, system_prompt=system_prompt, mode="summary")
+
+async def _warm_sessions():
+    global session_store, conversation_history
+    session_store = await _run_step("sessions", create_session_store)
+    conversation_history = ConversationHistory(session_store, _summarize)
+
+async def _warm_service(name: str, factory):
+    services[name] = await _run_step(name, factory)
+
+async def warm_up() -> List[str]:
+    """
+    Initialize all services, running independent steps concurrently
+
+    The embedding model and the Qdrant client load side by side, then the
+    catalog is ingested; STT/TTS/LLM clients, audio pool, orders and the
+    session store are created meanwhile, and the provider connections are
+    opened so the first turn doesn't pay for DNS and TLS.
+
+    Returns:
+        Names of the steps that failed
+    """
+    start = time.perf_counter()
+    steps = [
+        _warm_catalog(),
+        _warm_sessions(),
+        _warm_service("stt", _create_stt),
+        _warm_service("audio", _create_audio),
+        _warm_service("tts", _create_tts),
+        _warm_service("llm", _create_llm),
+        _warm_service("orders", _create_orders),
+    ]
+    if TOOL_MODE:
+        steps.append(_warm_service("tools", _create_tools))
+    # Open the provider connections (DNS + TLS) now rather than on the first turn
+    from app.core.http_clients import warm_connections
+    steps.extend(warm_connections(provider) for provider in ("llm", "openai"))
+    await asyncio.gather(*steps, return_exceptions=True)
+    startup_timings["total"] = round(time.perf_counter() - start, 3)
+    failed = [name for name, state in readiness.items() if state != "ok"]
+    if failed:
+        print(f"⚠️  Services not ready after {startup_timings['total']}s: {', '.join(failed)}")
+    else:
+        print(f"✅ All services ready in {startup_timings['total']}s!\n")
+    return failed
+
+def _require(*names: str):
+    """Answer 503 (with Retry-After) until the given startup steps are ready"""
+    pending = [name for name in names if readiness.get(name) != "ok"]
+    if pending:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Service warming up: {', '.join(pending)}",
+            headers={"Retry-After": "1"},
+        )
+
 @app.on_event("startup")
 async def startup():
-    global services, embedding_model
+    global _warm_up_task
     
     print("\n🚀 Initializing services...")
     
-    config = QdrantConfig()
-    qdrant = QdrantService(config)
-    rag = RAGService(qdrant)
-    
-    # Clear existing data to avoid duplicates on restart
-    print("🧹 Clearing vector database...")
-    qdrant.clear_collection()
-    
-    if os.path.exists("./data/products.csv"):
-        count = rag.ingest_csv("./data/products.csv", "description", 
-                               ["name", "price", "category", "stock", "brand"])
-        print(f"✅ Loaded {count} products")
-    
-    if os.path.exists("./data/policies.csv"):
-        count = rag.ingest_csv("./data/policies.csv", "answer", 
-                               ["category", "question"])
-        print(f"✅ Loaded {count} policies")
-    
-    stt = STTService()
-    tts = TTSService(TTSConfig(openai_api_key=os.getenv("OPENAI_API_KEY")))
-    
-    llm_client = ChatOpenAI(
-        model=os.getenv("LLM_MODEL", "openai/gpt-4o-mini"),
-        openai_api_key=os.getenv("OPENROUTER_API_KEY"),
-        openai_api_base="https://openrouter.ai/api/v1",
-        temperature=0.7,
-        max_tokens=200  # Increased for longer responses
-    )
-    llm = LLMService(client=llm_client)
-    
-    order_service = OrderService(csv_path="./data/orders.csv")
-    
-    embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
-    
-    services = {
-        "qdrant": qdrant,
-        "rag": rag,
-        "stt": stt,
-        "tts": tts,
-        "llm": llm,
-        "orders": order_service
-    }
-    
-    print("✅ All services ready!\n")
+    if settings.FAST_BOOT:
+        # Accept connections immediately; endpoints return 503 until their
+        # dependencies are ready (see /ready)
+        _warm_up_task = asyncio.create_task(warm_up())
+        return
+    
+    failed = await warm_up()
+    if failed:
+        raise RuntimeError(f"Startup failed: {', '.join(failed)}")
+
+@app.on_event("shutdown")
+async def shutdown():
+    if _warm_up_task is not None and not _warm_up_task.done():
+        _warm_up_task.cancel()
+    if services.get("indexer"):
+        services["indexer"].stop()
+    if services.get("audio"):
+        services["audio"].close()
+    if conversation_history is not None:
+        await conversation_history.aclose()
+    if services.get("tools"):
+        await services["tools"].aclose()
+    from app.core.http_clients import http_clients
+    await http_clients.aclose()
 
 # ============================================================================
 # IMPROVED QUERY PROCESSOR WITH CONVERSATION MEMORY
 # ============================================================================
 
-async def process_query(user_text: str, session_id: str = "default") -> str:
-    """Process text query with RAG + LLM + Conversation Memory"""
-    
-    # Initialize conversation history for new sessions
-    if session_id not in conversation_memory:
-        conversation_memory[session_id] = []
-    
-    # Get conversation history (last 6 messages = 3 turns)
-    history = conversation_memory[session_id][-6:]
-    
-    # Check for order tracking queries
-    order_info = None
-    lowered = user_text.lower()
-    order_keywords = ["track", "order", "status", "where is", "my order", "order number"]
-    
-    # Try to extract order ID (e.g., ORD12345, ord-12345, etc.)
-    # Pattern 1: ORD followed by numbers (e.g., ORD12345, ord-12345)
-    order_id_match = re.search(r'\b(?:ORD|order)[\s\-_]?(\d{5,})\b', user_text, re.IGNORECASE)
-    if not order_id_match:
-        # Pattern 2: Just numbers that might be order IDs (if order keywords are present)
-        if any(keyword in lowered for keyword in order_keywords):
-            order_id_match = re.search(r'\b(\d{5,})\b', user_text)
-    
-    if order_id_match:
-        matched_text = order_id_match.group(0).upper()
-        if matched_text.startswith("ORD") or matched_text.startswith("ORDER"):
-            order_id = matched_text.replace(" ", "").replace("-", "").replace("_", "")
-            # Clean up common prefixes
-            if order_id.startswith("ORDER"):
-                order_id = order_id[5:]
-            if not order_id.startswith("ORD"):
-                order_id = "ORD" + order_id
-        else:
-            # Just numbers, prepend ORD - use group(1) if available (from pattern 1), else group(0)
-            if order_id_match.lastindex and order_id_match.lastindex >= 1:
-                order_id = "ORD" + order_id_match.group(1)
-            else:
-                order_id = "ORD" + order_id_match.group(0)
-        
-        order_service = services.get("orders")
-        if order_service:
-            order_info = order_service.track_order(order_id)
-    
-    # IMPROVED RAG: encode query and apply structured price filters if mentioned
-    query_vector = embedding_model.encode([user_text])[0]
-
-    price_filter: Filter | None = None
-    min_price: float | None = None
-    max_price: float | None = None
-
-    # Support phrases like "between 20 and 50", "between $20-$50"
-    between_match = re.search(
-        r"between\s*\$?\s*(\d+(?:\.\d+)?)\s*(?:and|-|to)\s*\$?\s*(\d+(?:\.\d+)?)",
-        lowered,
-    )
-    # Support "under/below/less than/up to 50"
-    under_match = re.search(
-        r"(?:under|below|less than|up to)\s*\$?\s*(\d+(?:\.\d+)?)",
-        lowered,
-    )
-    # Support "over/above/more than/greater than 50"
-    over_match = re.search(
-        r"(?:over|above|more than|greater than)\s*\$?\s*(\d+(?:\.\d+)?)",
-        lowered,
-    )
-
-    if between_match:
-        min_price = float(between_match.group(1))
-        max_price = float(between_match.group(2))
-    elif under_match:
-        max_price = float(under_match.group(1))
-    elif over_match:
-        min_price = float(over_match.group(1))
-
-    if min_price is not None or max_price is not None:
-        range_kwargs: dict = {}
-        if min_price is not None:
-            range_kwargs["gte"] = min_price
-        if max_price is not None:
-            range_kwargs["lte"] = max_price
-
-        price_filter = Filter(
-            must=[
-                FieldCondition(
-                    key="price",
-                    range=Range(**range_kwargs),
-                )
-            ]
-        )
-
-    query_kwargs = {
-        "collection_name": services["qdrant"].collection_name,
-        "query": query_vector.tolist(),
-        "limit": 30,  # search a broader set of candidates
-        "with_payload": True,
-    }
-
-    if price_filter is not None:
-        query_kwargs["query_filter"] = price_filter
-
-    results = services["qdrant"].client.query_points(**query_kwargs).points
-    
-    # Build context (results may already be filtered by price)
-    context_parts = []
-    
-    if results:
-        for r in results:
-            name = r.payload.get("name", "")
-            price = r.payload.get("price", "")
-            desc = r.payload.get("description", "")
-            answer = r.payload.get("answer", "")
-            category = r.payload.get("category", "")
-            
-            if name and price:
-                product_info = f"{name} (${price}) - {category}: {desc}"
-                context_parts.append(product_info)
-            elif answer:
-                context_parts.append(answer)
-    
-    context = "\n\n".join(context_parts) if context_parts else ""
-    
-    # Add order information to context if found
-    order_context = ""
-    if order_info:
-        order_details = []
-        order_details.append(f"Order ID: {order_info.get('order_id', 'N/A')}")
-        order_details.append(f"Customer: {order_info.get('customer_name', 'N/A')}")
-        order_details.append(f"Status: {order_info.get('status', 'N/A').upper()}")
-        order_details.append(f"Total: ${order_info.get('total', 0):.2f}")
-        order_details.append(f"Order Date: {order_info.get('order_date', 'N/A')}")
-        
-        items = order_info.get('items', [])
-        if items:
-            items_list = ", ".join([f"{item.get('name', '')} x{item.get('quantity', 1)}" for item in items])
-            order_details.append(f"Items: {items_list}")
-        
-        if order_info.get('tracking_number'):
-            order_details.append(f"Tracking Number: {order_info.get('tracking_number')}")
-        if order_info.get('carrier'):
-            order_details.append(f"Carrier: {order_info.get('carrier')}")
-        if order_info.get('estimated_delivery'):
-            order_details.append(f"Estimated Delivery: {order_info.get('estimated_delivery')}")
-        if order_info.get('delivered_date'):
-            order_details.append(f"Delivered Date: {order_info.get('delivered_date')}")
-        if order_info.get('cancelled_date'):
-            order_details.append(f"Cancelled Date: {order_info.get('cancelled_date')}")
-        if order_info.get('cancellation_reason'):
-            order_details.append(f"Cancellation Reason: {order_info.get('cancellation_reason')}")
-        
-        order_context = "\n\nORDER TRACKING INFORMATION:\n" + "\n".join(order_details)
-    elif any(keyword in lowered for keyword in order_keywords):
-        order_context = "\n\nORDER TRACKING INFORMATION:\nOrder not found. Please check the order ID and try again."
-    
-    # Build conversation history for LLM
-    history_text = ""
-    if history:
-        history_text = "\n\nConversation History:\n"
-        for msg in history:
-            role = "User" if msg["role"] == "user" else "Assistant"
-            history_text += f"{role}: {msg['content']}\n"
-    
-    # Enhanced system prompt with conversation awareness
-    system_prompt = f"""You are a helpful e-commerce assistant with conversation memory.
+# Byte-identical on every call so providers can serve it from their prompt
+# cache; everything per-turn is appended after it (LLMService.ainvoke)
+RAG_SYSTEM_PROMPT = """You are a helpful e-commerce assistant with conversation memory.
 
 IMPORTANT INSTRUCTIONS:
 - Remember the conversation history and maintain context
@@ -266,24 +303,59 @@ IMPORTANT INSTRUCTIONS:
 - Format product lists clearly with bullets
 - When user asks about order tracking, provide the complete order details from the ORDER TRACKING INFORMATION section below
 - If order is found, provide all relevant details including status, tracking number, carrier, and delivery dates
-- If order is not found, politely inform the user and ask them to verify the order ID
+- If order is not found, politely inform the user and ask them to verify the order ID"""
 
-{history_text}
-
-Available Products/Information:
-{context}{order_context}"""
+async def process_query(user_text: str, session_id: str = "default") -> str:
+    """Process text query with RAG + LLM + Conversation Memory"""
+    
+    started = time.perf_counter()
     
-    # Get LLM response
-    response = services["llm"].invoke(user_text, system_prompt=system_prompt)
+    # Summary of older turns plus the last few verbatim: bounded however long
+    # the session runs (older turns are folded after the reply, see record())
+    history = await conversation_history.aload(session_id)
     
-    # Update conversation memory
-    conversation_memory[session_id].append({"role": "user", "content": user_text})
-    conversation_memory[session_id].append({"role": "assistant", "content": response})
+    if TOOL_MODE:
+        from app.service.llm_service_mcp import DEFAULT_SYSTEM_PROMPT
+        # The model picks the lookups; independent ones run as one parallel round
+        result = await services["tools"].chat(
+            user_text,
+            history=history.messages,
+            system_prompt=DEFAULT_SYSTEM_PROMPT + history.summary_text(),
+        )
+        response = result.content
+        await conversation_history.arecord(session_id, user_text, response, history)
+        return response
+    
+    # Order lookup and product/policy search run concurrently (per-branch timeouts)
+    retrieval = services.get("retrieval")
+    if retrieval is None:
+        from app.service.retrieval_service import RetrievalPipeline
+        retrieval = services["retrieval"] = RetrievalPipeline(
+            embedding_model, services["qdrant"], services.get("orders"), catalog=services.get("rag"))
+    ctx = await retrieval.retrieve(user_text)
+    
+    # Order status / not found / stock of a named product: answer from the
+    # data with a template instead of paying for a completion
+    reply = fast_path_reply(user_text, ctx)
+    if reply:
+        await conversation_history.arecord(session_id, user_text, reply.text, history)
+        record_response(reply.intent, "template", started)
+        return reply.text
+    
+    # Static preamble, then this turn's context, order block and conversation
+    # summary, then the recent turns as chat messages (see RAG_SYSTEM_PROMPT)
+    response = await services["llm"].ainvoke(
+        user_text,
+        system_prompt=RAG_SYSTEM_PROMPT,
+        context=ctx.catalog_text() + ctx.order_text() + history.summary_text(),
+        history=history.messages,
+    )
     
-    # Keep only last 10 messages (5 turns)
-    if len(conversation_memory[session_id]) > 10:
-        conversation_memory[session_id] = conversation_memory[session_id][-10:]
+    # Update conversation memory; older turns are folded into the summary
+    # by a background task, off this request's path
+    await conversation_history.arecord(session_id, user_text, response, history)
     
+    record_response(intent_label(user_text, ctx), "llm", started)
     return response
 
 # ============================================================================
@@ -304,7 +376,9 @@ async def chat_endpoint(data: dict):
     if not user_text:
         return {"error": "No message provided"}
     
-    response = await process_query(user_text, session_id)
+    _require(*QUERY_DEPS)
+    with span("chat.turn", session_id=session_id):
+        response = await process_query(user_text, session_id)
     
     return {
         "user": user_text,
@@ -315,15 +389,24 @@ async def chat_endpoint(data: dict):
 @app.post("/api/voice")
 async def voice_endpoint(audio: UploadFile = File(...)):
     """Voice input endpoint"""
+    _require(*VOICE_DEPS)
     try:
-        audio_bytes = await audio.read()
-        transcript = await services["stt"].transcribe(audio_bytes)
-        
-        if not transcript:
-            return {"error": "Could not transcribe audio"}
+        with span("voice.turn") as turn:
+            audio_bytes = await audio.read()
+            with span("audio.transcode", audio_bytes=len(audio_bytes)) as s:
+                prepared = await services["audio"].prepare(audio_bytes)
+                s.set_attribute("container", prepared.source_format.container)
+                s.set_attribute("output_bytes", len(prepared.data))
+            transcript = await services["stt"].transcribe(prepared.data, filename=prepared.filename)
+            
+            if not transcript:
+                return {"error": "Could not transcribe audio"}
+            
+            with span("query.process"):
+                response_text = await process_query(transcript, "default")
+            response_audio = await services["tts"].synthesize(response_text)
+            turn.set_attribute("response_audio_bytes", len(response_audio))
         
-        response_text = await process_query(transcript, "default")
-        response_audio = await services["tts"].synthesize(response_text)
         audio_base64 = base64.b64encode(response_audio).decode('utf-8')
         
         return {
@@ -340,19 +423,42 @@ async def voice_endpoint(audio: UploadFile = File(...)):
 async def reset_conversation(data: dict):
     """Reset conversation memory"""
     session_id = data.get("session_id", "default")
-    if session_id in conversation_memory:
-        conversation_memory[session_id] = []
+    _require("sessions")
+    await conversation_history.aclear(session_id)
     return {"status": "reset"}
 
 @app.get("/health")
 async def health():
-    return {
+    """Liveness plus per-service readiness and startup step durations"""
+    result = {
         "status": "healthy",
-        "services": {
-            "qdrant": "ok" if services.get("qdrant") else "not ready",
-            "llm": "ok" if services.get("llm") else "not ready"
-        }
+        "ready": all(state == "ok" for state in readiness.values()),
+        "services": dict(readiness),
+        "startup_seconds": startup_timings,
     }
+    if readiness["qdrant"] == "ok":
+        # TTL-cached, so frequent probes don't turn into Qdrant requests
+        try:
+            result["qdrant"] = await asyncio.to_thread(services["qdrant"].collection_info)
+        except Exception as e:
+            result["qdrant"] = {"error": str(e)}
+    return result
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 once every service is up, 503 while warming up"""
+    pending = {name: state for name, state in readiness.items() if state != "ok"}
+    if pending:
+        return JSONResponse(status_code=503, content={"ready": False, "pending": pending})
+    return {"ready": True}
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics (per-stage latency histograms)"""
+    return PlainTextResponse(
+        registry.render_prometheus(),
+        media_type="text/plain; version=0.0.4",
+    )
 
 @app.post("/api/track-order")
 async def track_order_endpoint(data: dict):
@@ -362,9 +468,8 @@ async def track_order_endpoint(data: dict):
     if not order_id:
         return {"error": "No order ID provided"}
     
-    order_service = services.get("orders")
-    if not order_service:
-        return {"error": "Order service not available"}
+    _require("orders")
+    order_service = services["orders"]
     
     order = order_service.track_order(order_id)
     
@@ -379,6 +484,38 @@ async def track_order_endpoint(data: dict):
         "order": order
     }
 
+def _check_admin(token: str | None):
+    """Fail closed: the admin endpoints don't exist until CATALOG_ADMIN_TOKEN is set"""
+    expected = services["indexer"].config.admin_token
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if token is None or not secrets.compare_digest(token.encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.post("/api/admin/reindex")
+async def reindex_catalog(x_admin_token: str | None = Header(None)):
+    """Re-index changed catalog rows in the background and publish a new index version"""
+    _require("catalog")
+    _check_admin(x_admin_token)
+    indexer = services["indexer"]
+    started = indexer.start(reason="api")
+    content = {"started": started, "status": indexer.status.as_dict()}
+    if not started and not indexer.running:
+        content["detail"] = "Another worker is re-indexing the catalog"
+    return JSONResponse(status_code=202 if started else 409, content=content)
+
+@app.get("/api/admin/reindex/status")
+async def reindex_status(x_admin_token: str | None = Header(None)):
+    """Progress and throughput of the current (or last) re-index"""
+    _require("catalog")
+    _check_admin(x_admin_token)
+    indexer = services["indexer"]
+    return {
+        "running": indexer.running,
+        "served_collection": await asyncio.to_thread(services["qdrant"].active_collection),
+        **indexer.status.as_dict(),
+    }
+
 @app.get("/api/livekit/token")
 async def get_livekit_token(room: str, participant: str | None = None):
     """Generate a token for LiveKit client"""
@@ -387,7 +524,8 @@ async def get_livekit_token(room: str, participant: str | None = None):
         if not participant:
             import uuid
             participant = f"user-{uuid.uuid4().hex[:8]}"
-            
+        
+        from app.service.livekit_service import livekit_service
         token = livekit_service.create_token(room, participant)
         return {
             "token": token,
@@ -765,7 +903,7 @@ Try: "Show me products under $50"
                 };
                 
                 mediaRecorder.onstop = async () => {
-                    const audioBlob = new Blob(audioChunks, { type: 'audio/wav' });
+                    const audioBlob = new Blob(audioChunks, { type: mediaRecorder.mimeType });
                     await sendVoiceMessage(audioBlob);
                     stream.getTracks().forEach(track => track.stop());
                 };
@@ -798,7 +936,9 @@ Try: "Show me products under $50"
             
             try {
                 const formData = new FormData();
-                formData.append('audio', audioBlob, 'recording.wav');
+                // Label with the recorder's real container (usually webm/opus)
+                const ext = (audioBlob.type.split(';')[0].split('/')[1]) || 'webm';
+                formData.append('audio', audioBlob, `recording.${ext}`);
                 
                 const response = await fetch('/api/voice', {
                     method: 'POST',
@@ -0,0 +1,228 @@
+import asyncio
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Literal, Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+OutputFormat = Literal["flac", "opus", "wav"]
+
+
+class AudioConfig(BaseSettings):
+    """Audio pre-processing configuration"""
+
+    transcode_enabled: bool = True
+    sample_rate: int = 16000  # Whisper resamples to 16 kHz internally
+    channels: int = 1
+    output_format: OutputFormat = "opus"  # FLAC is often larger than the compressed upload
+    opus_bitrate: str = "24k"
+    trim_silence: bool = True
+    silence_threshold_db: float = -45.0
+    keep_silence_ms: int = 150  # padding left around speech after trimming
+    max_workers: int = 2
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_prefix="AUDIO_",
+        extra="ignore",
+    )
+
+
+@dataclass(frozen=True)
+class AudioFormat:
+    """Container/codec detected from the upload's magic bytes"""
+    container: str
+    codec: Optional[str]
+    mime_type: str
+    extension: str
+
+
+@dataclass
+class PreparedAudio:
+    """Audio ready to be sent to the STT provider"""
+    data: bytes
+    filename: str
+    mime_type: str
+    source_format: AudioFormat
+    original_bytes: int
+    transcoded: bool
+
+
+# Unrecognised uploads keep the legacy "audio.wav" label
+UNKNOWN_FORMAT = AudioFormat("unknown", None, "application/octet-stream", "wav")
+
+_OUTPUT_FORMATS = {
+    # output_format: (pydub/ffmpeg format, codec, extension, mime type)
+    "flac": ("flac", None, "flac", "audio/flac"),
+    "opus": ("ogg", "libopus", "ogg", "audio/ogg"),
+    "wav": ("wav", None, "wav", "audio/wav"),
+}
+
+
+def detect_format(data: bytes) -> AudioFormat:
+    """
+    Detect audio container and codec from the first bytes of the upload
+
+    Args:
+        data: Raw uploaded audio
+
+    Returns:
+        AudioFormat (UNKNOWN_FORMAT if the container is not recognised)
+    """
+    head = data[:64]
+
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return AudioFormat("wav", "pcm", "audio/wav", "wav")
+
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        # EBML header - WebM (what MediaRecorder produces) or Matroska
+        probe = data[:4096]
+        codec = "opus" if b"A_OPUS" in probe else "vorbis" if b"A_VORBIS" in probe else None
+        if b"webm" in head:
+            return AudioFormat("webm", codec, "audio/webm", "webm")
+        return AudioFormat("matroska", codec, "audio/x-matroska", "mka")
+
+    if head[:4] == b"OggS":
+        codec = "opus" if b"OpusHead" in head else "vorbis" if b"\x01vorbis" in head else None
+        return AudioFormat("ogg", codec, "audio/ogg", "ogg")
+
+    if head[:4] == b"fLaC":
+        return AudioFormat("flac", "flac", "audio/flac", "flac")
+
+    if head[4:8] == b"ftyp":
+        return AudioFormat("mp4", "aac", "audio/mp4", "m4a")
+
+    if head[:3] == b"ID3" or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return AudioFormat("mp3", "mp3", "audio/mpeg", "mp3")
+
+    return UNKNOWN_FORMAT
+
+
+def _transcode(data: bytes, container: str, config: dict) -> bytes:
+    """
+    Decode, downmix, resample, trim and re-encode audio.
+
+    Runs inside a worker process (module-level so it can be pickled).
+    """
+    from pydub import AudioSegment
+    from pydub.silence import detect_leading_silence
+
+    segment = AudioSegment.from_file(
+        io.BytesIO(data),
+        format=None if container == "unknown" else container,
+    )
+    segment = segment.set_channels(config["channels"]).set_frame_rate(config["sample_rate"])
+
+    if config["trim_silence"]:
+        threshold = config["silence_threshold_db"]
+        keep = config["keep_silence_ms"]
+        start = detect_leading_silence(segment, silence_threshold=threshold)
+        end = len(segment) - detect_leading_silence(segment.reverse(), silence_threshold=threshold)
+        # Only trim when speech was detected; an all-silent clip is left for STT to reject
+        if end > start:
+            segment = segment[max(start - keep, 0):min(end + keep, len(segment))]
+
+    fmt, codec, _, _ = _OUTPUT_FORMATS[config["output_format"]]
+    export_kwargs = {"format": fmt}
+    if codec:
+        export_kwargs["codec"] = codec
+        export_kwargs["bitrate"] = config["opus_bitrate"]
+
+    out = io.BytesIO()
+    segment.export(out, **export_kwargs)
+    return out.getvalue()
+
+
+class AudioService:
+    """
+    Normalises voice uploads before they are sent to STT:
+    detects the real container, downsamples to 16 kHz mono,
+    trims leading/trailing silence and re-encodes to Opus/FLAC.
+    """
+
+    def __init__(self, config: Optional[AudioConfig] = None):
+        """
+        Initialize audio service
+
+        Args:
+            config: AudioConfig instance (uses env vars if not provided)
+        """
+        self.config = config or AudioConfig()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        print(f"✓ Audio Service initialized (output: {self.config.output_format}, "
+              f"{self.config.sample_rate} Hz)")
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Created on first use, inside a process that already runs threads
+        # (uvicorn, warm-up executors, HTTP pools): forking it could copy a
+        # held lock into the child, so workers come from a clean forkserver
+        # (spawn where that isn't available)
+        if self._pool is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._pool = ProcessPoolExecutor(max_workers=self.config.max_workers,
+                                             mp_context=multiprocessing.get_context(method))
+        return self._pool
+
+    async def _run_transcode(self, audio_data: bytes, container: str) -> bytes:
+        loop = asyncio.get_running_loop()
+        args = (_transcode, audio_data, container, self.config.model_dump())
+        try:
+            return await loop.run_in_executor(self._get_pool(), *args)
+        except BrokenProcessPool:
+            # A worker died (OOM kill, ffmpeg crash) and the executor refuses
+            # all further work; replace it once instead of failing every upload
+            print("⚠️  Audio transcode pool broke, restarting it")
+            self.close()
+            return await loop.run_in_executor(self._get_pool(), *args)
+
+    async def prepare(self, audio_data: bytes) -> PreparedAudio:
+        """
+        Detect format and transcode audio for STT
+
+        Falls back to the original bytes (labelled with the detected
+        extension) if transcoding is disabled or fails, or if the
+        transcode of a recognised format came out larger.
+
+        Args:
+            audio_data: Raw uploaded audio
+
+        Returns:
+            PreparedAudio
+        """
+        source = detect_format(audio_data)
+
+        if self.config.transcode_enabled:
+            try:
+                data = await self._run_transcode(audio_data, source.container)
+                _, _, extension, mime_type = _OUTPUT_FORMATS[self.config.output_format]
+                # A larger transcode of an already compressed upload (e.g. Opus
+                # in WebM) isn't worth it; the original goes out correctly labelled
+                if len(data) <= len(audio_data) or source is UNKNOWN_FORMAT:
+                    return PreparedAudio(
+                        data=data,
+                        filename=f"audio.{extension}",
+                        mime_type=mime_type,
+                        source_format=source,
+                        original_bytes=len(audio_data),
+                        transcoded=True,
+                    )
+            except Exception as e:
+                print(f"⚠️  Audio transcode failed ({source.container}), sending original: {e}")
+
+        return PreparedAudio(
+            data=audio_data,
+            filename=f"audio.{source.extension}",
+            mime_type=source.mime_type,
+            source_format=source,
+            original_bytes=len(audio_data),
+            transcoded=False,
+        )
+
+    def close(self):
+        """Shut down the transcode worker pool"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,301 @@
+import asyncio
+import fcntl
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from app.core.telemetry import registry, span
+from app.service.rag_service import CsvSource, IndexedRow, RAGService
+
+ROWS_EMBEDDED = registry.counter(
+    "voicebot_catalog_rows_embedded_total",
+    "Catalog rows (re-)embedded by the background indexer",
+    ("source",),
+)
+REINDEX_RUNS = registry.counter(
+    "voicebot_catalog_reindex_total",
+    "Background catalog re-index runs by outcome",
+    ("outcome",),
+)
+
+
+class IndexerConfig(BaseSettings):
+    """Background catalog re-indexing configuration"""
+
+    batch_size: int = 64  # rows per encode() call
+    max_concurrency: int = 2  # encode batches in flight at once
+    watch: bool = False  # poll the CSVs and re-index when they change
+    watch_interval_seconds: float = 5.0
+    # Shared index: how often processes that didn't build the served version reload their tables
+    table_refresh_seconds: float = 5.0
+    # Shared index: flock that lets one process per host build versions and watch the CSVs
+    # (default: <tmp>/voicebot-<collection>-indexer.lock)
+    lock_path: Optional[str] = None
+    admin_token: Optional[str] = None  # X-Admin-Token; admin endpoints return 404 while unset
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_prefix="CATALOG_",
+        extra="ignore",
+    )
+
+
+@dataclass
+class IndexStatus:
+    """Progress of the current (or last) re-index run"""
+    state: str = "idle"  # idle | running | succeeded | failed
+    phase: str = ""
+    reason: str = ""
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    rows_total: int = 0
+    rows_to_embed: int = 0
+    rows_embedded: int = 0
+    rows_copied: int = 0
+    rows_deleted: int = 0
+    embed_seconds: float = 0.0
+    collection: Optional[str] = None  # version being built / published
+    error: Optional[str] = None
+    sources: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        end = self.finished_at or time.time()
+        data["duration_seconds"] = round(end - self.started_at, 3) if self.started_at else None
+        data["embed_rows_per_second"] = (
+            round(self.rows_embedded / self.embed_seconds, 1) if self.embed_seconds else None
+        )
+        data["progress"] = (
+            round(self.rows_embedded / self.rows_to_embed, 3) if self.rows_to_embed else None
+        )
+        return data
+
+
+def _try_lock(path: str):
+    """Open path and take an exclusive flock without waiting; None if another process holds it"""
+    f = open(path, "a")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        return None
+    return f
+
+
+class CatalogIndexer:
+    """
+    Re-indexes the catalog CSVs in the background
+
+    Each run diffs the CSVs against the served collection by content hash,
+    builds a new collection version (unchanged vectors copied, changed rows
+    re-embedded in bounded-concurrency batches) and publishes it with an
+    atomic alias swap. Queries keep using the old version until then.
+
+    With a shared (persistent) index every pre-forked worker has an
+    indexer, so runs hold a file lock: one builds and publishes while the
+    others refuse, only the worker that holds the watch lock polls the
+    CSVs, and every worker reloads its tables from the published version
+    (follow()). This relies on the store's active_collection() reflecting
+    other processes' publishes (Qdrant aliases; NumpyVectorStore re-reads
+    its aliases.json), so the run that wins the lock next diffs against,
+    and drops, the version that is actually served.
+    """
+
+    def __init__(self, rag: RAGService, sources: List[CsvSource],
+                 config: Optional[IndexerConfig] = None):
+        """
+        Initialize the indexer
+
+        Args:
+            rag: RAGService whose model and Qdrant service are used
+            sources: CSV files that make up the catalog index
+            config: IndexerConfig (defaults from CATALOG_* env vars)
+        """
+        self.rag = rag
+        self.qdrant = rag.qdrant_service
+        self.sources = sources
+        self.config = config or IndexerConfig()
+        self.status = IndexStatus()
+        self._task: Optional[asyncio.Task] = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self._follow_task: Optional[asyncio.Task] = None
+        self._watch_lock = None
+        self._lock_path = self.config.lock_path or os.path.join(
+            tempfile.gettempdir(), f"voicebot-{self.qdrant.collection_name}-indexer.lock")
+        self._indexed_mtimes = self._mtimes()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, reason: str = "manual") -> bool:
+        """
+        Start a re-index in the background
+
+        Args:
+            reason: Recorded in the status (e.g. "api", "file change")
+
+        Returns:
+            False if a run is already in progress (here or in another process)
+        """
+        if self.running:
+            return False
+        lock = None
+        if self.qdrant.persistent:
+            lock = _try_lock(self._lock_path)
+            if lock is None:
+                return False
+        self._indexed_mtimes = self._mtimes()
+        self.status = IndexStatus(state="running", reason=reason, started_at=time.time())
+        self._task = asyncio.create_task(self._run(self.status, lock))
+        return True
+
+    def start_watching(self):
+        """
+        Poll the CSV files and re-index once a change has settled
+
+        With a shared index only the first process to get the watch lock
+        polls; the others pick its versions up through follow().
+        """
+        if self._watch_task is not None:
+            return
+        if self.qdrant.persistent:
+            self._watch_lock = _try_lock(self._lock_path + ".watch")
+            if self._watch_lock is None:
+                return
+        self._watch_task = asyncio.create_task(self._watch())
+
+    def start_following(self):
+        """Reload the tables whenever another process publishes a version (shared index only)"""
+        if self._follow_task is None and self.qdrant.persistent:
+            self._follow_task = asyncio.create_task(self._follow())
+
+    def stop(self):
+        for task in (self._watch_task, self._follow_task, self._task):
+            if task is not None and not task.done():
+                task.cancel()
+        if self._watch_lock is not None:
+            self._watch_lock.close()
+            self._watch_lock = None
+
+    def _mtimes(self) -> Tuple[Optional[float], ...]:
+        return tuple(
+            os.path.getmtime(s.path) if os.path.exists(s.path) else None
+            for s in self.sources
+        )
+
+    async def _watch(self):
+        print(f"👀 Watching catalog files every {self.config.watch_interval_seconds}s")
+        previous = self._mtimes()
+        while True:
+            await asyncio.sleep(self.config.watch_interval_seconds)
+            current = self._mtimes()
+            # Wait one extra interval after a change so half-written files aren't indexed
+            if current != self._indexed_mtimes and current == previous and not self.running:
+                print("🔄 Catalog files changed, re-indexing")
+                self.start(reason="file change")
+            previous = current
+
+    async def _follow(self):
+        while True:
+            await asyncio.sleep(self.config.table_refresh_seconds)
+            if self.running:
+                continue  # this process's own run swaps its tables in
+            try:
+                if await asyncio.to_thread(self.rag.refresh_tables):
+                    print(f"🔄 Catalog tables reloaded from {self.rag.tables_collection}")
+            except Exception as e:
+                print(f"⚠️  Catalog table reload failed: {e}")
+
+    async def _run(self, status: IndexStatus, lock=None):
+        try:
+            with span("catalog.reindex", reason=status.reason):
+                await self._reindex(status)
+            status.state = "succeeded"
+            REINDEX_RUNS.inc(outcome="succeeded")
+            if status.phase == "up to date":
+                print("✅ Catalog index already up to date")
+            else:
+                print(f"✅ Catalog re-indexed: {status.rows_embedded} embedded, "
+                      f"{status.rows_copied} unchanged, {status.rows_deleted} removed")
+        except asyncio.CancelledError:
+            status.state = "failed"
+            status.error = "cancelled"
+            raise
+        except Exception as e:
+            status.state = "failed"
+            status.error = str(e)
+            REINDEX_RUNS.inc(outcome="failed")
+            print(f"❌ Catalog re-index failed: {e}")
+        finally:
+            status.finished_at = time.time()
+            if lock is not None:
+                lock.close()  # releases the flock
+
+    async def _reindex(self, status: IndexStatus):
+        status.phase = "diffing"
+        live = await asyncio.to_thread(self.qdrant.active_collection)
+
+        plans = []
+        tables = []  # in-process tables are swapped in with the collection
+        for source in self.sources:
+            if not os.path.exists(source.path):
+                continue
+            rows = await asyncio.to_thread(self.rag.read_rows, source)
+            existing = await asyncio.to_thread(self.qdrant.content_hashes, source.name, live)
+            changed, unchanged, stale = self.rag.diff_rows(rows, existing)
+            plans.append((source, changed, unchanged))
+            tables.append((source, rows))
+            status.sources[source.name] = {
+                "total": len(rows), "changed": len(changed),
+                "unchanged": len(unchanged), "removed": len(stale),
+            }
+            status.rows_total += len(rows)
+            status.rows_to_embed += len(changed)
+            status.rows_deleted += len(stale)
+
+        if not status.rows_to_embed and not status.rows_deleted:
+            status.phase = "up to date"
+            return
+
+        status.phase = "building"
+        staging = await asyncio.to_thread(self.qdrant.create_collection_version)
+        status.collection = staging
+        try:
+            for source, changed, unchanged in plans:
+                if unchanged:
+                    status.rows_copied += await asyncio.to_thread(
+                        self.qdrant.copy_points, unchanged, live, staging)
+                await self._embed(source, changed, staging, status)
+        except BaseException:
+            await asyncio.to_thread(self.qdrant.drop_collection, staging)
+            raise
+
+        status.phase = "publishing"
+        previous = await asyncio.to_thread(self.qdrant.publish, staging)
+        if previous and previous != staging:
+            await asyncio.to_thread(self.qdrant.drop_collection, previous)
+        for source, rows in tables:
+            self.rag.index_table(source, rows)
+        self.rag.tables_collection = staging
+        status.phase = "published"
+
+    async def _embed(self, source: CsvSource, rows: List[IndexedRow],
+                     collection_name: str, status: IndexStatus):
+        semaphore = asyncio.Semaphore(self.config.max_concurrency)
+        size = self.config.batch_size
+        # Wall-clock time (batches overlap), so rows/s reflects real throughput
+        start, elapsed_before = time.perf_counter(), status.embed_seconds
+
+        async def embed_batch(batch: List[IndexedRow]):
+            async with semaphore:
+                await asyncio.to_thread(self.rag.embed_rows, batch, collection_name)
+                status.embed_seconds = elapsed_before + time.perf_counter() - start
+                status.rows_embedded += len(batch)
+                ROWS_EMBEDDED.inc(len(batch), source=source.name)
+
+        await asyncio.gather(*(embed_batch(rows[i:i + size]) for i in range(0, len(rows), size)))
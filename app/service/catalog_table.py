@@ -0,0 +1,403 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.service.intent_service import Intent
+
+# Words a catalog question is built from besides product terms. Anything
+# else has to resolve to a category, brand or product-name token, or the
+# question is left to semantic search ("cheapest gift for a runner").
+_FILLER_WORDS = frozenset("""
+    a all an and any are available by can cheap cheaper cheapest could do does
+    expensive find for from get give have high higher highest how i in is it
+    items item least list low lower lowest many me most much my number of on
+    one or please price priced prices pricey priciest product products
+    show sort sorted stock tell than that the them there these things thing
+    to top under up us what what's whats which with you your over below above
+    between less more greater sell first descending ascending we stuff dollar
+    dollars bucks cost costs device devices gadget gadgets option options
+""".split())
+_WORDS = re.compile(r"[a-z0-9']+")
+_NUMBER = re.compile(r"^\d+(?:\.\d+)?$")
+
+_CHEAPEST = re.compile(r"\b(?:cheapest|least expensive|lowest[- ]priced|lowest price)\b")
+_PRICIEST = re.compile(r"\b(?:most expensive|priciest|highest[- ]priced|highest price)\b")
+_COUNT = re.compile(r"\bhow many\b")
+# "how many ... left / in stock / available" asks for units, not catalog rows
+_UNITS = re.compile(r"\b(?:left|in stock|available|units?)\b")
+_SORT = re.compile(r"\bsort(?:ed)?\b.*\bby (price|stock)\b|\bby (price|stock)\b")
+_DESCENDING = re.compile(r"\b(?:high(?:est)? to low(?:est)?|descending|most expensive first|highest first)\b")
+_IN_STOCK = re.compile(r"\b(?:in stock|available)\b")
+_TOP_N = re.compile(r"\b(?:top|the)?\s*(\d{1,2}|two|three|four|five)\s+(?:cheapest|most expensive|priciest)\b")
+_NUMBER_WORDS = {"two": 2, "three": 3, "four": 4, "five": 5}
+
+DEFAULT_LIMIT = 5
+MAX_LIMIT = 20
+
+
+def _singular(word: str) -> str:
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("ches", "shes", "xes", "sses")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+def _as_floats(values: Iterable[Any]) -> np.ndarray:
+    out = []
+    for value in values:
+        try:
+            out.append(float(value))
+        except (TypeError, ValueError):
+            out.append(np.nan)
+    return np.asarray(out, dtype=np.float64)
+
+
+@dataclass
+class CatalogQuery:
+    """A filter / sort / aggregate question over the product table"""
+    op: str  # "top" (sorted rows) or "count"
+    sort_by: str = "price"  # price | stock
+    descending: bool = False
+    limit: int = DEFAULT_LIMIT
+    category: Optional[str] = None
+    brand: Optional[str] = None
+    terms: Tuple[str, ...] = ()  # product-name tokens, all must match
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    in_stock: bool = False
+
+    def price_phrase(self) -> str:
+        """"between $20 and $80", "under $50", "over $100" or "" """
+        if self.min_price is not None and self.max_price is not None:
+            return f"between ${self.min_price:g} and ${self.max_price:g}"
+        if self.max_price is not None:
+            return f"under ${self.max_price:g}"
+        if self.min_price is not None:
+            return f"over ${self.min_price:g}"
+        return ""
+
+    def describe(self) -> str:
+        """The filters, e.g. "name has headphone, category audio, under $50" """
+        parts = []
+        if self.terms:
+            parts.append("name has " + " and ".join(self.terms))
+        if self.brand:
+            parts.append(f"brand {self.brand}")
+        if self.category:
+            parts.append(f"category {self.category}")
+        if self.price_phrase():
+            parts.append(self.price_phrase())
+        if self.in_stock:
+            parts.append("in stock")
+        return ", ".join(parts)
+
+
+@dataclass
+class CatalogAnswer:
+    """Exact result of a CatalogQuery over the whole catalog"""
+    query: CatalogQuery
+    total: int  # products matching the filters
+    rows: List[Dict[str, Any]]  # top rows in query order (empty for counts)
+
+    def summary(self) -> str:
+        """One line for the prompt, so the LLM doesn't recount or re-sort"""
+        q = self.query
+        scope = f"products ({q.describe()})" if q.describe() else "products in the catalog"
+        if q.op == "count":
+            return f"Exact catalog count: {self.total} {scope}."
+        order = "highest" if q.descending else "lowest"
+        return (f"Exact catalog result: {self.total} {scope}; "
+                f"showing {len(self.rows)} with the {order} {q.sort_by}, in that order.")
+
+
+class ProductTable:
+    """
+    Columnar, in-process copy of the product catalog
+
+    Built from the same rows that are embedded at ingestion. Price and
+    stock are float arrays, category and brand are integer codes and
+    product-name tokens map to row indices, so filters, counts and top-k
+    are vectorized NumPy operations over the whole catalog (microseconds
+    at catalog sizes) instead of a top-30 vector search.
+    """
+
+    def __init__(self, ids: List[str], payloads: List[Dict[str, Any]]):
+        """
+        Build the table
+
+        Args:
+            ids: Point ID per product
+            payloads: Product payloads (name, price, stock, category, brand, text)
+        """
+        self.ids = np.asarray(ids, dtype=object)
+        self.names = np.asarray([str(p.get("name", "")) for p in payloads], dtype=object)
+        self.descriptions = np.asarray([str(p.get("text", "")) for p in payloads], dtype=object)
+        self.price = _as_floats(p.get("price") for p in payloads)
+        self.stock = _as_floats(p.get("stock") for p in payloads)
+        self.categories, self.category_codes = self._encode(p.get("category") for p in payloads)
+        self.brands, self.brand_codes = self._encode(p.get("brand") for p in payloads)
+
+        # name token -> row indices (singular forms too, "headphones" -> "headphone")
+        index: Dict[str, List[int]] = {}
+        for row, name in enumerate(self.names):
+            for token in set(_WORDS.findall(name.lower())):
+                index.setdefault(token, []).append(row)
+                if _singular(token) != token:
+                    index.setdefault(_singular(token), []).append(row)
+        self._token_rows = {token: np.asarray(rows, dtype=np.int64) for token, rows in index.items()}
+        self._category_lookup = {self._key(c): c for c in self.categories}
+        self._brand_lookup = {c.lower(): c for c in self.brands}
+
+    @staticmethod
+    def _encode(values: Iterable[Any]) -> Tuple[List[str], np.ndarray]:
+        labels = ["" if v is None or v != v else str(v) for v in values]
+        uniques = sorted(set(labels))
+        lookup = {label: code for code, label in enumerate(uniques)}
+        return uniques, np.asarray([lookup[label] for label in labels], dtype=np.int32)
+
+    @staticmethod
+    def _key(category: str) -> str:
+        return " ".join(_singular(w) for w in _WORDS.findall(category.lower().replace("-", " ")))
+
+    @classmethod
+    def from_points(cls, points: Iterable[Tuple[str, Dict[str, Any]]]) -> "ProductTable":
+        """
+        Build from (point ID, payload) pairs
+
+        Args:
+            points: Product rows as stored in Qdrant
+
+        Returns:
+            ProductTable
+        """
+        ids, payloads = [], []
+        for point_id, payload in points:
+            ids.append(point_id)
+            payloads.append(payload)
+        return cls(ids, payloads)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ------------------------------------------------------------------
+    # Query API
+    # ------------------------------------------------------------------
+
+    def mask(self, category: Optional[str] = None, brand: Optional[str] = None,
+             terms: Iterable[str] = (), min_price: Optional[float] = None,
+             max_price: Optional[float] = None, in_stock: bool = False) -> np.ndarray:
+        """
+        Boolean row mask for the given filters (all of them must hold)
+
+        Args:
+            category: Exact category
+            brand: Exact brand
+            terms: Tokens that must all appear in the product name
+            min_price: Inclusive lower price bound
+            max_price: Inclusive upper price bound
+            in_stock: Only products with stock > 0
+
+        Returns:
+            Boolean array with one entry per product
+        """
+        keep = np.ones(len(self), dtype=bool)
+        if category is not None:
+            keep &= self.category_codes == self._code(self.categories, category)
+        if brand is not None:
+            keep &= self.brand_codes == self._code(self.brands, brand)
+        for term in terms:
+            hit = np.zeros(len(self), dtype=bool)
+            hit[self._token_rows.get(term, np.empty(0, dtype=np.int64))] = True
+            keep &= hit
+        if min_price is not None:
+            keep &= self.price >= min_price
+        if max_price is not None:
+            keep &= self.price <= max_price
+        if in_stock:
+            keep &= self.stock > 0  # NaN (unknown) compares False
+        return keep
+
+    @staticmethod
+    def _code(labels: List[str], label: str) -> int:
+        try:
+            return labels.index(label)
+        except ValueError:
+            return -1
+
+    def count(self, mask: Optional[np.ndarray] = None) -> int:
+        return len(self) if mask is None else int(np.count_nonzero(mask))
+
+    def aggregate(self, column: str, op: str, mask: Optional[np.ndarray] = None) -> Optional[float]:
+        """
+        min / max / mean / sum of "price" or "stock" over the masked rows
+
+        Returns:
+            The value, or None when no row with a known value matches
+        """
+        values = getattr(self, column) if mask is None else getattr(self, column)[mask]
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return None
+        return float({"min": np.min, "max": np.max, "mean": np.mean, "sum": np.sum}[op](values))
+
+    def top_k(self, column: str = "price", k: int = DEFAULT_LIMIT, descending: bool = False,
+              mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Row indices of the k smallest (or largest) values, in order
+
+        Rows with an unknown value are never returned.
+
+        Returns:
+            Integer array of at most k row indices
+        """
+        values = getattr(self, column)
+        candidates = np.flatnonzero(~np.isnan(values) if mask is None else mask & ~np.isnan(values))
+        if not len(candidates) or k <= 0:
+            return candidates[:0]
+        keys = -values[candidates] if descending else values[candidates]
+        if k < len(candidates):
+            part = np.argpartition(keys, k - 1)[:k]
+            candidates, keys = candidates[part], keys[part]
+        return candidates[np.argsort(keys, kind="stable")]
+
+    def rows(self, indices: Iterable[int]) -> List[Dict[str, Any]]:
+        """Payload-like dicts for the given row indices"""
+        return [
+            {
+                "id": self.ids[i],
+                "name": self.names[i],
+                "price": None if np.isnan(self.price[i]) else float(self.price[i]),
+                "stock": None if np.isnan(self.stock[i]) else int(self.stock[i]),
+                "category": self.categories[self.category_codes[i]],
+                "brand": self.brands[self.brand_codes[i]],
+                "text": self.descriptions[i],
+            }
+            for i in indices
+        ]
+
+    def run(self, query: CatalogQuery) -> CatalogAnswer:
+        """
+        Execute a parsed catalog question
+
+        Args:
+            query: CatalogQuery
+
+        Returns:
+            CatalogAnswer with the exact count and the top rows
+        """
+        mask = self.mask(category=query.category, brand=query.brand, terms=query.terms,
+                         min_price=query.min_price, max_price=query.max_price,
+                         in_stock=query.in_stock)
+        total = self.count(mask)
+        if query.op == "count":
+            return CatalogAnswer(query, total, [])
+        indices = self.top_k(query.sort_by, query.limit, query.descending, mask)
+        return CatalogAnswer(query, total, self.rows(indices))
+
+    # ------------------------------------------------------------------
+    # Question parsing
+    # ------------------------------------------------------------------
+
+    def parse(self, text: str, intent: Intent) -> Optional[CatalogQuery]:
+        """
+        Recognize a cheapest / most expensive / how many / sort-by question
+
+        Every content word must resolve to a category, brand or product-name
+        token; otherwise the question is semantic and None is returned. So
+        are questions with no filter at all, a cheapest / most expensive
+        question filtered only by name tokens, and anything about orders. Counts
+        are only answered for a category and/or brand: "how many" about a
+        product, or with "left" / "in stock" / "available", asks for stock
+        units and is left to the stock path.
+
+        Args:
+            text: User utterance
+            intent: Intent already extracted from it (price range, order IDs)
+
+        Returns:
+            CatalogQuery, or None when vector search should handle the turn
+        """
+        if intent.order_ids or intent.keywords:
+            return None  # "how many orders do I have" is about orders, not products
+        lowered = text.lower()
+
+        descending = False
+        limit = 1
+        sort_by = "price"
+        if _COUNT.search(lowered):
+            if _UNITS.search(lowered):
+                return None  # stock question (response_templates stock path)
+            op = "count"
+        elif _CHEAPEST.search(lowered) or _PRICIEST.search(lowered):
+            op = "top"
+            descending = _CHEAPEST.search(lowered) is None
+            top_n = _TOP_N.search(lowered)
+            if top_n:
+                n = top_n.group(1)
+                limit = _NUMBER_WORDS.get(n) or int(n)
+        elif _SORT.search(lowered):
+            match = _SORT.search(lowered)
+            op = "top"
+            sort_by = match.group(1) or match.group(2)
+            descending = bool(_DESCENDING.search(lowered))
+            limit = DEFAULT_LIMIT
+        else:
+            return None
+
+        words = [w for w in _WORDS.findall(lowered.replace("-", " "))
+                 if w not in _FILLER_WORDS and not _NUMBER.match(w) and w not in _NUMBER_WORDS]
+
+        # Categories may span words ("smart home" -> smart-home); longest first
+        category = None
+        joined = f" {' '.join(_singular(w) for w in words)} "
+        for key in sorted(self._category_lookup, key=len, reverse=True):
+            if key and f" {key} " in joined:
+                category = self._category_lookup[key]
+                joined = joined.replace(f" {key} ", " ", 1)
+                break
+
+        brand = None
+        terms = []
+        for word in joined.split():
+            if word in _FILLER_WORDS:  # singular of a filler word ("prices")
+                continue
+            if brand is None and word in self._brand_lookup:
+                brand = self._brand_lookup[word]
+            elif word in self._token_rows:
+                terms.append(word)
+            else:
+                return None
+
+        # A count is over a category or brand; "how many SoundPro Wireless
+        # Headphones" names a product and asks for its units, and a price
+        # range alone ("how many under $50") isn't a catalog question
+        if op == "count" and (terms or (category is None and brand is None)):
+            return None
+        filtered = category is not None or brand is not None \
+            or intent.min_price is not None or intent.max_price is not None
+        # No filter at all: "which one is the cheapest?" / "sort them by
+        # price" refer to the conversation, not the whole catalog
+        if not filtered and not terms:
+            return None
+        # Name tokens alone are too loose to name a single winner ("most
+        # expensive laptop" would match a laptop power adapter)
+        if op == "top" and not filtered:
+            return None
+
+        return CatalogQuery(
+            op=op,
+            sort_by=sort_by,
+            descending=descending,
+            limit=max(1, min(limit, MAX_LIMIT)),
+            category=category,
+            brand=brand,
+            terms=tuple(dict.fromkeys(terms)),
+            min_price=intent.min_price,
+            max_price=intent.max_price,
+            in_stock=bool(_IN_STOCK.search(lowered)),
+        )
@@ -0,0 +1,260 @@
+"""
+Bounded conversation history with a rolling summary
+
+Each session keeps its most recent turns verbatim and folds older ones into
+a running summary, so a turn's prompt carries at most
+HISTORY_KEEP_TURNS + HISTORY_FOLD_TURNS verbatim turns plus a summary of
+at most HISTORY_SUMMARY_MAX_CHARS, however long the session runs.
+
+Folding is one LLM call that merges the oldest turns into the previous
+summary. It runs as a background task after the reply has been recorded
+(never on the turn's critical path) and only once HISTORY_FOLD_TURNS turns
+have piled up beyond the verbatim window, so most turns send a byte-identical
+summary and the provider's prompt cache keeps hitting. The store applies a
+fold only if the history still starts with the turns that were summarized,
+so concurrent folds from several workers cannot drop unsummarized turns.
+
+- voicebot_history_folds_total{outcome="ok"|"conflict"|"error"}
+- voicebot_history_prompt_chars{part="summary"|"turns"}: history sent per turn
+"""
+
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from app.core.telemetry import registry, span
+from app.service.session_store import SessionStore
+
+logger = logging.getLogger(__name__)
+
+HISTORY_FOLDS = registry.counter(
+    "voicebot_history_folds_total",
+    "Background history folds by outcome (ok, conflict, error)",
+    ("outcome",),
+)
+HISTORY_PROMPT_CHARS = registry.histogram(
+    "voicebot_history_prompt_chars",
+    "Characters of history sent with each turn: running summary, verbatim turns",
+    ("part",),
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000),
+)
+
+# Static so the fold request's prefix is cacheable too
+SUMMARY_PROMPT = """You maintain the running summary of a customer's conversation with an e-commerce assistant.
+Merge the new turns into the existing summary. Keep what later turns may refer back to: products discussed \
+(names, prices, categories), order IDs and their status, the customer's preferences, budget and open requests. \
+Drop greetings and filler. Write plain sentences in the third person.
+Reply with the updated summary only."""
+
+# (system_prompt, user_text) -> completion
+Summarizer = Callable[[str, str], Awaitable[str]]
+
+
+class HistoryConfig(BaseSettings):
+    """Conversation history window and summarization"""
+
+    keep_turns: int = 3  # most recent turns always sent verbatim
+    fold_turns: int = 2  # turns allowed to pile up beyond keep_turns before a fold
+    max_turns: int = 20  # stored unsummarized turns if folding falls behind or fails
+    summary_max_chars: int = 1200  # hard cap on the stored summary
+    summarize: bool = True  # False: drop turns beyond keep_turns instead of folding them
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_prefix="HISTORY_",
+        extra="ignore",
+    )
+
+
+@dataclass
+class PromptHistory:
+    """What a turn sends: the running summary and the recent turns"""
+    summary: str = ""
+    messages: List[Dict[str, str]] = field(default_factory=list)
+    pending_turns: int = 0  # unsummarized turns in the store (may exceed the sent window)
+
+    def summary_text(self) -> str:
+        """Summary block to append to the turn's context ("" if none yet)"""
+        if not self.summary:
+            return ""
+        return f"\n\nCONVERSATION SUMMARY (earlier turns):\n{self.summary}"
+
+
+class ConversationHistory:
+    """
+    Per-session history window over a SessionStore
+
+    load() before the completion, record() after it; record() starts the
+    background fold when one is due. Works from async code (the fold is an
+    asyncio task) and from blocking code (the fold runs on a daemon thread
+    with its own event loop, so the summarizer must not depend on the
+    caller's loop there). Async callers use aload() / arecord() / aclear(),
+    which keep blocking store I/O (SQLite locks, Redis round trips) off the
+    event loop.
+    """
+
+    def __init__(self, store: SessionStore, summarizer: Summarizer,
+                 config: Optional[HistoryConfig] = None):
+        """
+        Args:
+            store: Where messages and summaries live
+            summarizer: Async completion used to fold old turns
+            config: Window / summary settings (default: HISTORY_* env vars)
+        """
+        self.store = store
+        self.summarizer = summarizer
+        self.config = config or HistoryConfig()
+        self._folding: Set[str] = set()
+        self._folding_lock = threading.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def window_turns(self) -> int:
+        """Most verbatim turns a prompt can carry"""
+        if not self.config.summarize:
+            return self.config.keep_turns
+        return self.config.keep_turns + self.config.fold_turns
+
+    async def _io(self, fn: Callable, *args):
+        # Stores that block (SQLite, Redis) run on a worker thread
+        if self.store.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    def load(self, session_id: str) -> PromptHistory:
+        """
+        Summary and recent turns for the next prompt
+
+        Args:
+            session_id: Conversation
+
+        Returns:
+            PromptHistory with at most window_turns verbatim turns
+        """
+        summary, messages = self.store.get_history(session_id)
+        history = PromptHistory(
+            summary=summary,
+            messages=messages[-2 * self.window_turns:] if self.window_turns else [],
+            pending_turns=len(messages) // 2,
+        )
+        HISTORY_PROMPT_CHARS.observe(len(history.summary), part="summary")
+        HISTORY_PROMPT_CHARS.observe(sum(len(m["content"]) for m in history.messages), part="turns")
+        return history
+
+    def record(self, session_id: str, user_text: str, reply: str,
+               history: Optional[PromptHistory] = None):
+        """
+        Store a finished turn and fold older turns in the background if due
+
+        Args:
+            session_id: Conversation
+            user_text: The user's message
+            reply: The assistant's reply
+            history: What load() returned for this turn (saves a store read)
+        """
+        if self._append_turn(session_id, user_text, reply, history):
+            self._start_fold(session_id)
+
+    async def aload(self, session_id: str) -> PromptHistory:
+        """load() for async callers"""
+        return await self._io(self.load, session_id)
+
+    async def arecord(self, session_id: str, user_text: str, reply: str,
+                      history: Optional[PromptHistory] = None):
+        """record() for async callers"""
+        if await self._io(self._append_turn, session_id, user_text, reply, history):
+            self._start_fold(session_id)
+
+    def _append_turn(self, session_id: str, user_text: str, reply: str,
+                     history: Optional[PromptHistory]) -> bool:
+        """Store a finished turn; returns True if a fold is due"""
+        c = self.config
+        max_turns = max(c.max_turns, self.window_turns) if c.summarize else c.keep_turns
+        self.store.append_messages(
+            session_id,
+            [{"role": "user", "content": user_text}, {"role": "assistant", "content": reply}],
+            max_messages=2 * max_turns,
+        )
+        if not c.summarize:
+            return False
+        if history is not None:
+            turns = history.pending_turns + 1
+        else:
+            turns = len(self.store.get_messages(session_id)) // 2
+        return turns >= c.keep_turns + c.fold_turns
+
+    def clear(self, session_id: str):
+        """Forget a session's turns and summary"""
+        self.store.clear(session_id)
+
+    async def aclear(self, session_id: str):
+        """clear() for async callers"""
+        await self._io(self.clear, session_id)
+
+    def _start_fold(self, session_id: str):
+        with self._folding_lock:
+            if session_id in self._folding:
+                return
+            self._folding.add(session_id)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            threading.Thread(target=asyncio.run, args=(self.fold(session_id),),
+                             name=f"history-fold-{session_id}", daemon=True).start()
+            return
+        task = loop.create_task(self.fold(session_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def fold(self, session_id: str) -> bool:
+        """
+        Merge all but the last keep_turns stored turns into the summary
+
+        Args:
+            session_id: Conversation
+
+        Returns:
+            True if a new summary was stored
+        """
+        try:
+            summary, messages = await self._io(self.store.get_history, session_id)
+            turns = len(messages) // 2
+            if turns < self.config.keep_turns + self.config.fold_turns:
+                return False  # stale trigger: a fold already landed
+            folded = messages[:2 * (turns - self.config.keep_turns)]
+            with span("history.fold", session_id=session_id, turns=len(folded) // 2) as s:
+                updated = await self.summarizer(SUMMARY_PROMPT, _fold_request(summary, folded))
+                updated = updated.strip()[:self.config.summary_max_chars]
+                s.set_attribute("summary_chars", len(updated))
+            if not updated or not await self._io(self.store.fold_messages, session_id, folded, updated):
+                HISTORY_FOLDS.inc(outcome="conflict")
+                return False
+            HISTORY_FOLDS.inc(outcome="ok")
+            return True
+        except Exception as e:
+            HISTORY_FOLDS.inc(outcome="error")
+            logger.warning(f"⚠️  History fold failed for session {session_id}: {e}")
+            return False
+        finally:
+            with self._folding_lock:
+                self._folding.discard(session_id)
+
+    async def aclose(self, timeout: float = 5.0):
+        """Give in-flight folds a moment to finish, then cancel them (app shutdown)"""
+        tasks = list(self._tasks)
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+
+
+def _fold_request(summary: str, folded: List[Dict[str, str]]) -> str:
+    turns = "\n".join(
+        f"{'Customer' if m['role'] == 'user' else 'Assistant'}: {m['content']}" for m in folded
+    )
+    return f"Existing summary:\n{summary or '(none)'}\n\nNew turns:\n{turns}"
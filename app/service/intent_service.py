@@ -0,0 +1,172 @@
+import re
+from typing import FrozenSet, List, NamedTuple, Optional, Tuple
+
+# ============================================================================
+# ORDER IDS
+# ============================================================================
+
+_ID_SEPARATORS = re.compile(r"[\s\-_#:]+")
+_CANONICAL_ID = re.compile(r"(?:ORDER|ORD)?(\d+)")
+
+
+def normalize_order_id(raw: str) -> str:
+    """
+    Canonical order ID: "ORD" + digits
+
+    "ord-12345", "Order 12345", "#12345" and "12345" all become "ORD12345".
+    IDs that aren't ORD+digits are returned upper-cased without separators.
+
+    Args:
+        raw: Order ID as typed or spoken
+
+    Returns:
+        Canonical order ID
+    """
+    cleaned = _ID_SEPARATORS.sub("", raw.upper())
+    match = _CANONICAL_ID.fullmatch(cleaned)
+    return f"ORD{match.group(1)}" if match else cleaned
+
+
+# ============================================================================
+# SINGLE-PASS INTENT EXTRACTION
+# ============================================================================
+
+# One alternation scanned once over the text. Branch order decides overlaps
+# at the same position: an explicit order ID wins over the bare "order"
+# keyword, price phrases consume their numbers so "under 50000" isn't read
+# as an order number. The lookahead skips positions that can't start any
+# branch without trying each alternative.
+_TOKEN_PATTERN = (
+    r"(?=[abglmostuw\d])(?:"
+    r"(?P<order_id>\b(?:ord|order)[\s\-_]?(?P<order_digits>\d{5,})\b)"
+    r"|between\s*\$?\s*(?P<between_lo>\d+(?:\.\d+)?)\s*(?:and|-|to)\s*\$?\s*(?P<between_hi>\d+(?:\.\d+)?)"
+    r"|(?:under|below|less than|up to)\s*\$?\s*(?P<under>\d+(?:\.\d+)?)"
+    r"|(?:over|above|more than|greater than)\s*\$?\s*(?P<over>\d+(?:\.\d+)?)"
+    r"|\b(?P<number>\d{5,})\b"
+    r"|(?P<keyword>track|order|status|where is))"
+)
+# ASCII text is lower-cased and scanned case-sensitively (fastest); other
+# text is scanned as-is, since lower() can add characters (e.g. "İ" ->
+# "i" + combining dot) and shift word boundaries
+_TOKENS = re.compile(_TOKEN_PATTERN)
+_TOKENS_ANY_CASE = re.compile(_TOKEN_PATTERN, re.IGNORECASE)
+
+
+class Intent(NamedTuple):
+    """What one utterance asks for, as far as cheap pattern matching can tell"""
+    order_ids: Tuple[str, ...] = ()  # canonical, explicit "ORD..." mentions first
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    keywords: FrozenSet[str] = frozenset()  # order-related keywords present
+
+    @property
+    def order_id(self) -> Optional[str]:
+        return self.order_ids[0] if self.order_ids else None
+
+    @property
+    def mentions_order(self) -> bool:
+        return bool(self.keywords)
+
+    @property
+    def has_price_range(self) -> bool:
+        return self.min_price is not None or self.max_price is not None
+
+
+_NO_INTENT = Intent()
+
+
+def extract_intent(text: str) -> Intent:
+    """
+    Extract order IDs, price range and order keywords in one pass
+
+    Order IDs: "ORD12345" / "order-12345" anywhere, otherwise bare 5+ digit
+    numbers when an order keyword (track, order, status, where is) is present.
+    Price: "between A and B" takes precedence over "under X", then "over X".
+
+    Args:
+        text: User utterance
+
+    Returns:
+        Intent
+    """
+    explicit: List[str] = []
+    numbers: List[str] = []
+    keywords = set()
+    between = under = over = None
+
+    tokens = _TOKENS.finditer(text.lower()) if text.isascii() else _TOKENS_ANY_CASE.finditer(text)
+    for match in tokens:
+        kind = match.lastgroup
+        if kind == "keyword":
+            keywords.add(match.group("keyword").lower())
+        elif kind == "order_id":
+            explicit.append("ORD" + match.group("order_digits"))
+            if "order" in match.group("order_id").lower():
+                keywords.add("order")
+        elif kind == "number":
+            numbers.append("ORD" + match.group("number"))
+        elif kind == "between_hi":
+            if between is None:
+                between = (float(match.group("between_lo")), float(match.group("between_hi")))
+        elif kind == "under":
+            if under is None:
+                under = float(match.group("under"))
+        elif kind == "over":
+            if over is None:
+                over = float(match.group("over"))
+
+    if not (explicit or numbers or keywords or between or under is not None or over is not None):
+        return _NO_INTENT
+
+    min_price = max_price = None
+    if between is not None:
+        min_price, max_price = between
+    elif under is not None:
+        max_price = under
+    elif over is not None:
+        min_price = over
+
+    order_ids = explicit + numbers if keywords else explicit
+    return Intent(tuple(order_ids), min_price, max_price, frozenset(keywords))
+
+
+# ============================================================================
+# COMPARISON QUERIES
+# ============================================================================
+
+# "compare A and B", "A vs B", "difference between A and B"
+_COMPARISON = re.compile(r"\b(?:compare|comparing|vs\.?|versus|difference between)\b", re.IGNORECASE)
+_COMPARISON_LEAD = re.compile(
+    r"^\s*(?:can you\s+|please\s+)?(?:compare|comparing|what(?:'s| is) the difference between|difference between)\s+",
+    re.IGNORECASE,
+)
+# Price constraints apply to every part and are handled as a filter, not embedded
+_PRICE_TAIL = re.compile(
+    r"\s*(?:under|below|less than|up to|over|above|more than|greater than|between)\s*\$?\s*\d.*$",
+    re.IGNORECASE,
+)
+_SEPARATORS = re.compile(r"\s*(?:,|\band\b|\bvs\.?|\bversus\b|\bor\b|\bwith\b)\s*", re.IGNORECASE)
+
+
+def split_subqueries(query: str, max_parts: int = 3) -> List[str]:
+    """
+    Split a comparison utterance into one retrieval query per item
+
+    "compare headphones and earbuds under $100" -> ["headphones", "earbuds"]
+
+    Args:
+        query: User utterance
+        max_parts: Upper bound on the number of sub-queries
+
+    Returns:
+        The sub-queries, or [query] when it isn't a comparison
+    """
+    if not _COMPARISON.search(query):
+        return [query]
+
+    core = _PRICE_TAIL.sub("", _COMPARISON_LEAD.sub("", query))
+    parts = [p.strip(" ?.!") for p in _SEPARATORS.split(core)]
+    parts = [p for p in parts if len(p) > 2]
+    if len(parts) < 2:
+        return [query]
+    return parts[:max_parts]
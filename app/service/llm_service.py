@@ -1,7 +1,14 @@
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 from typing import List, Dict, Any, Optional
+import asyncio
+import time
+from app.core.http_clients import http_clients, provider_credentials
 from app.core.settings import settings
+from app.core.telemetry import span
+from app.service.conversation_history import ConversationHistory
+from app.service.llm_usage import langchain_usage, record_usage
+from app.service.session_store import MemorySessionStore
 
 class LLMService:
     """Model-agnostic LLM service using LangChain"""
@@ -16,20 +23,54 @@ class LLMService:
         self.client = client
     
     def invoke(self, query: str, system_prompt: Optional[str] = None, 
-               context: Optional[str] = None) -> str:
+               context: Optional[str] = None,
+               history: Optional[List[Dict[str, str]]] = None,
+               mode: str = "rag") -> str:
         """
         Model-agnostic invoke method
         
+        Messages are laid out for provider-side prefix caching: the system
+        prompt (keep it byte-identical across calls) with the per-turn
+        context appended, then earlier turns as chat messages, then the query.
+        
         Args:
             query: User query/message
             system_prompt: Optional system prompt
             context: Optional additional context (e.g., RAG results)
+            history: Earlier turns as {"role", "content"} dicts
+            mode: Label for the token metrics ("rag", "summary")
         
         Returns:
             LLM response as string
         """
-        messages = []
+        messages = self._messages(query, system_prompt, context, history)
+        
+        # Invoke LLM
+        with span("llm.invoke", model=getattr(self.client, "model_name", "")) as s:
+            start = time.perf_counter()
+            response = self.client.invoke(messages)
+            record_usage(s, mode, time.perf_counter() - start, **langchain_usage(response))
+        
+        return response.content
+    
+    async def ainvoke(self, query: str, system_prompt: Optional[str] = None,
+                      context: Optional[str] = None,
+                      history: Optional[List[Dict[str, str]]] = None,
+                      mode: str = "rag") -> str:
+        """
+        Non-blocking invoke for use on an event loop (same arguments as invoke)
+        """
+        messages = self._messages(query, system_prompt, context, history)
         
+        with span("llm.invoke", model=getattr(self.client, "model_name", ""), transport="async") as s:
+            start = time.perf_counter()
+            response = await self.client.ainvoke(messages)
+            record_usage(s, mode, time.perf_counter() - start, **langchain_usage(response))
+        
+        return response.content
+    
+    def _messages(self, query: str, system_prompt: Optional[str],
+                  context: Optional[str], history: Optional[List[Dict[str, str]]]) -> List[Any]:
         # Build system message
         if system_prompt:
             full_system_prompt = system_prompt
@@ -39,13 +80,14 @@ class LLMService:
         if context:
             full_system_prompt += f"\n\nRelevant Context:\n{context}"
         
-        messages.append(SystemMessage(content=full_system_prompt))
+        messages: List[Any] = [SystemMessage(content=full_system_prompt)]
+        for msg in history or []:
+            if msg["role"] == "user":
+                messages.append(HumanMessage(content=msg["content"]))
+            else:
+                messages.append(AIMessage(content=msg["content"]))
         messages.append(HumanMessage(content=query))
-        
-        # Invoke LLM
-        response = self.client.invoke(messages)
-        
-        return response.content
+        return messages
     
     def _default_system_prompt(self) -> str:
         """Default system prompt for e-commerce assistant"""
@@ -58,11 +100,19 @@ class ConversationalLLMService:
     """
     Conversational wrapper with history management
     Keeps LLMService simple and stateless
+
+    Recent turns are sent verbatim and older ones as a rolling summary
+    (app.service.conversation_history), folded on a background thread.
     """
     
-    def __init__(self, llm_service: LLMService):
+    def __init__(self, llm_service: LLMService, history: Optional[ConversationHistory] = None):
         self.llm_service = llm_service
-        self.conversations: Dict[str, List[Dict]] = {}
+        self.history = history or ConversationHistory(MemorySessionStore(), self._summarize)
+    
+    async def _summarize(self, system_prompt: str, text: str) -> str:
+        # Runs on the fold thread's own loop: use the blocking client there
+        return await asyncio.to_thread(
+            self.llm_service.invoke, text, system_prompt=system_prompt, mode="summary")
     
     def chat(self, user_message: str, room_name: str, 
              system_prompt: Optional[str] = None,
@@ -79,47 +129,18 @@ class ConversationalLLMService:
         Returns:
             Assistant's response
         """
-        # Initialize conversation history
-        if room_name not in self.conversations:
-            self.conversations[room_name] = []
-        
-        # Build messages with history
-        messages = []
-        
-        # System prompt
-        if system_prompt:
-            full_system = system_prompt
-        else:
-            full_system = self._default_system_prompt()
+        # Summary of older turns plus the recent ones, bounded per turn
+        history = self.history.load(room_name)
         
-        if context:
-            full_system += f"\n\nRelevant Context:\n{context}"
+        assistant_message = self.llm_service.invoke(
+            user_message,
+            system_prompt=system_prompt or self._default_system_prompt(),
+            context=((context or "") + history.summary_text()).lstrip(),
+            history=history.messages,
+        )
         
-        messages.append(SystemMessage(content=full_system))
-        
-        # Add conversation history (last 6 messages = 3 turns)
-        for msg in self.conversations[room_name][-6:]:
-            if msg["role"] == "user":
-                messages.append(HumanMessage(content=msg["content"]))
-            else:
-                messages.append(AIMessage(content=msg["content"]))
-        
-        # Add current message
-        messages.append(HumanMessage(content=user_message))
-        
-        # Get response
-        response = self.llm_service.client.invoke(messages)
-        assistant_message = response.content
-        
-        # Update history
-        self.conversations[room_name].append({
-            "role": "user",
-            "content": user_message
-        })
-        self.conversations[room_name].append({
-            "role": "assistant", 
-            "content": assistant_message
-        })
+        # Update history (folds older turns in the background when due)
+        self.history.record(room_name, user_message, assistant_message, history)
         
         return assistant_message
     
@@ -130,24 +151,44 @@ Help users with orders, returns, and product questions."""
     
     def reset_conversation(self, room_name: str):
         """Reset conversation history"""
-        if room_name in self.conversations:
-            self.conversations[room_name] = []
+        self.history.clear(room_name)
 
 
 # Factory function to create LLM client
 def create_llm_client() -> ChatOpenAI:
-    """Create ChatOpenAI client with OpenRouter"""
+    """
+    Create ChatOpenAI client with OpenRouter (the only place one is built)
+
+    Sync and async calls go through the shared "llm" connection pools
+    (app.core.http_clients), with their timeout and retry policy.
+    """
+    credentials = provider_credentials("llm")
     return ChatOpenAI(
         model=settings.LLM_MODEL,
-        openai_api_key=settings.OPENROUTER_API_KEY,
-        openai_api_base="https://openrouter.ai/api/v1",
+        openai_api_key=credentials["api_key"],
+        openai_api_base=credentials["base_url"],
         temperature=settings.LLM_TEMPERATURE,
         max_tokens=settings.LLM_MAX_TOKENS,
-        streaming=False
+        streaming=False,
+        http_client=http_clients.sync_client("llm"),
+        http_async_client=http_clients.async_client("llm"),
+        timeout=http_clients.timeout,
+        max_retries=http_clients.config.max_retries,
     )
 
 
-# Singleton instances
-llm_client = create_llm_client()
-llm_service = LLMService(client=llm_client)
-conversational_llm = ConversationalLLMService(llm_service)
\ No newline at end of file
+# Singleton instances, created on first access so importing this module
+# doesn't build a client (or require OPENROUTER_API_KEY)
+_SINGLETONS = {
+    "llm_client": create_llm_client,
+    "llm_service": lambda: LLMService(client=__getattr__("llm_client")),
+    "conversational_llm": lambda: ConversationalLLMService(__getattr__("llm_service")),
+}
+
+
+def __getattr__(name: str):
+    if name in _SINGLETONS:
+        value = _SINGLETONS[name]()
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
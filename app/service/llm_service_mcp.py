@@ -1,7 +1,305 @@
-# app/service/llm_service_mcp.py
-
-import anthropic
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
-
-class MCPEnabledLLMService
\ No newline at end of file
+# app/service/llm_service_mcp.py
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import anyio
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from openai import AsyncOpenAI
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from app.core.http_clients import async_openai_client
+from app.core.settings import settings
+from app.core.telemetry import registry, span
+from app.service.llm_usage import openai_usage, record_usage
+
+logger = logging.getLogger(__name__)
+
+TOOL_CALLS = registry.counter(
+    "voicebot_tool_calls_total",
+    "MCP tool calls made on behalf of the LLM by tool and outcome",
+    ("tool", "outcome"),
+)
+# The stdio transport itself broke (server exited, pipe closed): only these
+# tear the shared session down; anything else fails just the one call
+_TRANSPORT_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream,
+                     BrokenPipeError, ConnectionError)
+
+TOOL_ROUNDS = registry.histogram(
+    "voicebot_tool_rounds",
+    "LLM round trips that requested tools, per chat turn",
+    buckets=(0, 1, 2, 3, 4, 6, 8),
+)
+
+DEFAULT_SYSTEM_PROMPT = """You are a helpful e-commerce voice assistant.
+Be concise and friendly (max 2-3 sentences per response).
+Use the tools for product, price and order questions instead of guessing.
+When a request needs several lookups (e.g. an order and a product search),
+call all of those tools at once in the same turn rather than one after another."""
+
+
+class MCPConfig(BaseSettings):
+    """Tool-calling LLM configuration (MCP tool server over stdio)"""
+
+    command: str = sys.executable  # MCP server launch command
+    args: List[str] = ["-m", "app.mcp_server"]
+    max_tool_rounds: int = 4  # LLM round trips that may request tools per turn
+    tool_timeout_seconds: float = 15.0
+    connect_timeout_seconds: float = 120.0  # server start incl. model load
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_prefix="MCP_",
+        extra="ignore",
+    )
+
+
+@dataclass
+class ToolCallRecord:
+    """One executed tool call"""
+    name: str
+    arguments: Dict[str, Any]
+    result: str
+    is_error: bool = False
+    seconds: float = 0.0
+
+
+@dataclass
+class ToolChatResult:
+    """Final answer of a tool-calling turn"""
+    content: str
+    tool_calls: List[ToolCallRecord] = field(default_factory=list)
+    rounds: int = 0  # LLM round trips that requested tools
+
+
+class MCPEnabledLLMService:
+    """
+    Tool-calling LLM service backed by the MCP tool server
+
+    - One persistent MCP session (a single server process) shared by all
+      turns; it is reopened on the next call if the server goes away.
+      That is per service instance: under the pre-fork server every worker
+      starts its own app.mcp_server subprocess, each loading its own
+      embedding model (and, with an in-process vector store, its own
+      index), so budget a model's memory per worker in CHAT_MODE=tools.
+    - All tool calls the model emits in one response run concurrently, so
+      "track ORD12345 and show me cheaper earbuds" costs one tool round.
+    - At most max_tool_rounds tool rounds per turn; after that the model
+      has to answer with what it has.
+    """
+
+    def __init__(self, client: Optional[AsyncOpenAI] = None, model: Optional[str] = None,
+                 config: Optional[MCPConfig] = None):
+        """
+        Initialize the service (the MCP server starts on start() or first use)
+
+        Args:
+            client: OpenAI-compatible async client (default: OpenRouter from settings,
+                on the shared "llm" connection pool)
+            model: Model name (default: settings.LLM_MODEL)
+            config: MCPConfig (defaults from MCP_* env vars)
+        """
+        self.client = client or async_openai_client("llm")
+        self.model = model or settings.LLM_MODEL
+        self.config = config or MCPConfig()
+        self._session: Optional[ClientSession] = None
+        self._tools: List[Dict[str, Any]] = []
+        self._tool_names: frozenset = frozenset()
+        self._session_task: Optional[asyncio.Task] = None
+        self._closed: Optional[asyncio.Event] = None
+        self._connect_lock = asyncio.Lock()
+
+    # ------------------------------------------------------------------
+    # MCP session
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        """Start the MCP server and load its tool list"""
+        await self._ensure_session()
+
+    async def aclose(self):
+        """Close the MCP session and stop the server process"""
+        if self._closed is not None:
+            self._closed.set()
+        if self._session_task is not None:
+            await asyncio.gather(self._session_task, return_exceptions=True)
+            self._session_task = None
+
+    async def _ensure_session(self) -> ClientSession:
+        session = self._session
+        if session is not None:
+            return session
+
+        async with self._connect_lock:
+            if self._session is None:
+                await self.aclose()
+                ready = asyncio.get_running_loop().create_future()
+                self._closed = asyncio.Event()
+                self._session_task = asyncio.create_task(self._hold_session(ready, self._closed))
+                await asyncio.wait_for(asyncio.shield(ready), self.config.connect_timeout_seconds)
+            return self._session
+
+    async def _hold_session(self, ready: asyncio.Future, closed: asyncio.Event):
+        # The stdio transport's task group has to be entered and exited by the
+        # same task, so the session lives in this task until aclose(). The
+        # server gets the full environment (same QDRANT_* and data settings).
+        params = StdioServerParameters(command=self.config.command, args=self.config.args,
+                                       env=dict(os.environ))
+        try:
+            async with stdio_client(params) as (read_stream, write_stream):
+                async with ClientSession(read_stream, write_stream) as session:
+                    with span("mcp.connect") as s:
+                        await session.initialize()
+                        listed = await session.list_tools()
+                        s.set_attribute("tools", len(listed.tools))
+                    self._tools = [
+                        {
+                            "type": "function",
+                            "function": {
+                                "name": tool.name,
+                                "description": tool.description or "",
+                                "parameters": tool.inputSchema,
+                            },
+                        }
+                        for tool in listed.tools
+                    ]
+                    self._tool_names = frozenset(tool.name for tool in listed.tools)
+                    self._session = session
+                    logger.info(f"✅ MCP session ready ({', '.join(t.name for t in listed.tools)})")
+                    ready.set_result(None)
+                    await closed.wait()
+        except BaseException as e:
+            if not ready.done():
+                ready.set_exception(e if isinstance(e, Exception) else RuntimeError("MCP session cancelled"))
+            elif not closed.is_set():
+                logger.error(f"❌ MCP session lost: {e!r}")
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            self._session = None
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> ToolCallRecord:
+        """
+        Execute one tool on the MCP server
+
+        Args:
+            name: Tool name
+            arguments: Tool arguments
+
+        Returns:
+            ToolCallRecord (errors are returned to the model, not raised)
+        """
+        start = time.perf_counter()
+        session = None
+        with span("mcp.call_tool", tool=name) as s:
+            try:
+                session = await self._ensure_session()
+                result = await asyncio.wait_for(session.call_tool(name, arguments),
+                                                self.config.tool_timeout_seconds)
+                text = "\n".join(c.text for c in result.content if c.type == "text")
+                is_error = bool(result.isError)
+            except asyncio.TimeoutError:
+                text, is_error = f"Tool {name} timed out", True
+            except _TRANSPORT_ERRORS as e:
+                # Reconnect on the next call; other calls of the same parallel
+                # batch are failing the same way, and only the first drops it
+                text, is_error = f"Tool {name} failed: {e!r}", True
+                self._drop_session(session)
+            except Exception as e:
+                # Bad arguments, protocol / server errors: the session is fine
+                text, is_error = f"Tool {name} failed: {e}", True
+            s.set_attribute("error", is_error)
+        TOOL_CALLS.inc(tool=self._tool_label(name), outcome="error" if is_error else "ok")
+        return ToolCallRecord(name, arguments, text, is_error, round(time.perf_counter() - start, 4))
+
+    def _tool_label(self, name: str) -> str:
+        """Metric label for a tool name the model emitted (bounded: unknown names share one)"""
+        return name if name in self._tool_names else "unknown"
+
+    def _drop_session(self, session: Optional[ClientSession]):
+        """Close session if it is still the current one"""
+        if session is None or self._session is not session:
+            return
+        self._session = None
+        if self._closed is not None:
+            self._closed.set()
+
+    # ------------------------------------------------------------------
+    # Chat
+    # ------------------------------------------------------------------
+
+    async def chat(self, user_message: str, history: Optional[List[Dict[str, str]]] = None,
+                   system_prompt: Optional[str] = None) -> ToolChatResult:
+        """
+        Answer one user turn, calling MCP tools as the model requests them
+
+        Args:
+            user_message: User's message
+            history: Earlier turns as {"role", "content"} dicts
+            system_prompt: Optional system prompt (default: DEFAULT_SYSTEM_PROMPT)
+
+        Returns:
+            ToolChatResult with the answer and the tool calls that were made
+        """
+        await self._ensure_session()
+        messages: List[Dict[str, Any]] = [{"role": "system", "content": system_prompt or DEFAULT_SYSTEM_PROMPT}]
+        messages.extend({"role": m["role"], "content": m["content"]} for m in history or [])
+        messages.append({"role": "user", "content": user_message})
+
+        records: List[ToolCallRecord] = []
+        rounds = 0
+        with span("llm.tool_chat", model=self.model) as s:
+            while True:
+                # Out of tool rounds: tools stay declared (the transcript holds
+                # tool calls, and the cached prefix must not change) but the
+                # model must answer
+                allow_tools = rounds < self.config.max_tool_rounds
+                message = await self._complete(messages, allow_tools)
+                if not allow_tools or not message.tool_calls:
+                    break
+
+                rounds += 1
+                messages.append(message.model_dump(exclude_none=True))
+                batch = await asyncio.gather(*(self._run_tool_call(tc) for tc in message.tool_calls))
+                for tool_call, record in zip(message.tool_calls, batch):
+                    records.append(record)
+                    messages.append({"role": "tool", "tool_call_id": tool_call.id, "content": record.result})
+
+            s.set_attribute("rounds", rounds)
+            s.set_attribute("tool_calls", len(records))
+        TOOL_ROUNDS.observe(rounds)
+        return ToolChatResult(message.content or "", records, rounds)
+
+    async def _complete(self, messages: List[Dict[str, Any]], allow_tools: bool):
+        kwargs: Dict[str, Any] = {}
+        if self._tools:
+            kwargs = {"tools": self._tools, "tool_choice": "auto" if allow_tools else "none"}
+            if allow_tools:
+                kwargs["parallel_tool_calls"] = True
+        with span("llm.invoke", model=self.model, tools=allow_tools and bool(self._tools)) as s:
+            start = time.perf_counter()
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=settings.LLM_TEMPERATURE,
+                max_tokens=settings.LLM_MAX_TOKENS,
+                **kwargs,
+            )
+            record_usage(s, "tools", time.perf_counter() - start, **openai_usage(response))
+        return response.choices[0].message
+
+    async def _run_tool_call(self, tool_call) -> ToolCallRecord:
+        name = tool_call.function.name
+        try:
+            arguments = json.loads(tool_call.function.arguments or "{}")
+        except json.JSONDecodeError as e:
+            TOOL_CALLS.inc(tool=self._tool_label(name), outcome="error")
+            return ToolCallRecord(name, {}, f"Invalid arguments for {name}: {e}", is_error=True)
+        return await self.call_tool(name, arguments)
@@ -0,0 +1,72 @@
+"""
+LLM token accounting
+
+Input / cached-input / output token counters and request latency split by
+prompt-cache hit, recorded for every completion (RAG and tool-calling
+paths). Cached tokens are the prompt prefix the provider served from its
+prompt cache (OpenAI / OpenRouter report them in the usage block); their
+share of input tokens is the cost reduction, and the hit vs miss latency
+histograms show the time-to-first-token effect (completions are not
+streamed, so request latency is first token plus generation).
+"""
+
+from typing import Any, Optional
+
+from app.core.telemetry import Span, registry
+
+LLM_TOKENS = registry.counter(
+    "voicebot_llm_tokens_total",
+    "LLM tokens by chat mode and kind (input, cached_input, output)",
+    ("mode", "kind"),
+)
+LLM_REQUEST_SECONDS = registry.histogram(
+    "voicebot_llm_request_seconds",
+    "LLM request latency by chat mode and whether part of the prompt was cached",
+    ("mode", "cache"),
+)
+
+
+def record_usage(s: Span, mode: str, seconds: float, input_tokens: int = 0,
+                 output_tokens: int = 0, cached_tokens: Optional[int] = 0):
+    """
+    Record one completion's token usage on its span and in the metrics
+
+    Args:
+        s: The llm.invoke span
+        mode: "rag", "tools" or "summary" (history folds)
+        seconds: Request latency
+        input_tokens: Prompt tokens (including cached ones)
+        output_tokens: Completion tokens
+        cached_tokens: Prompt tokens read from the provider's cache
+    """
+    cached_tokens = cached_tokens or 0
+    s.set_attribute("input_tokens", input_tokens)
+    s.set_attribute("output_tokens", output_tokens)
+    s.set_attribute("cached_tokens", cached_tokens)
+    LLM_TOKENS.inc(input_tokens, mode=mode, kind="input")
+    LLM_TOKENS.inc(cached_tokens, mode=mode, kind="cached_input")
+    LLM_TOKENS.inc(output_tokens, mode=mode, kind="output")
+    LLM_REQUEST_SECONDS.observe(seconds, mode=mode, cache="hit" if cached_tokens else "miss")
+
+
+def langchain_usage(response: Any) -> dict:
+    """record_usage() keyword arguments from a LangChain AIMessage"""
+    usage = getattr(response, "usage_metadata", None) or {}
+    return {
+        "input_tokens": usage.get("input_tokens", 0),
+        "output_tokens": usage.get("output_tokens", 0),
+        "cached_tokens": (usage.get("input_token_details") or {}).get("cache_read", 0),
+    }
+
+
+def openai_usage(response: Any) -> dict:
+    """record_usage() keyword arguments from an OpenAI ChatCompletion"""
+    usage = response.usage
+    if usage is None:
+        return {}
+    details = usage.prompt_tokens_details
+    return {
+        "input_tokens": usage.prompt_tokens,
+        "output_tokens": usage.completion_tokens,
+        "cached_tokens": details.cached_tokens if details is not None else 0,
+    }
@@ -0,0 +1,498 @@
+import asyncio
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from qdrant_client.models import FieldCondition, Filter, HasIdCondition, MatchAny, MatchValue
+
+from app.config.qdrant_config import QdrantConfig
+from app.config.vector_store_config import VectorStoreConfig
+from app.core.telemetry import span
+from app.service.qdrant_service import BatchQuery, PayloadSelection, point_id, source_filter
+from app.service.vector_store import VectorStore
+
+# Below this many vectors a search takes well under a millisecond, so the
+# async methods run it inline instead of paying for a thread hop
+INLINE_SEARCH_ROWS = 20000
+
+
+@dataclass
+class StoredPoint:
+    """A search / retrieve result (same attributes as Qdrant's points)"""
+    id: str
+    payload: Optional[Dict[str, Any]]
+    score: float = 0.0
+    vector: Optional[List[float]] = None
+
+
+@dataclass
+class _Snapshot:
+    """Immutable contents of one collection; writes swap in a new snapshot"""
+    ids: List[str]
+    rows: Dict[str, int]
+    vectors: np.ndarray  # (n, dim), unit rows
+    payloads: List[Dict[str, Any]]
+    columns: Dict[str, Any] = field(default_factory=dict)  # payload key -> cached column
+
+    def keyword_column(self, key: str):
+        """(value -> code, int32 codes) for equality filters"""
+        cached = self.columns.get(("keyword", key))
+        if cached is None:
+            lookup: Dict[Any, int] = {}
+            codes = np.fromiter(
+                (lookup.setdefault(_hashable(p.get(key)), len(lookup)) for p in self.payloads),
+                dtype=np.int32, count=len(self.payloads))
+            cached = self.columns[("keyword", key)] = (lookup, codes)
+        return cached
+
+    def numeric_column(self, key: str) -> np.ndarray:
+        """float64 values (NaN where missing / not a number) for range filters"""
+        cached = self.columns.get(("numeric", key))
+        if cached is None:
+            cached = self.columns[("numeric", key)] = np.fromiter(
+                (_as_float(p.get(key)) for p in self.payloads), dtype=np.float64, count=len(self.payloads))
+        return cached
+
+
+def _hashable(value: Any) -> Any:
+    return value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
+
+
+def _as_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _json_default(value: Any) -> Any:
+    # NumPy / pandas scalars from CSV rows
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def _unit_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _project(payload: Dict[str, Any], with_payload: PayloadSelection) -> Optional[Dict[str, Any]]:
+    # Mirrors Qdrant: no payload -> None, a key list -> only the keys present
+    if with_payload is True:
+        return payload
+    if not with_payload:
+        return None
+    return {key: payload[key] for key in with_payload if key in payload}
+
+
+class _Collection:
+    def __init__(self, dim: int, snapshot: Optional[_Snapshot] = None):
+        self.dim = dim
+        self.snapshot = snapshot or _Snapshot([], {}, np.empty((0, dim), dtype=np.float32), [])
+        self.dirty = False
+
+    def upsert(self, ids: Sequence[str], vectors: np.ndarray, payloads: Sequence[Dict[str, Any]]):
+        old = self.snapshot
+        new_ids = list(old.ids)
+        rows = dict(old.rows)
+        new_payloads = list(old.payloads)
+        targets = []
+        for pid, payload in zip(ids, payloads):
+            row = rows.get(pid)
+            if row is None:
+                row = rows[pid] = len(new_ids)
+                new_ids.append(pid)
+                new_payloads.append(payload)
+            else:
+                new_payloads[row] = payload
+            targets.append(row)
+
+        matrix = np.empty((len(new_ids), self.dim), dtype=np.float32)
+        matrix[:len(old.ids)] = old.vectors
+        matrix[targets] = vectors
+        self.snapshot = _Snapshot(new_ids, rows, matrix, new_payloads)
+        self.dirty = True
+
+    def delete(self, ids: Sequence[str]):
+        old = self.snapshot
+        drop = {old.rows[pid] for pid in ids if pid in old.rows}
+        if not drop:
+            return
+        keep = np.ones(len(old.ids), dtype=bool)
+        keep[list(drop)] = False
+        new_ids = [pid for pid, kept in zip(old.ids, keep) if kept]
+        self.snapshot = _Snapshot(
+            new_ids,
+            {pid: row for row, pid in enumerate(new_ids)},
+            old.vectors[keep],
+            [p for p, kept in zip(old.payloads, keep) if kept],
+        )
+        self.dirty = True
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    In-process brute-force vector index
+
+    Each collection is one contiguous (n, dim) float32 matrix of unit
+    vectors. A search is a single matrix product and an
+    argpartition top-k; batched searches share one product. Payload
+    filters (the same qdrant_client Filter objects QdrantService takes)
+    become boolean masks over cached payload columns. There is no network
+    hop, no server to run and the results are exact, which beats an HNSW
+    index over HTTP up to tens of thousands of vectors (see
+    benchmarks/vector_store_crossover.py).
+
+    With a path, collections are persisted as vectors.npy + points.json
+    (written by flush() and publish()) and loaded with mmap_mode="r", so
+    worker processes share one copy through the page cache. Versions
+    published by another process are picked up on the next lookup:
+    aliases.json is re-read when it changes and collections this process
+    hasn't seen are loaded on first use.
+    """
+
+    def __init__(self, config: QdrantConfig, store_config: Optional[VectorStoreConfig] = None):
+        """
+        Open (or create) the store
+
+        Args:
+            config: QdrantConfig (collection_name and vector_size are used)
+            store_config: VectorStoreConfig (path, mmap)
+        """
+        self.config = config
+        self.store_config = store_config or VectorStoreConfig(backend="numpy")
+        self.collection_name = config.collection_name
+        self.dim = config.vector_size
+        self.path = self.store_config.path
+        self._collections: Dict[str, _Collection] = {}
+        self._aliases: Dict[str, str] = {}
+        self._aliases_stat: Optional[tuple] = None  # aliases.json (inode, mtime, size) last read
+        self._lock = threading.RLock()
+
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+            self._load()
+        if self.collection_name not in self._aliases:
+            self.publish(self.create_collection_version())
+
+    @property
+    def persistent(self) -> bool:
+        return bool(self.path)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _collection_dir(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _load(self):
+        self._refresh_aliases()
+        for name in sorted(os.listdir(self.path)):
+            self._load_collection(name)
+        print(f"✅ Loaded {len(self._collections)} vector collection(s) from {self.path}")
+
+    def _load_collection(self, name: str) -> bool:
+        """Load a persisted collection into _collections; False if it isn't on disk"""
+        directory = self._collection_dir(name)
+        try:
+            with open(os.path.join(directory, "points.json")) as f:
+                points = json.load(f)
+            vectors = np.load(os.path.join(directory, "vectors.npy"),
+                              mmap_mode="r" if self.store_config.mmap else None)
+        except (FileNotFoundError, NotADirectoryError):
+            return False  # not a collection, or dropped by another process
+        if vectors.dtype != np.float32:
+            # Saved by a release that offered float16 (scored ~10x slower); widen once
+            vectors = vectors.astype(np.float32)
+        ids = points["ids"]
+        snapshot = _Snapshot(ids, {pid: row for row, pid in enumerate(ids)},
+                             vectors, points["payloads"])
+        self._collections[name] = _Collection(self.dim, snapshot)
+        return True
+
+    def _refresh_aliases(self):
+        """Re-read aliases.json if another process replaced it since the last read"""
+        try:
+            st = os.stat(os.path.join(self.path, "aliases.json"))
+        except FileNotFoundError:
+            return
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if key == self._aliases_stat:
+            return
+        with open(os.path.join(self.path, "aliases.json")) as f:
+            self._aliases = json.load(f)
+        self._aliases_stat = key
+        # Forget versions other processes dropped (a search already holding
+        # one keeps its snapshot; mmapped files stay readable until unmapped)
+        served = set(self._aliases.values())
+        for name, collection in list(self._collections.items()):
+            if (name not in served and not collection.dirty
+                    and not os.path.isdir(self._collection_dir(name))):
+                del self._collections[name]
+
+    def _save(self, name: str):
+        collection = self._collections[name]
+        snapshot = collection.snapshot
+        directory = self._collection_dir(name)
+        os.makedirs(directory, exist_ok=True)
+        # Write-then-rename, so a reader never sees a half-written file
+        with open(os.path.join(directory, "vectors.npy.tmp"), "wb") as f:
+            np.save(f, np.ascontiguousarray(snapshot.vectors))
+        with open(os.path.join(directory, "points.json.tmp"), "w") as f:
+            json.dump({"ids": snapshot.ids, "payloads": snapshot.payloads}, f, default=_json_default)
+        os.replace(os.path.join(directory, "vectors.npy.tmp"), os.path.join(directory, "vectors.npy"))
+        os.replace(os.path.join(directory, "points.json.tmp"), os.path.join(directory, "points.json"))
+        collection.dirty = False
+
+    def _save_aliases(self):
+        tmp = os.path.join(self.path, "aliases.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self._aliases, f)
+        os.replace(tmp, os.path.join(self.path, "aliases.json"))
+        st = os.stat(os.path.join(self.path, "aliases.json"))
+        self._aliases_stat = (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def flush(self):
+        """Persist collections changed since the last flush (no-op without a path)"""
+        if not self.path:
+            return
+        with self._lock, span("vector_store.flush"):
+            for name, collection in self._collections.items():
+                if collection.dirty:
+                    self._save(name)
+
+    def close(self):
+        self.flush()
+
+    # ------------------------------------------------------------------
+    # Collections
+    # ------------------------------------------------------------------
+
+    def _sync(self):
+        """Pick up aliases published by other processes (no-op without a path)"""
+        if self.path:
+            with self._lock:
+                self._refresh_aliases()
+
+    def _collection(self, name: Optional[str] = None) -> _Collection:
+        name = name or self.collection_name
+        self._sync()
+        resolved = self._aliases.get(name, name)
+        collection = self._collections.get(resolved)
+        if collection is None and self.path:
+            with self._lock:
+                if resolved not in self._collections:
+                    self._load_collection(resolved)
+                collection = self._collections.get(resolved)
+        if collection is None:
+            raise ValueError(f"Collection '{name}' not found")
+        return collection
+
+    def active_collection(self) -> str:
+        self._sync()
+        return self._aliases.get(self.collection_name, self.collection_name)
+
+    def create_collection_version(self) -> str:
+        name = f"{self.collection_name}_{time.strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        with self._lock:
+            self._collections[name] = _Collection(self.dim)
+            self._collections[name].dirty = True
+        return name
+
+    def publish(self, collection_name: str) -> Optional[str]:
+        with self._lock:
+            self._sync()  # previous must be what is served now, not what this process last saw
+            previous = self._aliases.get(self.collection_name)
+            if self.path:
+                self.flush()
+                self._aliases[self.collection_name] = collection_name
+                self._save_aliases()
+            else:
+                self._aliases[self.collection_name] = collection_name
+        return previous
+
+    def drop_collection(self, collection_name: str):
+        with self._lock:
+            self._collections.pop(collection_name, None)
+            if self.path and os.path.isdir(self._collection_dir(collection_name)):
+                shutil.rmtree(self._collection_dir(collection_name))
+
+    def collection_info(self, max_age: Optional[float] = None) -> Dict[str, Any]:
+        points = len(self._collection().snapshot.ids)
+        return {
+            "collection": self.active_collection(),
+            "status": "green",
+            "optimizer_status": "ok",
+            "points_count": points,
+            "indexed_vectors_count": points,
+            "segments_count": 1,
+            "backend": "numpy",
+            "dtype": "float32",
+            "age_seconds": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def add(self, vectors: List[List[float]], payloads: List[Dict[str, Any]],
+            keys: Optional[List[str]] = None,
+            collection_name: Optional[str] = None) -> List[str]:
+        if keys is not None:
+            ids = [point_id(key) for key in keys]
+        else:
+            ids = [str(uuid.uuid4()) for _ in vectors]
+        matrix = _unit_rows(np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim))
+        with self._lock, span("vector_store.upsert", points=len(ids)):
+            self._collection(collection_name).upsert(ids, matrix, payloads)
+        return ids
+
+    def content_hashes(self, source: str, collection_name: Optional[str] = None) -> Dict[str, str]:
+        snapshot = self._collection(collection_name).snapshot
+        mask = self._filter_mask(snapshot, source_filter(source))
+        return {snapshot.ids[row]: snapshot.payloads[row].get("content_hash", "")
+                for row in np.flatnonzero(mask)}
+
+    def copy_points(self, point_ids: List[str], source_collection: str,
+                    target_collection: str, batch_size: int = 256) -> int:
+        source = self._collection(source_collection).snapshot
+        rows = [source.rows[pid] for pid in point_ids if pid in source.rows]
+        with self._lock, span("vector_store.copy_points", points=len(rows)):
+            self._collection(target_collection).upsert(
+                [source.ids[r] for r in rows],
+                np.asarray(source.vectors[rows], dtype=np.float32),
+                [source.payloads[r] for r in rows],
+            )
+        return len(rows)
+
+    def delete(self, point_ids: List[str], collection_name: Optional[str] = None):
+        with self._lock:
+            self._collection(collection_name).delete([str(pid) for pid in point_ids])
+
+    # ------------------------------------------------------------------
+    # Filters
+    # ------------------------------------------------------------------
+
+    def _filter_mask(self, snapshot: _Snapshot, query_filter: Optional[Filter]) -> Optional[np.ndarray]:
+        """Boolean mask of points matching the filter (None = no filter)"""
+        if query_filter is None:
+            return None
+        n = len(snapshot.ids)
+        mask = np.ones(n, dtype=bool)
+        for condition in query_filter.must or []:
+            mask &= self._condition_mask(snapshot, condition)
+        for condition in query_filter.must_not or []:
+            mask &= ~self._condition_mask(snapshot, condition)
+        if query_filter.should:
+            any_of = np.zeros(n, dtype=bool)
+            for condition in query_filter.should:
+                any_of |= self._condition_mask(snapshot, condition)
+            mask &= any_of
+        return mask
+
+    def _condition_mask(self, snapshot: _Snapshot, condition) -> np.ndarray:
+        if isinstance(condition, Filter):
+            return self._filter_mask(snapshot, condition)
+        if isinstance(condition, HasIdCondition):
+            wanted = {str(pid) for pid in condition.has_id}
+            return np.fromiter((pid in wanted for pid in snapshot.ids), dtype=bool, count=len(snapshot.ids))
+        if not isinstance(condition, FieldCondition):
+            raise NotImplementedError(f"Unsupported filter condition: {type(condition).__name__}")
+
+        if isinstance(condition.match, MatchValue):
+            lookup, codes = snapshot.keyword_column(condition.key)
+            return codes == lookup.get(_hashable(condition.match.value), -1)
+        if isinstance(condition.match, MatchAny):
+            lookup, codes = snapshot.keyword_column(condition.key)
+            return np.isin(codes, [lookup[v] for v in condition.match.any if v in lookup])
+        if condition.range is not None:
+            values = snapshot.numeric_column(condition.key)
+            mask = ~np.isnan(values)
+            bounds = condition.range
+            if bounds.gte is not None:
+                mask &= values >= bounds.gte
+            if bounds.gt is not None:
+                mask &= values > bounds.gt
+            if bounds.lte is not None:
+                mask &= values <= bounds.lte
+            if bounds.lt is not None:
+                mask &= values < bounds.lt
+            return mask
+        raise NotImplementedError(f"Unsupported condition on '{condition.key}'")
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def _search_many(self, queries: List[BatchQuery]) -> List[List[StoredPoint]]:
+        snapshot = self._collection().snapshot
+        if not len(snapshot.ids) or not queries:
+            return [[] for _ in queries]
+        matrix = _unit_rows(np.asarray([q.vector for q in queries], dtype=np.float32))
+        scores = snapshot.vectors @ matrix.T  # cosine similarity, (n, len(queries))
+
+        results = []
+        for column, query in enumerate(queries):
+            s = scores[:, column]
+            mask = self._filter_mask(snapshot, query.query_filter)
+            if mask is not None:
+                s = np.where(mask, s, -np.inf)
+                available = int(np.count_nonzero(mask))
+            else:
+                available = len(s)
+            k = min(query.limit, available)
+            if k <= 0:
+                results.append([])
+                continue
+            top = np.argpartition(-s, k - 1)[:k] if k < len(s) else np.arange(len(s))
+            top = top[np.argsort(-s[top], kind="stable")][:k]
+            results.append([
+                StoredPoint(snapshot.ids[r], _project(snapshot.payloads[r], query.with_payload), float(s[r]))
+                for r in top
+            ])
+        return results
+
+    def count(self, exact: bool = False) -> int:
+        return len(self._collection().snapshot.ids)
+
+    def search(self, query_vector: List[float], limit: int = 5,
+               query_filter: Optional[Filter] = None,
+               with_payload: PayloadSelection = True) -> List[StoredPoint]:
+        with span("vector_store.search", limit=limit) as s:
+            points = self._search_many([BatchQuery(query_vector, limit, query_filter, with_payload)])[0]
+            s.set_attribute("results", len(points))
+        return points
+
+    async def search_async(self, query_vector: List[float], limit: int = 5,
+                           query_filter: Optional[Filter] = None,
+                           with_payload: PayloadSelection = True) -> List[StoredPoint]:
+        if self.count() <= INLINE_SEARCH_ROWS:
+            return self.search(query_vector, limit, query_filter, with_payload)
+        return await asyncio.to_thread(self.search, query_vector, limit, query_filter, with_payload)
+
+    def search_batch(self, queries: List[BatchQuery]) -> List[List[StoredPoint]]:
+        with span("vector_store.search_batch", queries=len(queries)) as s:
+            results = self._search_many(queries)
+            s.set_attribute("results", sum(len(r) for r in results))
+        return results
+
+    async def search_batch_async(self, queries: List[BatchQuery]) -> List[List[StoredPoint]]:
+        if self.count() <= INLINE_SEARCH_ROWS:
+            return self.search_batch(queries)
+        return await asyncio.to_thread(self.search_batch, queries)
+
+    def retrieve(self, point_ids: List[str], with_payload: PayloadSelection = True) -> List[StoredPoint]:
+        snapshot = self._collection().snapshot
+        rows = [snapshot.rows[str(pid)] for pid in point_ids if str(pid) in snapshot.rows]
+        return [StoredPoint(snapshot.ids[r], _project(snapshot.payloads[r], with_payload)) for r in rows]
+
+    async def retrieve_async(self, point_ids: List[str],
+                             with_payload: PayloadSelection = True) -> List[StoredPoint]:
+        return self.retrieve(point_ids, with_payload)
@@ -1,6 +1,39 @@
 import pandas as pd
 from typing import Optional, Dict, List
 import os
+import re
+
+from app.service.intent_service import normalize_order_id
+
+# Items are separated by commas (or ; / |); older rows only by the
+# whitespace after an "x<qty>" suffix ("A x2 B x1")
+_ITEM_DELIMITER = re.compile(r"\s*[,;|]\s*")
+_QUANTITY = re.compile(r"\s+x(\d+)\b\s*")
+
+
+def parse_items(items_str: str) -> List[Dict]:
+    """
+    Parse an order's items column
+
+    Args:
+        items_str: e.g. "Earbuds x2, Charger" or "Earbuds x2 Charger x1"
+
+    Returns:
+        [{"name", "quantity"}] in order; quantity defaults to 1
+    """
+    items = []
+    for chunk in _ITEM_DELIMITER.split(items_str):
+        start = 0
+        for match in _QUANTITY.finditer(chunk):
+            name = chunk[start:match.start()].strip()
+            if name:
+                items.append({"name": name, "quantity": int(match.group(1))})
+            start = match.end()
+        rest = chunk[start:].strip()
+        if rest:
+            items.append({"name": rest, "quantity": 1})
+    return items
+
 
 class OrderService:
     """Order service that loads from CSV"""
@@ -26,27 +59,10 @@ class OrderService:
             df = pd.read_csv(self.csv_path)
             
             for _, row in df.iterrows():
-                order_id = row['order_id']
+                order_id = normalize_order_id(str(row['order_id']))
                 
-                # Parse items (format: "Product x2, Product2 x1")
-                items = []
-                if pd.notna(row['items']):
-                    items_str = str(row['items'])
-                    # Split by commas or common separators
-                    item_parts = items_str.split(',') if ',' in items_str else [items_str]
-                    
-                    for item_part in item_parts:
-                        item_part = item_part.strip()
-                        # Try to extract quantity (e.g., "Product x2")
-                        if ' x' in item_part:
-                            name, qty = item_part.rsplit(' x', 1)
-                            try:
-                                quantity = int(qty)
-                            except:
-                                quantity = 1
-                            items.append({"name": name.strip(), "quantity": quantity})
-                        else:
-                            items.append({"name": item_part, "quantity": 1})
+                # Parse items ("Product x2, Product2" or "Product x2 Product2 x1")
+                items = parse_items(str(row['items'])) if pd.notna(row['items']) else []
                 
                 # Build order object
                 order = {
@@ -84,13 +100,17 @@ class OrderService:
             print(f"❌ Error loading orders: {e}")
     
     def track_order(self, order_id: str) -> Optional[Dict]:
-        """Track order by ID"""
-        # Normalize order ID (case-insensitive, remove spaces)
-        order_id = order_id.upper().replace(" ", "")
-        
-        if order_id in self.orders:
-            return self.orders[order_id]
-        return None
+        """Track order by ID ("ORD12345", "ord-12345", "12345", ...)"""
+        return self.orders.get(normalize_order_id(order_id))
+    
+    async def track_order_async(self, order_id: str) -> Optional[Dict]:
+        """
+        Async seam for order lookups (the retrieval pipeline awaits this)
+
+        The CSV index is an in-memory dict, so this returns directly; a
+        database- or API-backed store overrides it with real I/O.
+        """
+        return self.track_order(order_id)
     
     def get_order_status(self, order_id: str) -> Optional[str]:
         """Get just the status of an order"""
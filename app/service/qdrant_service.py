@@ -1,17 +1,98 @@
+import asyncio
+import threading
+import time
 from app.config.qdrant_config import QdrantConfig
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from qdrant_client.models import (
+    CreateAlias,
+    CreateAliasOperation,
+    DeleteAlias,
+    DeleteAliasOperation,
+    Disabled,
     Distance,
+    CollectionParamsDiff,
+    FieldCondition,
+    Filter,
+    HnswConfigDiff,
+    MatchValue,
+    OptimizersConfigDiff,
+    PayloadSchemaType,
+    QuantizationSearchParams,
+    QueryRequest,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
     VectorParams,
+    VectorParamsDiff,
     PointStruct,
 )
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Sequence, Union
 import uuid
+from app.core.http_clients import http_clients
+from app.core.telemetry import span
+from app.service.vector_store import VectorStore
 
-class QdrantService:
+# Fixed namespace for point IDs: the same key always maps to the same point,
+# so re-ingesting a row overwrites it instead of adding a duplicate
+POINT_ID_NAMESPACE = uuid.UUID("6f1c1f7e-3b1a-5d1e-9a4e-2f6b8c0d4e21")
+
+
+def point_id(key: str) -> str:
+    """Deterministic UUIDv5 point ID for a stable key (e.g. "products:<name>")"""
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, key))
+
+
+# Payload fields used in filters (per-CSV source, price range); indexed on
+# server collections so filtered searches don't scan every payload
+PAYLOAD_INDEXES = {"source": PayloadSchemaType.KEYWORD, "price": PayloadSchemaType.FLOAT}
+
+# Qdrant's own defaults, sent by apply_tuning() for settings a profile leaves
+# unset (a diff that omits a field keeps the collection's current value)
+DEFAULT_HNSW_M = 16
+DEFAULT_HNSW_EF_CONSTRUCT = 100
+DEFAULT_INDEXING_THRESHOLD = 20000
+DEFAULT_MEMMAP_THRESHOLD = 0  # memory-mapping disabled
+
+# (url, collection) pairs already verified/created in this process, so
+# constructing another QdrantService (DI helpers, agent container) skips the round trip
+_known_collections = set()
+_known_collections_lock = threading.Lock()
+
+
+# What a search/retrieve returns per point: True = every payload field,
+# False = IDs and scores only (fetch payloads for the winners later with
+# retrieve), or just the named payload keys. Vectors are never returned.
+PayloadSelection = Union[bool, Sequence[str]]
+
+
+def payload_selector(with_payload: PayloadSelection):
+    """Qdrant's with_payload argument for a PayloadSelection"""
+    return with_payload if isinstance(with_payload, bool) else list(with_payload)
+
+
+@dataclass
+class BatchQuery:
+    """One retrieval in a search_batch call"""
+    vector: List[float]
+    limit: int = 5
+    query_filter: Optional[Filter] = None
+    with_payload: PayloadSelection = True
+
+
+def source_filter(source: str) -> Filter:
+    """Match points ingested from one CSV (payload["source"], e.g. "products")"""
+    return Filter(must=[FieldCondition(key="source", match=MatchValue(value=source))])
+
+
+class QdrantService(VectorStore):
     """
     Qdrant vector database service
-    Single user - no datapoint management needed
+    
+    collection_name is an alias over versioned collections, so a rebuilt
+    index can be published atomically (create_collection_version -> fill ->
+    publish -> drop_collection on the previous one).
     """
     
     def __init__(self, config: QdrantConfig):
@@ -22,56 +103,319 @@ class QdrantService:
             config: QdrantConfig instance
         """
         self.config = config
-        self.client = QdrantClient(url=config.url)
+        if config.url == ":memory:":
+            # In-process local mode (tests/benchmarks) - no server needed
+            self.client = QdrantClient(location=":memory:")
+        else:
+            # qdrant_client turns keep-alive off for localhost by default; use the shared pool policy
+            self.client = QdrantClient(url=config.url, api_key=config.api_key, limits=http_clients.limits)
+        self._async_client: Optional[AsyncQdrantClient] = None
         self.collection_name = config.collection_name
+        self._info_cache: Optional[Dict[str, Any]] = None
+        self._info_cached_at = 0.0
         self._ensure_collection()
     
+    @property
+    def persistent(self) -> bool:
+        return self.config.url != ":memory:"
+
+    @property
+    def async_client(self) -> AsyncQdrantClient:
+        """
+        Shared async client (gRPC when prefer_grpc), created on first use
+        so its connection/channel is reused across searches
+        """
+        if self._async_client is None:
+            self._async_client = AsyncQdrantClient(
+                url=self.config.url,
+                api_key=self.config.api_key,
+                prefer_grpc=self.config.prefer_grpc,
+                grpc_port=self.config.grpc_port,
+                limits=http_clients.limits,
+            )
+        return self._async_client
+
     def _ensure_collection(self):
-        """Create collection if it doesn't exist"""
-        collections = self.client.get_collections().collections
-        collection_names = [c.name for c in collections]
+        """
+        Create the collection if it doesn't exist
+
+        New collections are versioned ("<name>_<timestamp>") behind an alias
+        named collection_name, so full rebuilds can be swapped in atomically.
+        A plain collection from older deployments is used as-is until the
+        first publish().
+        """
+        # In-memory stores are per client, so only server collections are cached
+        key = (self.config.url, self.collection_name)
+        if self.config.url != ":memory:" and key in _known_collections:
+            return
         
-        if self.collection_name not in collection_names:
-            self.client.create_collection(
-                collection_name=self.collection_name,
-                vectors_config=VectorParams(
-                    size=self.config.vector_size,
-                    distance=Distance.COSINE
+        with _known_collections_lock:
+            # collection_exists resolves aliases; it's one lookup instead of listing everything
+            if not self.client.collection_exists(self.collection_name):
+                self._set_alias(self.create_collection_version())
+            if self.config.url != ":memory:":
+                _known_collections.add(key)
+
+    def _alias_target(self) -> Optional[str]:
+        for alias in self.client.get_aliases().aliases:
+            if alias.alias_name == self.collection_name:
+                return alias.collection_name
+        return None
+
+    def _set_alias(self, collection_name: str):
+        # Delete + create in one request: Qdrant applies alias changes atomically
+        operations = []
+        if self._alias_target() is not None:
+            operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=self.collection_name)))
+        operations.append(CreateAliasOperation(create_alias=CreateAlias(
+            collection_name=collection_name, alias_name=self.collection_name)))
+        self.client.update_collection_aliases(change_aliases_operations=operations)
+
+    def active_collection(self) -> str:
+        """Name of the physical collection currently served under collection_name"""
+        return self._alias_target() or self.collection_name
+
+    def create_collection_version(self) -> str:
+        """
+        Create an empty versioned collection for a blue/green rebuild
+        
+        Returns:
+            Name of the new collection (not yet published)
+        """
+        name = f"{self.collection_name}_{time.strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        config = self.config
+        self.client.create_collection(
+            collection_name=name,
+            vectors_config=VectorParams(
+                size=config.vector_size,
+                distance=Distance.COSINE,
+                on_disk=config.vectors_on_disk or None,
+            ),
+            on_disk_payload=config.payload_on_disk,
+            **self._tuning_params(),
+        )
+        self._create_payload_indexes(name)
+        return name
+
+    def _create_payload_indexes(self, collection_name: str):
+        if self.config.url == ":memory:":
+            return  # local mode has no payload indexes
+        for field_name, schema in PAYLOAD_INDEXES.items():
+            self.client.create_payload_index(collection_name, field_name, field_schema=schema)
+
+    def _tuning_params(self) -> Dict[str, Any]:
+        """HNSW, quantization and optimizer settings from the config (unset = server default)"""
+        config = self.config
+        params: Dict[str, Any] = {}
+        if config.hnsw_m is not None or config.hnsw_ef_construct is not None:
+            params["hnsw_config"] = HnswConfigDiff(m=config.hnsw_m, ef_construct=config.hnsw_ef_construct)
+        if config.quantization == "int8":
+            params["quantization_config"] = ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8,
+                    quantile=0.99,  # clip outliers so the int8 range isn't wasted
+                    always_ram=config.quantization_always_ram,
                 )
             )
+        if config.indexing_threshold is not None or config.memmap_threshold is not None:
+            params["optimizers_config"] = OptimizersConfigDiff(
+                indexing_threshold=config.indexing_threshold,
+                memmap_threshold=config.memmap_threshold,
+            )
+        return params
 
-    def clear_collection(self):
-        """Delete and recreate the collection to clear all points"""
-        self.client.delete_collection(collection_name=self.collection_name)
-        self._ensure_collection()
-    
-    def add(self, vectors: List[List[float]], payloads: List[Dict[str, Any]]) -> List[str]:
+    @property
+    def search_params(self) -> Optional[SearchParams]:
+        """Query-time HNSW ef and quantization rescoring, or None for server defaults"""
+        config = self.config
+        if config.url == ":memory:":
+            # Local mode is always exact (brute force); params would only warn
+            return None
+        quantization = None
+        if config.quantization != "none":
+            quantization = QuantizationSearchParams(
+                rescore=config.rescore,
+                oversampling=config.oversampling,
+            )
+        if config.hnsw_ef is None and quantization is None:
+            return None
+        return SearchParams(hnsw_ef=config.hnsw_ef, quantization=quantization)
+
+    def _default_tuning_params(self) -> Dict[str, Any]:
+        """_tuning_params() with unset HNSW / optimizer fields filled with Qdrant's defaults"""
+        config = self.config
+        params = self._tuning_params()
+        params["hnsw_config"] = HnswConfigDiff(
+            m=config.hnsw_m if config.hnsw_m is not None else DEFAULT_HNSW_M,
+            ef_construct=(config.hnsw_ef_construct if config.hnsw_ef_construct is not None
+                          else DEFAULT_HNSW_EF_CONSTRUCT),
+        )
+        params["optimizers_config"] = OptimizersConfigDiff(
+            indexing_threshold=(config.indexing_threshold if config.indexing_threshold is not None
+                                else DEFAULT_INDEXING_THRESHOLD),
+            memmap_threshold=(config.memmap_threshold if config.memmap_threshold is not None
+                              else DEFAULT_MEMMAP_THRESHOLD),
+        )
+        # Omitting quantization_config would keep whatever the collection
+        # already has (e.g. int8 from the previous profile)
+        params.setdefault("quantization_config", Disabled.DISABLED)
+        return params
+
+    def apply_tuning(self, collection_name: Optional[str] = None):
+        """
+        Migrate an existing collection to the configured tuning profile
+
+        HNSW, quantization, optimizer and on-disk settings are updated in
+        place (settings the profile leaves unset go back to Qdrant's defaults,
+        so nothing from the previous profile lingers) and
+        missing payload indexes are created; Qdrant rebuilds indexes in the background while the
+        collection keeps serving. (A blue/green rebuild also picks them up,
+        since new versions are created with the current settings.)
+
+        Args:
+            collection_name: Collection to update (default: the served one)
+        """
+        config = self.config
+        collection_name = collection_name or self.active_collection()
+        params = self._default_tuning_params()
+        self.client.update_collection(
+            collection_name=collection_name,
+            vectors_config={"": VectorParamsDiff(on_disk=config.vectors_on_disk)},
+            collection_params=CollectionParamsDiff(on_disk_payload=config.payload_on_disk),
+            **params,
+        )
+        self._create_payload_indexes(collection_name)
+
+    def publish(self, collection_name: str) -> Optional[str]:
         """
-        Add vectors with metadata to collection
+        Atomically point the collection_name alias at collection_name
+        
+        Args:
+            collection_name: Fully built collection to serve
+        
+        Returns:
+            The previously served collection (caller drops it), or None
+        """
+        previous = self._alias_target()
+        legacy = previous is None and self.client.collection_exists(self.collection_name)
+        if legacy:
+            print(f"⚠️  Migrating '{self.collection_name}' to a versioned collection + alias")
+        try:
+            self._set_alias(collection_name)
+        except Exception as e:
+            if not legacy:
+                raise
+            # A server that refuses an alias shadowing a collection: the
+            # legacy collection has to go first (brief gap for readers)
+            print(f"⚠️  Alias next to '{self.collection_name}' refused ({e}); dropping it first")
+            self.client.delete_collection(collection_name=self.collection_name)
+            self._set_alias(collection_name)
+            legacy = False
+        if legacy:
+            # One-time migration: the name keeps reaching the legacy
+            # collection until it is dropped, then the alias takes over
+            self.client.delete_collection(collection_name=self.collection_name)
+        self._info_cache = None
+        return previous
+
+    def drop_collection(self, collection_name: str):
+        """Delete a (no longer published) collection version"""
+        self.client.delete_collection(collection_name=collection_name)
+
+    def add(self, vectors: List[List[float]], payloads: List[Dict[str, Any]],
+            keys: Optional[List[str]] = None,
+            collection_name: Optional[str] = None) -> List[str]:
+        """
+        Upsert vectors with metadata to collection
         
         Args:
             vectors: List of embedding vectors
             payloads: List of metadata dictionaries
+            keys: Optional stable keys; point IDs are derived from them
+                (UUIDv5), so adding the same key again updates the point
+            collection_name: Target collection (default: the served one)
         
         Returns:
-            List of generated point IDs
+            List of point IDs
         """
-        # Generate IDs
-        ids = [str(uuid.uuid4()) for _ in vectors]
+        # Deterministic IDs for keyed points, random otherwise
+        if keys is not None:
+            ids = [point_id(key) for key in keys]
+        else:
+            ids = [str(uuid.uuid4()) for _ in vectors]
         
         # Create points
         points = [
-            PointStruct(id=point_id, vector=vector, payload=payload)
-            for point_id, vector, payload in zip(ids, vectors, payloads)
+            PointStruct(id=pid, vector=vector, payload=payload)
+            for pid, vector, payload in zip(ids, vectors, payloads)
         ]
         
         # Upsert to Qdrant
-        self.client.upsert(
-            collection_name=self.collection_name,
-            points=points
-        )
+        with span("qdrant.upsert", points=len(points)):
+            self.client.upsert(
+                collection_name=collection_name or self.collection_name,
+                points=points
+            )
         
         return ids
+
+    def content_hashes(self, source: str, collection_name: Optional[str] = None) -> Dict[str, str]:
+        """
+        Map point ID -> payload["content_hash"] for every point of a source
+        
+        Args:
+            source: payload["source"] value (e.g. "products")
+            collection_name: Collection to read (default: the served one)
+        
+        Returns:
+            Dict of point ID to content hash
+        """
+        hashes: Dict[str, str] = {}
+        offset = None
+        with span("qdrant.scroll_hashes", source=source):
+            while True:
+                points, offset = self.client.scroll(
+                    collection_name=collection_name or self.collection_name,
+                    scroll_filter=source_filter(source),
+                    limit=1024,
+                    offset=offset,
+                    with_payload=["content_hash"],
+                    with_vectors=False,
+                )
+                for point in points:
+                    hashes[str(point.id)] = (point.payload or {}).get("content_hash", "")
+                if offset is None:
+                    return hashes
+
+    def copy_points(self, point_ids: List[str], source_collection: str,
+                    target_collection: str, batch_size: int = 256) -> int:
+        """
+        Copy points (vector + payload) between collections without re-embedding
+        
+        Args:
+            point_ids: IDs to copy
+            source_collection: Collection to read from
+            target_collection: Collection to write to
+            batch_size: Points per retrieve/upsert round trip
+        
+        Returns:
+            Number of points copied
+        """
+        copied = 0
+        with span("qdrant.copy_points", points=len(point_ids)):
+            for start in range(0, len(point_ids), batch_size):
+                records = self.client.retrieve(
+                    collection_name=source_collection,
+                    ids=point_ids[start:start + batch_size],
+                    with_payload=True,
+                    with_vectors=True,
+                )
+                self.client.upsert(
+                    collection_name=target_collection,
+                    points=[PointStruct(id=r.id, vector=r.vector, payload=r.payload) for r in records],
+                )
+                copied += len(records)
+        return copied
     
     def update(self, point_id: str, vector: Optional[List[float]] = None, 
                payload: Optional[Dict[str, Any]] = None):
@@ -98,36 +442,194 @@ class QdrantService:
                 points=[point_id]
             )
     
-    def delete(self, point_ids: List[str]):
+    def delete(self, point_ids: List[str], collection_name: Optional[str] = None):
         """
         Delete points by their IDs
         
         Args:
             point_ids: List of point IDs to delete
+            collection_name: Collection to delete from (default: the served one)
         """
         self.client.delete(
-            collection_name=self.collection_name,
+            collection_name=collection_name or self.collection_name,
             points_selector=point_ids
         )
 
-    def count(self) -> int:
+    def count(self, exact: bool = False) -> int:
         """
         Return number of points in the collection.
+        
+        Args:
+            exact: Count every point (scans the collection); the default
+                approximate count comes from segment metadata
         """
-        res = self.client.count(
-            collection_name=self.collection_name,
-            exact=True,
-        )
+        with span("qdrant.count", exact=exact):
+            res = self.client.count(
+                collection_name=self.collection_name,
+                exact=exact,
+            )
         return res.count
 
-    def search(self, query_vector: List[float], limit: int = 5):
+    def collection_info(self, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Collection metadata (vector count, index status), cached briefly
+        so health checks and dashboards don't hit Qdrant on every poll
+        
+        Args:
+            max_age: Seconds a cached value may be reused (default: config.info_cache_ttl_seconds)
+        
+        Returns:
+            Dict with collection, status, optimizer_status, points_count,
+            indexed_vectors_count, segments_count and age_seconds
+        """
+        max_age = self.config.info_cache_ttl_seconds if max_age is None else max_age
+        now = time.monotonic()
+        if self._info_cache is None or now - self._info_cached_at > max_age:
+            with span("qdrant.collection_info"):
+                info = self.client.get_collection(self.collection_name)
+            self._info_cache = {
+                "collection": self.active_collection(),
+                "status": str(getattr(info.status, "value", info.status)),
+                "optimizer_status": str(getattr(info.optimizer_status, "value", info.optimizer_status)),
+                "points_count": info.points_count,
+                "indexed_vectors_count": info.indexed_vectors_count,
+                "segments_count": info.segments_count,
+            }
+            self._info_cached_at = now
+        return {**self._info_cache, "age_seconds": round(now - self._info_cached_at, 3)}
+
+    def search(self, query_vector: List[float], limit: int = 5,
+               query_filter: Optional[Filter] = None, with_payload: PayloadSelection = True):
         """
         Search for nearest vectors using the newer Qdrant `query_points` API.
+
+        Args:
+            query_vector: Query embedding
+            limit: Number of results
+            query_filter: Optional payload filter
+            with_payload: Payload keys to return (True = all, False = none)
         """
-        response = self.client.query_points(
-            collection_name=self.collection_name,
-            query=query_vector,
-            limit=limit,
-            with_payload=True,
-        )
-        return response.points
\ No newline at end of file
+        with span("qdrant.query_points", limit=limit) as s:
+            response = self.client.query_points(
+                collection_name=self.collection_name,
+                query=query_vector,
+                query_filter=query_filter,
+                limit=limit,
+                with_payload=payload_selector(with_payload),
+                with_vectors=False,
+                search_params=self.search_params,
+            )
+            s.set_attribute("results", len(response.points))
+        return response.points
+
+    async def search_async(self, query_vector: List[float], limit: int = 5,
+                           query_filter: Optional[Filter] = None, with_payload: PayloadSelection = True):
+        """
+        Non-blocking search for use on an event loop (LiveKit agent, MCP server).
+        """
+        if self.config.url == ":memory:":
+            # Local mode keeps its points in the sync client's process memory
+            return await asyncio.to_thread(self.search, query_vector, limit, query_filter, with_payload)
+
+        with span("qdrant.query_points", limit=limit, transport="async") as s:
+            response = await self.async_client.query_points(
+                collection_name=self.collection_name,
+                query=query_vector,
+                query_filter=query_filter,
+                limit=limit,
+                with_payload=payload_selector(with_payload),
+                with_vectors=False,
+                search_params=self.search_params,
+            )
+            s.set_attribute("results", len(response.points))
+        return response.points
+
+    def retrieve(self, point_ids: List[str], with_payload: PayloadSelection = True):
+        """
+        Fetch points by ID (payload only)
+
+        Args:
+            point_ids: Point IDs (see point_id())
+            with_payload: Payload keys to return (True = all)
+
+        Returns:
+            The points that exist, without vectors
+        """
+        with span("qdrant.retrieve", ids=len(point_ids)):
+            return self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=point_ids,
+                with_payload=payload_selector(with_payload),
+                with_vectors=False,
+            )
+
+    async def retrieve_async(self, point_ids: List[str], with_payload: PayloadSelection = True):
+        """
+        Non-blocking retrieve for use on an event loop.
+        """
+        if self.config.url == ":memory:":
+            return await asyncio.to_thread(self.retrieve, point_ids, with_payload)
+
+        with span("qdrant.retrieve", ids=len(point_ids), transport="async"):
+            return await self.async_client.retrieve(
+                collection_name=self.collection_name,
+                ids=point_ids,
+                with_payload=payload_selector(with_payload),
+                with_vectors=False,
+            )
+
+    def _batch_requests(self, queries: List[BatchQuery]) -> List[QueryRequest]:
+        return [
+            QueryRequest(
+                query=q.vector,
+                filter=q.query_filter,
+                limit=q.limit,
+                with_payload=payload_selector(q.with_payload),
+                with_vector=False,
+                params=self.search_params,
+            )
+            for q in queries
+        ]
+
+    def search_batch(self, queries: List[BatchQuery]):
+        """
+        Run several searches (each with its own filter and limit) in one request
+        
+        Args:
+            queries: BatchQuery per retrieval
+        
+        Returns:
+            List of result lists, in the order of queries
+        """
+        with span("qdrant.query_batch_points", queries=len(queries)) as s:
+            responses = self.client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=self._batch_requests(queries),
+            )
+            s.set_attribute("results", sum(len(r.points) for r in responses))
+        return [r.points for r in responses]
+
+    async def search_batch_async(self, queries: List[BatchQuery]):
+        """
+        Non-blocking search_batch for use on an event loop.
+        """
+        if self.config.url == ":memory:":
+            return await asyncio.to_thread(self.search_batch, queries)
+
+        with span("qdrant.query_batch_points", queries=len(queries), transport="async") as s:
+            responses = await self.async_client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=self._batch_requests(queries),
+            )
+            s.set_attribute("results", sum(len(r.points) for r in responses))
+        return [r.points for r in responses]
+
+    def close(self):
+        """Close the sync client's connections"""
+        self.client.close()
+
+    async def aclose(self):
+        """Close the async client's connections"""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
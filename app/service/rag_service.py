@@ -1,70 +1,361 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
 import pandas as pd
 from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Optional
-from app.service.qdrant_service import QdrantService
+from typing import Any, List, Dict, Optional
+from app.service.catalog_table import ProductTable
+from app.service.qdrant_service import point_id
+from app.service.vector_store import VectorStore
+from app.core.telemetry import span
+
+# Pre-rendered at ingestion into payload["summary"] (used by the voice agent)
+PRODUCT_SUMMARY_TEMPLATE = "• {name} - ${price} ({category}): {text}"
+
+
+@dataclass
+class CsvSource:
+    """How one CSV file is indexed"""
+    path: str
+    text_column: str
+    metadata_columns: List[str] = field(default_factory=list)
+    # Column whose value identifies a row across edits (e.g. product name);
+    # None falls back to the row position
+    key_column: Optional[str] = None
+    summary_template: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        """Stored as payload["source"]; also namespaces the point keys"""
+        return os.path.splitext(os.path.basename(self.path))[0]
+
+
+def catalog_sources(data_dir: str = "./data") -> List["CsvSource"]:
+    """
+    The CSV files that make up the catalog index
+
+    Products are keyed by name and policies by question, so edits to a row
+    keep its point ID.
+
+    Args:
+        data_dir: Directory holding products.csv and policies.csv
+
+    Returns:
+        CsvSource per file
+    """
+    return [
+        CsvSource(os.path.join(data_dir, "products.csv"), "description",
+                  ["name", "price", "category", "stock", "brand"],
+                  key_column="name", summary_template=PRODUCT_SUMMARY_TEMPLATE),
+        CsvSource(os.path.join(data_dir, "policies.csv"), "answer", ["category", "question"],
+                  key_column="question"),
+    ]
+
+
+@dataclass
+class IngestStats:
+    """Outcome of syncing one CSV into a collection"""
+    source: str
+    total: int = 0
+    embedded: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+
+
+@dataclass
+class IndexedRow:
+    key: str
+    point_id: str
+    text: str
+    payload: Dict[str, Any]
+
 
 class RAGService:
     """
     RAG service for CSV ingestion and vector search
-    Uses dependency injection for QdrantService
+    Uses dependency injection for the vector store (QdrantService or NumpyVectorStore)
     """
-    
-    def __init__(self, qdrant_service: QdrantService, 
-                 embedding_model: str = "all-MiniLM-L6-v2"):
+
+    def __init__(self, qdrant_service: VectorStore,
+                 embedding_model: str = "all-MiniLM-L6-v2",
+                 model: Optional[SentenceTransformer] = None):
         """
         Initialize RAG service
-        
+
         Args:
-            qdrant_service: QdrantService instance (dependency injection)
+            qdrant_service: VectorStore instance (dependency injection)
             embedding_model: Name of sentence transformer model
+            model: Already-loaded SentenceTransformer to share instead of loading another copy
         """
         self.qdrant_service = qdrant_service
-        self.embedding_model = SentenceTransformer(embedding_model)
-    
-    def ingest_csv(self, csv_path: str, text_column: str, 
-                   metadata_columns: Optional[List[str]] = None) -> int:
+        self.embedding_model = model or SentenceTransformer(embedding_model)
+        # Columnar copy of the products rows for exact filter/sort/count queries
+        self.product_table: Optional[ProductTable] = None
+        # Collection version the tables were read from (None: built from the CSVs)
+        self.tables_collection: Optional[str] = None
+        self._tables_checked_at = 0.0
+
+    def ingest_csv(self, csv_path: str, text_column: str,
+                   metadata_columns: Optional[List[str]] = None,
+                   summary_template: Optional[str] = None,
+                   key_column: Optional[str] = None) -> int:
         """
         Ingest CSV file into vector database
-        
+
+        Re-ingesting is idempotent: rows are upserted under deterministic
+        IDs, unchanged rows are not re-embedded and rows removed from the
+        CSV are deleted.
+
         Args:
             csv_path: Path to CSV file
             text_column: Column name containing text to embed
             metadata_columns: Optional list of columns to include as metadata
-        
+            summary_template: Optional format string rendered with the payload
+                (e.g. "{name} - ${price}: {text}") and stored as payload["summary"],
+                so search consumers don't rebuild display strings per query
+            key_column: Optional column that identifies a row (default: row position)
+
+        Returns:
+            Number of documents in the CSV
+        """
+        source = CsvSource(csv_path, text_column, metadata_columns or [],
+                           key_column, summary_template)
+        return self.sync_csv(source).total
+
+    def read_rows(self, source: CsvSource) -> List[IndexedRow]:
+        """
+        Load a CSV into keyed rows with their payloads and content hashes
+
+        Args:
+            source: CsvSource describing the file
+
         Returns:
-            Number of documents ingested
+            List of rows (key, point ID, text to embed, payload)
         """
         # Read CSV
-        df = pd.read_csv(csv_path)
-        
+        df = pd.read_csv(source.path)
+
         # Validate text column exists
-        if text_column not in df.columns:
-            raise ValueError(f"Column '{text_column}' not found in CSV")
-        
-        # Extract texts and convert to embeddings
-        texts = df[text_column].fillna("").astype(str).tolist()
-        embeddings = self.embedding_model.encode(texts)
-        
-        # Prepare payloads (metadata)
-        payloads = []
-        for idx, row in df.iterrows():
+        if source.text_column not in df.columns:
+            raise ValueError(f"Column '{source.text_column}' not found in CSV")
+        if source.key_column and source.key_column not in df.columns:
+            raise ValueError(f"Column '{source.key_column}' not found in CSV")
+
+        texts = df[source.text_column].fillna("").astype(str).tolist()
+
+        rows = []
+        seen: Dict[str, int] = {}
+        for (idx, row), text in zip(df.iterrows(), texts):
             payload = {
-                "text": row[text_column],
+                "text": row[source.text_column],
                 "row_index": int(idx)
             }
-            
+
             # Add specified metadata columns
-            if metadata_columns:
-                for col in metadata_columns:
-                    if col in df.columns:
-                        payload[col] = row[col]
-            
-            payloads.append(payload)
-        
+            for col in source.metadata_columns:
+                if col in df.columns:
+                    payload[col] = row[col]
+
+            if source.summary_template:
+                payload["summary"] = source.summary_template.format(**payload)
+
+            key_value = str(row[source.key_column]) if source.key_column else str(idx)
+            key = f"{source.name}:{key_value}"
+            # Duplicate key values would collapse into one point
+            if key in seen:
+                seen[key] += 1
+                key = f"{key}#{seen[key]}"
+            else:
+                seen[key] = 0
+
+            payload["source"] = source.name
+            payload["key"] = key
+            # row_index only reflects position, so moving a row isn't a change
+            hashed = {k: v for k, v in payload.items() if k != "row_index"}
+            payload["content_hash"] = hashlib.sha1(
+                json.dumps(hashed, sort_keys=True, default=str).encode()
+            ).hexdigest()
+
+            rows.append(IndexedRow(key, point_id(key), text, payload))
+        return rows
+
+    def sync_csv(self, source: CsvSource, collection_name: Optional[str] = None,
+                 reuse_from: Optional[str] = None) -> IngestStats:
+        """
+        Bring a collection in line with a CSV, embedding only changed rows
+
+        Args:
+            source: CsvSource describing the file
+            collection_name: Collection to write (default: the served one)
+            reuse_from: Collection to take unchanged vectors from when building
+                a new version (blue/green); default is the target itself
+
+        Returns:
+            IngestStats with embedded/unchanged/deleted counts
+        """
+        qdrant = self.qdrant_service
+        target = collection_name or qdrant.active_collection()
+        reference = reuse_from or target
+
+        rows = self.read_rows(source)
+        self.index_table(source, rows)
+        changed, unchanged, stale = self.diff_rows(
+            rows, qdrant.content_hashes(source.name, collection_name=reference))
+        stats = IngestStats(source=source.name, total=len(rows),
+                            embedded=len(changed), unchanged=len(unchanged))
+
+        if reference != target and unchanged:
+            qdrant.copy_points(unchanged, reference, target)
+
+        if changed:
+            self.embed_rows(changed, target)
+
+        if reference == target and stale:
+            qdrant.delete(stale, collection_name=target)
+            stats.deleted = len(stale)
+
+        return stats
+
+    def index_table(self, source: CsvSource, rows: List[IndexedRow]):
+        """
+        Rebuild the product table from freshly read rows (other sources are ignored)
+
+        Args:
+            source: CsvSource the rows came from
+            rows: Rows from read_rows()
+        """
+        if source.name != "products":
+            return
+        with span("rag.product_table", rows=len(rows)):
+            self.product_table = ProductTable.from_points((r.point_id, r.payload) for r in rows)
+
+    def load_tables(self, sources: List[CsvSource]):
+        """
+        Build the in-process tables without touching the vector index
+        (for processes whose catalog was ingested by someone else)
+
+        Args:
+            sources: CSV files that make up the index
+        """
+        for source in sources:
+            if os.path.exists(source.path):
+                self.index_table(source, self.read_rows(source))
+
+    def refresh_tables(self, max_age: float = 0.0) -> bool:
+        """
+        Reload the in-process tables from the served collection if another
+        process published a new version since they were built (shared
+        indexes only: in-process ones are never published elsewhere)
+
+        Args:
+            max_age: Skip the check if the last one is more recent than this (seconds)
+
+        Returns:
+            True if the tables were reloaded
+        """
+        qdrant = self.qdrant_service
+        now = time.monotonic()
+        if not qdrant.persistent or now - self._tables_checked_at < max_age:
+            return False
+        self._tables_checked_at = now
+        served = qdrant.active_collection()
+        if self.tables_collection is None:
+            self.tables_collection = served  # tables are as new as the startup CSVs
+            return False
+        if served == self.tables_collection:
+            return False
+        ids = list(qdrant.content_hashes("products", collection_name=served))
+        # CSV order, so ties sort the same as in tables built from the file
+        points = sorted(qdrant.retrieve(ids) if ids else [],
+                        key=lambda p: p.payload.get("row_index", 0))
+        with span("rag.product_table", rows=len(points)):
+            self.product_table = ProductTable.from_points((str(p.id), p.payload) for p in points)
+        self.tables_collection = served
+        return True
+
+    @staticmethod
+    def diff_rows(rows: List[IndexedRow], existing: Dict[str, str]):
+        """
+        Compare CSV rows with indexed content hashes
+
+        Args:
+            rows: Rows from read_rows()
+            existing: Point ID -> content hash from VectorStore.content_hashes()
+
+        Returns:
+            (changed rows, unchanged point IDs, stale point IDs no longer in the CSV)
+        """
+        changed = [r for r in rows if existing.get(r.point_id) != r.payload["content_hash"]]
+        unchanged = [r.point_id for r in rows if existing.get(r.point_id) == r.payload["content_hash"]]
+        stale = list(set(existing) - {r.point_id for r in rows})
+        return changed, unchanged, stale
+
+    def embed_rows(self, rows: List[IndexedRow], collection_name: Optional[str] = None):
+        """
+        Embed rows and upsert them under their deterministic IDs
+
+        Args:
+            rows: Rows to (re-)index
+            collection_name: Target collection (default: the served one)
+        """
+        with span("rag.embed", rows=len(rows)):
+            embeddings = self.embedding_model.encode([r.text for r in rows])
+
         # Store in Qdrant
         self.qdrant_service.add(
             vectors=embeddings.tolist(),
-            payloads=payloads
+            payloads=[r.payload for r in rows],
+            keys=[r.key for r in rows],
+            collection_name=collection_name,
         )
-        
-        return len(texts)
\ No newline at end of file
+
+    def rebuild(self, sources: List[CsvSource]) -> List[IngestStats]:
+        """
+        Blue/green rebuild: fill a new collection version and swap it in
+
+        Unchanged rows are copied from the served collection instead of being
+        re-embedded; queries keep hitting the old version until the alias
+        swap, which is atomic.
+
+        Args:
+            sources: CSV files that make up the index
+
+        Returns:
+            IngestStats per source
+        """
+        qdrant = self.qdrant_service
+        live = qdrant.active_collection()
+        staging = qdrant.create_collection_version()
+        try:
+            stats = [self.sync_csv(source, collection_name=staging, reuse_from=live)
+                     for source in sources if os.path.exists(source.path)]
+        except Exception:
+            qdrant.drop_collection(staging)
+            raise
+
+        previous = qdrant.publish(staging)
+        if previous and previous != staging:
+            qdrant.drop_collection(previous)
+        return stats
+
+    def sync_catalog(self, sources: List[CsvSource]) -> List[IngestStats]:
+        """
+        Bring the served collection in line with the CSVs
+
+        Args:
+            sources: CSV files that make up the index (see catalog_sources)
+
+        Returns:
+            IngestStats per source
+        """
+        if self.qdrant_service.active_collection() == self.qdrant_service.collection_name:
+            # Unversioned collection from an older release (random point IDs):
+            # rebuild it once behind an alias instead of upserting next to it
+            return self.rebuild(sources)
+        # Upsert by key: unchanged rows are skipped and removed rows deleted,
+        # so the collection is never emptied and restarts don't duplicate points
+        stats = [self.sync_csv(source) for source in sources if os.path.exists(source.path)]
+        self.qdrant_service.flush()
+        return stats
@@ -0,0 +1,359 @@
+import re
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Iterable, Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from app.core.telemetry import registry
+from app.service.intent_service import Intent
+
+RESPONSES = registry.counter(
+    "voicebot_responses_total",
+    "Replies by intent and path (template = rendered from data, no LLM call)",
+    ("intent", "path"),
+)
+RESPONSE_LATENCY = registry.histogram(
+    "voicebot_response_seconds",
+    "Time to produce a reply by intent and path",
+    ("intent", "path"),
+)
+_SCORE_BUCKETS = (0.2, 0.3, 0.4, 0.45, 0.5, 0.55, 0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95, 1.0)
+FAQ_TOP_SCORE = registry.histogram(
+    "voicebot_faq_top_score",
+    "Similarity of the best policy match per turn, by outcome (answered, low_score, ambiguous)",
+    ("outcome",),
+    buckets=_SCORE_BUCKETS,
+)
+FAQ_MARGIN = registry.histogram(
+    "voicebot_faq_score_margin",
+    "Best minus runner-up policy similarity per turn, by outcome",
+    ("outcome",),
+    buckets=(0.0, 0.02, 0.04, 0.06, 0.08, 0.1, 0.15, 0.2, 0.3, 0.5),
+)
+
+
+class FAQConfig(BaseSettings):
+    """Direct FAQ answers (stored policy answer returned without the LLM)"""
+
+    # Defaults are a starting point for all-MiniLM-L6-v2 (question vs stored
+    # answer); tune them from voicebot_faq_top_score / voicebot_faq_score_margin
+    enabled: bool = True
+    min_score: float = 0.6  # best match must score at least this
+    min_margin: float = 0.08  # ... and beat the runner-up by this much
+    max_sentences: int = 2  # spoken answer length; 0 keeps the whole answer
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_prefix="FAQ_",
+        extra="ignore",
+    )
+
+# Words an order-status question is made of. If anything else is left once
+# these are removed ("cancel", "return", "cheaper", ...) the turn asks for
+# more than a status readout and goes to the LLM.
+_ORDER_STATUS_WORDS = frozenset("""
+    a about already an and any arrive arriving be been can check could did does
+    going got has hey hi i i'm id im is it it's just know let look me my number
+    of ok okay on order orders ord please see so status tell thanks thank that
+    the this track tracking update what what's whats when where where's wheres
+    will with yet you
+""".split())
+_WORDS = re.compile(r"[a-z']+")
+
+# A stock question has to be phrased as one; a bare "available" also
+# appears in "what colors are available for ...", which isn't
+_STOCK_QUESTION = re.compile(
+    r"\b(?:in stock|out of stock|sold out|do you (?:still )?have any"
+    r"|how many\b.{0,60}\b(?:left|have|in stock|available)"
+    r"|(?:is|are)\b.{0,60}\bavailable\s*[?.!]*\s*$)",
+    re.IGNORECASE,
+)
+# Words a stock question is made of besides the product's name; anything
+# else ("colors", "warranty", "cheaper") asks for more than a stock readout
+_STOCK_WORDS = frozenset("""
+    a an and any are available can could currently did do does for got have
+    hey hi how i in is it it's just know left let many me more much now of
+    ok okay one ones out please right see sold still stock tell thanks thank
+    that the them there these they this those to units us we what what's
+    whats you your
+""".split())
+
+# Store-policy topics (the categories of data/policies.csv). The FAQ fast
+# path only answers turns that ask about one of these
+_POLICY_QUESTION = re.compile(
+    r"\b(?:return(?:s|ed|ing)?|refunds?|exchanges?|ship(?:s|ped|ping)?|deliver(?:y|ies)|"
+    r"warrant(?:y|ies)|guarantee|pay(?:ment|ments|pal)?|credit card|cancel(?:led|lation)?|"
+    r"polic(?:y|ies)|discounts?|coupons?|promo|referral|international(?:ly)?|customs|"
+    r"tax(?:es)?|invoices?|receipts?|backorders?|pre-?orders?|restock(?:ed|ing)?|"
+    r"price match(?:ing)?|damaged|broken|gift(?:s| wrap)?|bulk|subscriptions?|"
+    r"account|privacy|secure|security|fraud|install(?:ation)?|packaging|"
+    r"customer (?:support|service)|contact)\b",
+    re.IGNORECASE,
+)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+_ORDINAL = {1: "st", 2: "nd", 3: "rd", 21: "st", 22: "nd", 23: "rd", 31: "st"}
+_MONTHS = ("January", "February", "March", "April", "May", "June", "July",
+           "August", "September", "October", "November", "December")
+
+
+@dataclass
+class TemplateReply:
+    """A reply rendered without the LLM"""
+    intent: str  # order_status | order_not_found | stock | faq | catalog
+    text: str
+
+
+# ============================================================================
+# GATES
+# ============================================================================
+
+def is_order_status_question(text: str, intent: Intent) -> bool:
+    """An explicit order ID and nothing but status-question words around it"""
+    if not intent.order_id or len(intent.order_ids) > 1 or intent.has_price_range:
+        return False
+    return all(word in _ORDER_STATUS_WORDS for word in _WORDS.findall(text.lower()))
+
+
+def is_stock_question(text: str, intent: Intent) -> bool:
+    """Phrased as a stock question ("in stock", "sold out", "how many ... left", ...)"""
+    return not intent.order_ids and not intent.has_price_range and bool(_STOCK_QUESTION.search(text))
+
+
+def is_stock_readout(text: str, product: Any) -> bool:
+    """Nothing but the product's name and stock-question words"""
+    rest = text.lower().replace(product.name.lower(), " ")
+    return all(word in _STOCK_WORDS for word in _WORDS.findall(rest))
+
+
+def is_policy_question(text: str, intent: Intent) -> bool:
+    """Asks about a store policy (returns, shipping, warranty, payment, ...) and no order or price"""
+    if intent.order_ids or intent.has_price_range or intent.keywords - {"order"}:
+        return False
+    return bool(_POLICY_QUESTION.search(text))
+
+
+def candidate_intent(text: str, intent: Intent) -> Optional[str]:
+    """
+    Cheap pre-check: could this turn be answered from a template?
+
+    Returns:
+        "order_status", "stock" or None
+    """
+    if is_order_status_question(text, intent):
+        return "order_status"
+    if is_stock_question(text, intent):
+        return "stock"
+    return None
+
+
+def named_product(text: str, products: Iterable[Any]) -> Optional[Any]:
+    """The retrieved product whose full name appears in the utterance (longest wins)"""
+    lowered = text.lower()
+    named = [p for p in products if p.name and p.name.lower() in lowered]
+    return max(named, key=lambda p: len(p.name)) if named else None
+
+
+# ============================================================================
+# RENDERING
+# ============================================================================
+
+def spoken_date(value: Optional[str]) -> str:
+    """"2024-12-22" -> "December 22nd" (unparseable values are returned as-is)"""
+    if not value:
+        return ""
+    try:
+        d = date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return str(value)
+    return f"{_MONTHS[d.month - 1]} {d.day}{_ORDINAL.get(d.day, 'th')}"
+
+
+def _items_phrase(items: list) -> str:
+    parts = [f"{item.get('quantity', 1)} {item.get('name', '')}".strip() for item in items]
+    if len(parts) <= 1:
+        return "".join(parts)
+    return ", ".join(parts[:-1]) + " and " + parts[-1]
+
+
+def render_order_status(order: Dict[str, Any]) -> str:
+    order_id = order.get("order_id", "")
+    status = str(order.get("status", "unknown")).lower()
+    items = _items_phrase(order.get("items", []))
+    contents = f" with {items}" if items else ""
+    eta = spoken_date(order.get("estimated_delivery"))
+
+    if status == "delivered":
+        delivered = spoken_date(order.get("delivered_date"))
+        reply = f"Your order {order_id}{contents} was delivered" + (f" on {delivered}." if delivered else ".")
+    elif status == "cancelled":
+        cancelled = spoken_date(order.get("cancelled_date"))
+        reply = f"Your order {order_id}{contents} was cancelled" + (f" on {cancelled}" if cancelled else "")
+        reason = order.get("cancellation_reason")
+        reply += f" because of {str(reason).lower()}." if reason else "."
+    elif status in ("shipped", "in transit", "out for delivery"):
+        carrier = order.get("carrier")
+        reply = f"Good news, your order {order_id}{contents} has shipped" + (f" with {carrier}." if carrier else ".")
+        if order.get("tracking_number"):
+            reply += f" The tracking number is {order['tracking_number']}."
+        if eta:
+            reply += f" It should arrive by {eta}."
+    else:
+        reply = f"Your order {order_id}{contents} is currently {status}."
+        if eta:
+            reply += f" It's expected to arrive by {eta}."
+    return reply
+
+
+def render_order_not_found(order_id: str) -> str:
+    return (f"I couldn't find an order with the number {order_id}. "
+            f"Could you check the order number and tell me again?")
+
+
+def render_stock(product: Any) -> Optional[str]:
+    """None when the stock level isn't a number"""
+    try:
+        stock = int(float(product.stock))
+    except (TypeError, ValueError):
+        return None
+    if stock <= 0:
+        return f"Sorry, the {product.name} is currently out of stock."
+    if stock <= 10:
+        return f"The {product.name} is in stock, but only {stock} are left, at ${product.price} each."
+    return f"Yes, the {product.name} is in stock. We have {stock} available at ${product.price} each."
+
+
+def render_catalog_answer(answer) -> Optional[str]:
+    """
+    Spoken reply for a count or a single cheapest / most expensive product
+
+    Args:
+        answer: CatalogAnswer from the product table
+
+    Returns:
+        The reply, or None for lists (those go to the LLM with the exact rows)
+    """
+    q = answer.query
+    category = q.category.replace("-", " ") if q.category else ""
+    label = " ".join(p for p in (q.brand or "", category, " ".join(q.terms)) if p)
+    constraints = " ".join(p for p in (q.price_phrase(), "in stock" if q.in_stock else "") if p)
+    if q.op == "count":
+        noun = "product" if answer.total == 1 else "products"
+        return " ".join(p for p in (f"We have {answer.total}", label, noun, constraints) if p) + "."
+    if len(answer.rows) != 1 or q.sort_by != "price":
+        return None
+    row = answer.rows[0]
+    which = "most expensive" if q.descending else "cheapest"
+    noun = label if q.terms else f"{label} product".strip()
+    subject = " ".join(p for p in (which, noun, constraints) if p)
+    return f"The {subject} is the {row['name']} at ${row['price']:.2f}."
+
+
+def shorten_for_voice(answer: str, max_sentences: int) -> str:
+    """First `max_sentences` sentences of a stored answer (0 = unchanged)"""
+    if max_sentences <= 0:
+        return answer
+    return " ".join(_SENTENCE_END.split(answer.strip())[:max_sentences])
+
+
+# ============================================================================
+# FAST PATH
+# ============================================================================
+
+_DEFAULT_FAQ = FAQConfig()
+
+
+def faq_reply(ctx, config: Optional[FAQConfig] = None) -> Optional[TemplateReply]:
+    """
+    The stored answer of the best policy match, when it is a clear winner
+
+    Records the top score and margin of every evaluated turn, answered or not.
+
+    Args:
+        ctx: RetrievalContext for the turn
+        config: FAQConfig (default: from FAQ_* env vars)
+
+    Returns:
+        TemplateReply, or None when the match is too weak or too close to call
+    """
+    config = config or _DEFAULT_FAQ
+    if not config.enabled or not ctx.policies:
+        return None
+
+    best = ctx.policies[0]
+    margin = best.score - ctx.policies[1].score if len(ctx.policies) > 1 else best.score
+    if best.score < config.min_score:
+        outcome = "low_score"
+    elif margin < config.min_margin:
+        outcome = "ambiguous"
+    else:
+        outcome = "answered"
+    FAQ_TOP_SCORE.observe(best.score, outcome=outcome)
+    FAQ_MARGIN.observe(margin, outcome=outcome)
+
+    if outcome != "answered":
+        return None
+    return TemplateReply("faq", shorten_for_voice(best.answer, config.max_sentences))
+
+
+def fast_path_reply(text: str, ctx, faq: Optional[FAQConfig] = None) -> Optional[TemplateReply]:
+    """
+    Render the reply from data when the turn is a high-confidence structured intent
+
+    Args:
+        text: User utterance
+        ctx: RetrievalContext for the turn
+        faq: FAQConfig for direct policy answers (default: from FAQ_* env vars)
+
+    Returns:
+        TemplateReply, or None when the LLM should answer
+    """
+    if ctx.catalog_answer is not None:
+        reply = render_catalog_answer(ctx.catalog_answer)
+        return TemplateReply("catalog", reply) if reply else None
+    candidate = candidate_intent(text, ctx.intent)
+    if candidate == "order_status" and ctx.order_looked_up and "order" not in ctx.failed:
+        if ctx.order:
+            return TemplateReply("order_status", render_order_status(ctx.order))
+        return TemplateReply("order_not_found", render_order_not_found(ctx.intent.order_id))
+    if candidate == "stock":
+        product = named_product(text, ctx.products[:5])
+        reply = render_stock(product) if product is not None and is_stock_readout(text, product) else None
+        if reply:
+            return TemplateReply("stock", reply)
+        return None
+    # Only policy questions ("can I cancel my order?") get a stored answer;
+    # order lookups, price questions and anything about a named product
+    # ("does the SoundPro Wireless Headphones warranty cover water?") need
+    # the retrieved data and go to the LLM
+    if candidate is None and is_policy_question(text, ctx.intent) \
+            and named_product(text, ctx.products[:5]) is None:
+        return faq_reply(ctx, faq)
+    return None
+
+
+def intent_label(text: str, ctx) -> str:
+    """Metric label for a turn, shared by the template and LLM paths"""
+    if ctx.catalog_answer is not None:
+        return "catalog"
+    if ctx.intent.order_id:
+        return "order_status" if ctx.order else "order_not_found"
+    if is_stock_question(text, ctx.intent):
+        return "stock"
+    return "other"
+
+
+def record_response(intent: str, path: str, started: float):
+    """
+    Count a reply and observe its latency
+
+    Args:
+        intent: intent_label() / TemplateReply.intent
+        path: "template" or "llm"
+        started: time.perf_counter() at the start of the turn
+    """
+    RESPONSES.inc(intent=intent, path=path)
+    RESPONSE_LATENCY.observe(time.perf_counter() - started, intent=intent, path=path)
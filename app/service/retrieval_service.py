@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Dict, List, Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from app.core.telemetry import span
+from app.service.catalog_table import CatalogAnswer
+from app.service.intent_service import Intent, extract_intent, split_subqueries
+from app.service.qdrant_service import BatchQuery, source_filter
+from app.service.vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+# Payload keys the pipeline reads back (everything else stays on the server)
+PRODUCT_HIT_FIELDS = ("name", "price", "category", "text", "stock")
+POLICY_HIT_FIELDS = ("question", "text", "category")
+
+
+class RetrievalConfig(BaseSettings):
+    """Per-turn retrieval configuration"""
+
+    product_results: int = 30  # product candidates, split across comparison sub-queries
+    policy_results: int = 3
+    order_timeout_seconds: float = 1.0
+    embed_timeout_seconds: float = 2.0
+    search_timeout_seconds: float = 2.0  # per Qdrant branch
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_prefix="RETRIEVAL_",
+        extra="ignore",
+    )
+
+
+@dataclass
+class ProductHit:
+    """A retrieved product"""
+    id: str
+    name: str
+    price: Any
+    category: str
+    description: str
+    stock: Any = None
+    score: float = 0.0
+
+
+@dataclass
+class PolicyHit:
+    """A retrieved FAQ / policy row"""
+    question: str
+    answer: str
+    category: str
+    score: float = 0.0
+
+
+@dataclass
+class RetrievalContext:
+    """Everything fetched for one turn, ready to be rendered into a prompt"""
+    intent: Intent
+    products: List[ProductHit] = field(default_factory=list)
+    policies: List[PolicyHit] = field(default_factory=list)  # best first
+    order: Optional[Dict[str, Any]] = None
+    order_looked_up: bool = False
+    timings_ms: Dict[str, float] = field(default_factory=dict)  # per branch
+    failed: List[str] = field(default_factory=list)  # branches that timed out or raised
+    catalog_answer: Optional[CatalogAnswer] = None  # exact product-table result
+
+    def catalog_text(self) -> str:
+        """Products, then policy answers (only the exact rows for a product-table answer)"""
+        parts = [f"{p.name} (${p.price}) - {p.category}: {p.description}" for p in self.products]
+        if self.catalog_answer is not None:
+            return "\n\n".join([self.catalog_answer.summary()] + parts)
+        parts.extend(p.answer for p in self.policies)
+        return "\n\n".join(parts)
+
+    def order_text(self) -> str:
+        """ORDER TRACKING INFORMATION section, or "" when no order was asked about"""
+        order = self.order
+        if order:
+            details = [
+                f"Order ID: {order.get('order_id', 'N/A')}",
+                f"Customer: {order.get('customer_name', 'N/A')}",
+                f"Status: {order.get('status', 'N/A').upper()}",
+                f"Total: ${order.get('total', 0):.2f}",
+                f"Order Date: {order.get('order_date', 'N/A')}",
+            ]
+            items = order.get("items", [])
+            if items:
+                items_list = ", ".join(f"{item.get('name', '')} x{item.get('quantity', 1)}" for item in items)
+                details.append(f"Items: {items_list}")
+            for key, label in (("tracking_number", "Tracking Number"), ("carrier", "Carrier"),
+                               ("estimated_delivery", "Estimated Delivery"),
+                               ("delivered_date", "Delivered Date"), ("cancelled_date", "Cancelled Date"),
+                               ("cancellation_reason", "Cancellation Reason")):
+                if order.get(key):
+                    details.append(f"{label}: {order.get(key)}")
+            return "\n\nORDER TRACKING INFORMATION:\n" + "\n".join(details)
+        if "order" in self.failed:
+            return "\n\nORDER TRACKING INFORMATION:\nOrder lookup is temporarily unavailable. Please try again shortly."
+        if self.order_looked_up or self.intent.mentions_order:
+            return "\n\nORDER TRACKING INFORMATION:\nOrder not found. Please check the order ID and try again."
+        return ""
+
+
+class RetrievalPipeline:
+    """
+    Fetches a turn's context as a small async DAG
+
+        intent ─┬─ order lookup ───────────────────────┐
+                └─ encode ─┬─ product search ──────────┼─> RetrievalContext
+                           └─ policy search ───────────┘
+
+    Independent branches run concurrently, each with its own timeout; a
+    branch that times out or fails is left empty and recorded in
+    RetrievalContext.failed instead of failing the turn. Cheapest / most
+    expensive / how many / sort-by questions are answered exactly from
+    the product table instead, without any vector search.
+    """
+
+    def __init__(self, embedding_model, qdrant: VectorStore, orders=None,
+                 config: Optional[RetrievalConfig] = None, catalog=None):
+        """
+        Initialize the pipeline
+
+        Args:
+            embedding_model: Loaded SentenceTransformer
+            qdrant: VectorStore holding products and policies
+            orders: OrderService (None disables order lookups)
+            config: RetrievalConfig (defaults from RETRIEVAL_* env vars)
+            catalog: RAGService whose product_table answers aggregate and
+                sort questions (None disables them)
+        """
+        self.embedding_model = embedding_model
+        self.qdrant = qdrant
+        self.orders = orders
+        self.config = config or RetrievalConfig()
+        self.catalog = catalog
+
+    async def retrieve(self, user_text: str) -> RetrievalContext:
+        """
+        Fetch order, products and policies for one user turn
+
+        Args:
+            user_text: User utterance
+
+        Returns:
+            RetrievalContext
+        """
+        start = time.perf_counter()
+        with span("retrieval", query_chars=len(user_text)) as s:
+            # Order IDs, price range and order keywords in one pass
+            ctx = RetrievalContext(intent=extract_intent(user_text))
+            if not self._answer_from_table(ctx, user_text):
+                branches = [self._search(ctx, user_text)]
+                if ctx.intent.order_id and self.orders is not None:
+                    branches.append(self._lookup_order(ctx))
+                await asyncio.gather(*branches)
+
+            ctx.timings_ms["total"] = round((time.perf_counter() - start) * 1000, 2)
+            s.set_attribute("products", len(ctx.products))
+            s.set_attribute("policies", len(ctx.policies))
+            s.set_attribute("order_found", ctx.order is not None)
+            if ctx.failed:
+                s.set_attribute("failed", ",".join(ctx.failed))
+        logger.info(f"retrieval timings_ms={ctx.timings_ms} failed={ctx.failed}")
+        return ctx
+
+    async def _branch(self, ctx: RetrievalContext, name: str, awaitable: Awaitable,
+                      timeout: float, default: Any = None) -> Any:
+        """Run one branch with a timeout, recording its duration and failure"""
+        start = time.perf_counter()
+        with span(f"retrieval.{name}") as s:
+            try:
+                return await asyncio.wait_for(awaitable, timeout)
+            except asyncio.TimeoutError:
+                s.set_attribute("timeout", True)
+                ctx.failed.append(name)
+                logger.warning(f"⚠️  retrieval branch {name} timed out after {timeout}s")
+            except Exception as e:
+                s.set_attribute("error", repr(e))
+                ctx.failed.append(name)
+                logger.error(f"❌ retrieval branch {name} failed: {e}")
+            finally:
+                ctx.timings_ms[name] = round((time.perf_counter() - start) * 1000, 2)
+        return default
+
+    def _answer_from_table(self, ctx: RetrievalContext, user_text: str) -> bool:
+        table = self.catalog.product_table if self.catalog is not None else None
+        if table is None:
+            return False
+        start = time.perf_counter()
+        query = table.parse(user_text, ctx.intent)
+        if query is None:
+            return False
+        with span("retrieval.table", op=query.op) as s:
+            answer = ctx.catalog_answer = table.run(query)
+            s.set_attribute("matched", answer.total)
+        ctx.products = [
+            ProductHit(
+                id=str(row["id"]),
+                name=row["name"],
+                price=row["price"],
+                category=row["category"],
+                description=row["text"],
+                stock=row["stock"],
+            )
+            for row in answer.rows
+        ]
+        ctx.timings_ms["table"] = round((time.perf_counter() - start) * 1000, 3)
+        return True
+
+    async def _lookup_order(self, ctx: RetrievalContext):
+        ctx.order_looked_up = True
+        ctx.order = await self._branch(ctx, "order", self.orders.track_order_async(ctx.intent.order_id),
+                                       self.config.order_timeout_seconds)
+
+    async def _search(self, ctx: RetrievalContext, user_text: str):
+        # Comparisons ("headphones vs earbuds") get one product retrieval per item
+        subqueries = split_subqueries(user_text)
+        texts = [user_text] + (subqueries if len(subqueries) > 1 else [])
+        vectors = await self._branch(ctx, "encode", asyncio.to_thread(self.embedding_model.encode, texts),
+                                     self.config.embed_timeout_seconds)
+        if vectors is None:
+            return
+        product_vectors = vectors[1:] if len(texts) > 1 else vectors[:1]
+        await asyncio.gather(
+            self._search_products(ctx, [v.tolist() for v in product_vectors]),
+            self._search_policies(ctx, vectors[0].tolist()),
+        )
+
+    async def _search_products(self, ctx: RetrievalContext, vectors: List[List[float]]):
+        from qdrant_client.models import FieldCondition, Range
+
+        product_filter = source_filter("products")
+        intent = ctx.intent
+        if intent.has_price_range:
+            range_kwargs: Dict[str, float] = {}
+            if intent.min_price is not None:
+                range_kwargs["gte"] = intent.min_price
+            if intent.max_price is not None:
+                range_kwargs["lte"] = intent.max_price
+            product_filter.must.append(FieldCondition(key="price", range=Range(**range_kwargs)))
+
+        per_query = self.config.product_results // len(vectors)
+        queries = [BatchQuery(v, limit=per_query, query_filter=product_filter, with_payload=PRODUCT_HIT_FIELDS)
+                   for v in vectors]
+        results = await self._branch(ctx, "products", self.qdrant.search_batch_async(queries),
+                                     self.config.search_timeout_seconds, default=[])
+
+        # Interleave across sub-queries so every compared item is represented
+        seen = set()
+        for rank in range(per_query):
+            for hits in results:
+                if rank >= len(hits) or hits[rank].id in seen:
+                    continue
+                hit = hits[rank]
+                seen.add(hit.id)
+                payload = hit.payload
+                ctx.products.append(ProductHit(
+                    id=str(hit.id),
+                    name=payload.get("name", ""),
+                    price=payload.get("price", ""),
+                    category=payload.get("category", ""),
+                    description=payload.get("text", ""),
+                    stock=payload.get("stock"),
+                    score=hit.score,
+                ))
+
+    async def _search_policies(self, ctx: RetrievalContext, vector: List[float]):
+        hits = await self._branch(
+            ctx, "policies",
+            self.qdrant.search_async(vector, limit=self.config.policy_results,
+                                     query_filter=source_filter("policies"),
+                                     with_payload=POLICY_HIT_FIELDS),
+            self.config.search_timeout_seconds, default=[])
+        ctx.policies.extend(
+            PolicyHit(
+                question=hit.payload.get("question", ""),
+                answer=hit.payload.get("text", ""),
+                category=hit.payload.get("category", ""),
+                score=hit.score,
+            )
+            for hit in hits
+        )
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _load_embedding_model():
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer("all-MiniLM-L6-v2")
+    # First encode allocates buffers; pay for it at load time, not in a user turn
+    model.encode(["warm up"])
+    return model
+
+
+def _load_qdrant():
+    from app.config.qdrant_config import QdrantConfig
+    from app.service.vector_store import create_vector_store
+
+    return create_vector_store(QdrantConfig())
+
+
+def _load_orders():
+    from app.service.orders_service import OrderService
+
+    return OrderService(csv_path="./data/orders.csv")
+
+
+DEFAULT_LOADERS: Dict[str, Callable[[], Any]] = {
+    "embedding_model": _load_embedding_model,
+    "qdrant": _load_qdrant,
+    "orders": _load_orders,
+}
+
+
+@dataclass(frozen=True)
+class Services:
+    """Immutable snapshot of loaded dependencies (None = not loaded yet)"""
+    embedding_model: Any = None
+    qdrant: Any = None
+    orders: Any = None
+
+    @property
+    def complete(self) -> bool:
+        return all(v is not None for v in (self.embedding_model, self.qdrant, self.orders))
+
+
+@dataclass
+class DependencyHealth:
+    """Load state of a single dependency"""
+    status: str = "pending"  # pending | loading | ok | error
+    attempts: int = 0
+    last_error: Optional[str] = None
+    load_seconds: Optional[float] = None
+    next_retry_at: float = 0.0
+    failures: int = field(default=0, repr=False)
+
+
+class ServiceContainer:
+    """
+    Shared services for long-lived workers (LiveKit agent, MCP server)
+
+    - Lock-free read path: once every dependency is loaded, get() is a
+      single attribute read of an immutable snapshot.
+    - Single-flight init: concurrent callers await the same load task.
+    - Per-dependency retry with exponential backoff: a dependency that
+      fails (e.g. Qdrant down) is retried later without reloading the
+      ones that succeeded, and callers get a partial snapshot meanwhile.
+    """
+
+    def __init__(self, loaders: Optional[Dict[str, Callable[[], Any]]] = None,
+                 base_backoff: float = 1.0, max_backoff: float = 60.0):
+        """
+        Initialize the container (nothing is loaded until load/get)
+
+        Args:
+            loaders: Mapping of Services field name -> zero-arg loader
+            base_backoff: Delay before the first retry of a failed dependency (seconds)
+            max_backoff: Upper bound for the retry delay (seconds)
+        """
+        self._loaders = loaders or DEFAULT_LOADERS
+        self._base_backoff = base_backoff
+        self._max_backoff = max_backoff
+        self._snapshot = Services()
+        self._init_task: Optional[asyncio.Task] = None
+        self._health: Dict[str, DependencyHealth] = {name: DependencyHealth() for name in self._loaders}
+        self._retrieval: Any = None
+        self._retrieval_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _pending(self, now: float) -> list:
+        return [
+            name for name, health in self._health.items()
+            if getattr(self._snapshot, name) is None and health.next_retry_at <= now
+        ]
+
+    def _load_one(self, name: str) -> Any:
+        health = self._health[name]
+        health.status = "loading"
+        health.attempts += 1
+        start = time.perf_counter()
+        try:
+            value = self._loaders[name]()
+        except Exception as e:
+            health.failures += 1
+            delay = min(self._base_backoff * 2 ** (health.failures - 1), self._max_backoff)
+            health.next_retry_at = time.monotonic() + delay * random.uniform(0.8, 1.2)
+            health.status = "error"
+            health.last_error = repr(e)
+            logger.error(f"❌ Failed to load {name} (attempt {health.attempts}, retry in {delay:.1f}s): {e}")
+            return None
+
+        health.status = "ok"
+        health.failures = 0
+        health.last_error = None
+        health.load_seconds = round(time.perf_counter() - start, 3)
+        logger.info(f"✅ Loaded {name} in {health.load_seconds}s")
+        return value
+
+    def _publish(self, loaded: Dict[str, Any]):
+        # Replace the snapshot wholesale; readers never see a half-updated object
+        if loaded:
+            current = {name: getattr(self._snapshot, name) for name in self._loaders}
+            current.update({k: v for k, v in loaded.items() if v is not None})
+            self._snapshot = Services(**current)
+
+    def load_sync(self) -> Services:
+        """
+        Load every missing dependency in the calling thread
+
+        Used from LiveKit's prewarm hook, which runs before the process
+        has an event loop serving jobs. Backoff is ignored here.
+        """
+        self._publish({name: self._load_one(name)
+                       for name in self._loaders if getattr(self._snapshot, name) is None})
+        return self._snapshot
+
+    async def _load_async(self, names: list):
+        # Independent dependencies load concurrently in worker threads
+        values = await asyncio.gather(*(asyncio.to_thread(self._load_one, n) for n in names))
+        self._publish(dict(zip(names, values)))
+
+    async def get(self) -> Services:
+        """
+        Return the current services snapshot, loading missing ones if due
+
+        Returns:
+            Services snapshot; fields are None for dependencies that are
+            still loading or waiting for their next retry
+        """
+        snapshot = self._snapshot
+        if snapshot.complete:
+            return snapshot
+
+        if self._init_task is None or self._init_task.done():
+            pending = self._pending(time.monotonic())
+            if not pending:
+                return snapshot  # everything missing is backing off
+            self._init_task = asyncio.create_task(self._load_async(pending))
+
+        # shield: a cancelled tool call must not cancel the shared load
+        await asyncio.shield(self._init_task)
+        return self._snapshot
+
+    @property
+    def retrieval(self) -> Any:
+        """The shared RetrievalPipeline, or None until build_retrieval() ran"""
+        return self._retrieval
+
+    def build_retrieval(self) -> Any:
+        """
+        Build the shared RetrievalPipeline once every dependency is loaded
+
+        It gets the same catalog tables server.process_query passes, so
+        template answers match the server's. Blocking (reads the catalog
+        CSVs): call it from prewarm or a worker thread.
+
+        Returns:
+            RetrievalPipeline, or None while dependencies are missing
+        """
+        snapshot = self._snapshot
+        if not snapshot.complete:
+            return None
+        with self._retrieval_lock:
+            if self._retrieval is None:
+                from app.service.rag_service import RAGService, catalog_sources
+                from app.service.retrieval_service import RetrievalPipeline
+
+                catalog = RAGService(snapshot.qdrant, model=snapshot.embedding_model)
+                catalog.load_tables(catalog_sources())
+                self._retrieval = RetrievalPipeline(snapshot.embedding_model, snapshot.qdrant,
+                                                    snapshot.orders, catalog=catalog)
+        return self._retrieval
+
+    # ------------------------------------------------------------------
+    # Health
+    # ------------------------------------------------------------------
+
+    @property
+    def ready(self) -> bool:
+        return self._snapshot.complete
+
+    def health(self) -> Dict[str, Dict[str, Any]]:
+        """Per-dependency load status"""
+        now = time.monotonic()
+        return {
+            name: {
+                "status": h.status,
+                "attempts": h.attempts,
+                "last_error": h.last_error,
+                "load_seconds": h.load_seconds,
+                "retry_in_s": round(max(h.next_retry_at - now, 0.0), 1) if h.status == "error" else None,
+            }
+            for name, h in self._health.items()
+        }
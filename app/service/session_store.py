@@ -0,0 +1,323 @@
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+from app.core.settings import settings
+
+
+class SessionStore(ABC):
+    """
+    Conversation history per session
+
+    Each session holds its recent messages verbatim plus a running summary
+    of older ones (see app.service.conversation_history). The in-memory
+    implementation is process-local; use the SQLite or Redis backends when
+    several server workers must share sessions.
+    """
+
+    # Methods may wait on locks or the network (async callers use a worker thread)
+    blocking = True
+
+    @abstractmethod
+    def get_messages(self, session_id: str) -> List[Dict]:
+        """Return the stored messages for a session (oldest first)"""
+
+    @abstractmethod
+    def get_summary(self, session_id: str) -> str:
+        """Return the running summary of the session's folded messages ("" if none)"""
+
+    def get_history(self, session_id: str) -> Tuple[str, List[Dict]]:
+        """Return (summary, messages)"""
+        return self.get_summary(session_id), self.get_messages(session_id)
+
+    @abstractmethod
+    def append_messages(self, session_id: str, messages: List[Dict], max_messages: int):
+        """Append messages and keep only the last max_messages"""
+
+    @abstractmethod
+    def fold_messages(self, session_id: str, folded: List[Dict], summary: str) -> bool:
+        """
+        Replace the summary and drop the folded messages, atomically
+
+        Args:
+            session_id: Session
+            folded: The leading messages the new summary covers
+            summary: Summary of the old summary plus folded
+
+        Returns:
+            False (and no change) when the history no longer starts with
+            folded, e.g. another worker folded it first
+        """
+
+    @abstractmethod
+    def clear(self, session_id: str):
+        """Forget a session's history and summary"""
+
+
+class MemorySessionStore(SessionStore):
+    """Process-local dict (default, single worker)"""
+
+    blocking = False
+
+    def __init__(self):
+        self._sessions: Dict[str, List[Dict]] = {}
+        self._summaries: Dict[str, str] = {}
+        # Folds run on daemon threads in blocking callers, concurrently with turns
+        self._lock = threading.Lock()
+
+    def get_messages(self, session_id: str) -> List[Dict]:
+        with self._lock:
+            return list(self._sessions.get(session_id, []))
+
+    def get_summary(self, session_id: str) -> str:
+        with self._lock:
+            return self._summaries.get(session_id, "")
+
+    def get_history(self, session_id: str) -> Tuple[str, List[Dict]]:
+        # One snapshot, so a fold can't land between the summary and the messages
+        with self._lock:
+            return self._summaries.get(session_id, ""), list(self._sessions.get(session_id, []))
+
+    def append_messages(self, session_id: str, messages: List[Dict], max_messages: int):
+        with self._lock:
+            history = self._sessions.setdefault(session_id, [])
+            history.extend(messages)
+            if len(history) > max_messages:
+                self._sessions[session_id] = history[-max_messages:]
+
+    def fold_messages(self, session_id: str, folded: List[Dict], summary: str) -> bool:
+        with self._lock:
+            history = self._sessions.get(session_id, [])
+            if history[:len(folded)] != folded:
+                return False
+            self._sessions[session_id] = history[len(folded):]
+            self._summaries[session_id] = summary
+            return True
+
+    def clear(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._summaries.pop(session_id, None)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite file shared by all workers on one host
+
+    WAL mode lets readers proceed while a worker writes; each process
+    opens its own connection after fork.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int = 0):
+        """
+        Args:
+            path: SQLite database file
+            ttl_seconds: Drop sessions idle for longer than this (0 = keep)
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._purged_at = 0.0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, messages TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            # Separate table so databases created before summaries need no migration
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_summaries ("
+                "session_id TEXT PRIMARY KEY, summary TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS session_summaries_updated_at ON session_summaries (updated_at)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread (sqlite3 connections are not thread-safe)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _expire(self, conn: sqlite3.Connection, session_id: str, now: float):
+        """
+        Delete the session if it has been idle past the TTL (call inside a write transaction)
+
+        At most once per TTL period, sweeps every expired session instead.
+        """
+        if not self.ttl_seconds:
+            return
+        cutoff = now - self.ttl_seconds
+        if now - self._purged_at >= self.ttl_seconds:
+            self._purged_at = now
+            conn.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,))
+            conn.execute("DELETE FROM session_summaries WHERE updated_at < ?", (cutoff,))
+            return
+        conn.execute("DELETE FROM sessions WHERE session_id = ? AND updated_at < ?", (session_id, cutoff))
+        conn.execute(
+            "DELETE FROM session_summaries WHERE session_id = ? AND updated_at < ?", (session_id, cutoff)
+        )
+
+    def get_messages(self, session_id: str) -> List[Dict]:
+        row = self._connect().execute(
+            "SELECT messages, updated_at FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if not row:
+            return []
+        if self.ttl_seconds and time.time() - row[1] > self.ttl_seconds:
+            return []
+        return json.loads(row[0])
+
+    def get_summary(self, session_id: str) -> str:
+        row = self._connect().execute(
+            "SELECT summary, updated_at FROM session_summaries WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if not row:
+            return ""
+        if self.ttl_seconds and time.time() - row[1] > self.ttl_seconds:
+            return ""
+        return row[0]
+
+    def append_messages(self, session_id: str, messages: List[Dict], max_messages: int):
+        conn = self._connect()
+        # IMMEDIATE takes the write lock up front so concurrent workers serialise cleanly
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            # An expired session starts over instead of coming back with its old turns
+            self._expire(conn, session_id, now)
+            row = conn.execute(
+                "SELECT messages FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            history = json.loads(row[0]) if row else []
+            history = (history + messages)[-max_messages:]
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, messages, updated_at) VALUES (?, ?, ?)",
+                (session_id, json.dumps(history), now),
+            )
+            # The summary lives as long as the session's turns
+            conn.execute(
+                "UPDATE session_summaries SET updated_at = ? WHERE session_id = ?", (now, session_id)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def fold_messages(self, session_id: str, folded: List[Dict], summary: str) -> bool:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            self._expire(conn, session_id, now)
+            row = conn.execute(
+                "SELECT messages FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            history = json.loads(row[0]) if row else []
+            if history[:len(folded)] != folded:
+                conn.execute("COMMIT")  # keep any expired rows _expire dropped
+                return False
+            conn.execute(
+                "UPDATE sessions SET messages = ?, updated_at = ? WHERE session_id = ?",
+                (json.dumps(history[len(folded):]), now, session_id),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO session_summaries (session_id, summary, updated_at) VALUES (?, ?, ?)",
+                (session_id, summary, now),
+            )
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def clear(self, session_id: str):
+        conn = self._connect()
+        conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        conn.execute("DELETE FROM session_summaries WHERE session_id = ?", (session_id,))
+
+
+class RedisSessionStore(SessionStore):
+    """Redis list per session, shared by workers on any host"""
+
+    def __init__(self, url: str, ttl_seconds: int = 0, prefix: str = "voicebot:session:"):
+        """
+        Args:
+            url: Redis URL (e.g. redis://localhost:6379)
+            ttl_seconds: Expire sessions idle for longer than this (0 = keep)
+            prefix: Key prefix
+        """
+        import redis
+
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def get_messages(self, session_id: str) -> List[Dict]:
+        return [json.loads(m) for m in self.client.lrange(self.prefix + session_id, 0, -1)]
+
+    def get_summary(self, session_id: str) -> str:
+        return self.client.get(self.prefix + session_id + ":summary") or ""
+
+    def get_history(self, session_id: str) -> Tuple[str, List[Dict]]:
+        key = self.prefix + session_id
+        summary, messages = self.client.pipeline().get(key + ":summary").lrange(key, 0, -1).execute()
+        return summary or "", [json.loads(m) for m in messages]
+
+    def append_messages(self, session_id: str, messages: List[Dict], max_messages: int):
+        key = self.prefix + session_id
+        pipe = self.client.pipeline()
+        pipe.rpush(key, *(json.dumps(m) for m in messages))
+        pipe.ltrim(key, -max_messages, -1)
+        if self.ttl_seconds:
+            pipe.expire(key, self.ttl_seconds)
+            pipe.expire(key + ":summary", self.ttl_seconds)
+        pipe.execute()
+
+    def fold_messages(self, session_id: str, folded: List[Dict], summary: str) -> bool:
+        import redis
+
+        key = self.prefix + session_id
+        with self.client.pipeline() as pipe:
+            try:
+                # Optimistic transaction: aborts if another worker touches the list meanwhile
+                pipe.watch(key)
+                head = [json.loads(m) for m in pipe.lrange(key, 0, len(folded) - 1)]
+                if head != folded:
+                    return False
+                pipe.multi()
+                pipe.ltrim(key, len(folded), -1)
+                pipe.set(key + ":summary", summary, ex=self.ttl_seconds or None)
+                pipe.execute()
+                return True
+            except redis.WatchError:
+                return False
+
+    def clear(self, session_id: str):
+        self.client.delete(self.prefix + session_id, self.prefix + session_id + ":summary")
+
+
+def create_session_store(backend: Optional[str] = None) -> SessionStore:
+    """
+    Build the configured session store
+
+    Args:
+        backend: "memory", "sqlite" or "redis" (defaults to SESSION_BACKEND)
+    """
+    backend = (backend or settings.SESSION_BACKEND).lower()
+
+    if backend == "sqlite":
+        return SQLiteSessionStore(settings.SESSION_SQLITE_PATH, settings.SESSION_TTL_SECONDS)
+    if backend == "redis":
+        return RedisSessionStore(settings.REDIS_URL, settings.SESSION_TTL_SECONDS)
+    if backend == "memory":
+        return MemorySessionStore()
+
+    raise ValueError(f"Unknown session backend: {backend}")
@@ -1,8 +1,9 @@
-from openai import OpenAI
 import io
 from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv
+from app.core.http_clients import async_openai_client, openai_client
+from app.core.telemetry import span
 
 # Load .env into environment
 load_dotenv()
@@ -29,25 +30,31 @@ class STTService:
     def __init__(self, config: Optional[STTConfig] = None):
         self.config = config or STTConfig()
 
-        # API key is automatically picked from OPENAI_API_KEY
-        self.client = OpenAI()
+        # OPENAI_API_KEY; both clients share the process-wide "openai" pools
+        self.client = openai_client()
+        self.async_client = async_openai_client()
 
         print(f"✓ STT Service initialized (model: {self.config.model})")
 
     async def transcribe(
         self,
         audio_data: bytes,
-        language: Optional[str] = None
+        language: Optional[str] = None,
+        filename: str = "audio.wav"
     ) -> str:
         try:
             audio_file = io.BytesIO(audio_data)
-            audio_file.name = "audio.wav"
+            # The extension tells Whisper how to decode the upload
+            audio_file.name = filename
 
-            transcript = self.client.audio.transcriptions.create(
-                model=self.config.model,
-                file=audio_file,
-                language=language or self.config.language,
-            )
+            with span("stt.transcribe", model=self.config.model,
+                      audio_bytes=len(audio_data), filename=filename) as s:
+                transcript = await self.async_client.audio.transcriptions.create(
+                    model=self.config.model,
+                    file=audio_file,
+                    language=language or self.config.language,
+                )
+                s.set_attribute("transcript_chars", len(transcript.text))
 
             return transcript.text
 
@@ -58,11 +65,13 @@ class STTService:
     def transcribe_sync(
         self,
         audio_data: bytes,
-        language: Optional[str] = None
+        language: Optional[str] = None,
+        filename: str = "audio.wav"
     ) -> str:
         try:
             audio_file = io.BytesIO(audio_data)
-            audio_file.name = "audio.wav"
+            # The extension tells Whisper how to decode the upload
+            audio_file.name = filename
 
             transcript = self.client.audio.transcriptions.create(
                 model=self.config.model,
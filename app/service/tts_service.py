@@ -1,6 +1,7 @@
-from openai import OpenAI
 from typing import Literal, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from app.core.http_clients import async_openai_client, openai_client
+from app.core.telemetry import span
 
 VoiceType = Literal["alloy", "echo", "fable", "onyx", "nova", "shimmer"]
 
@@ -30,7 +31,9 @@ class TTSService:
             config: TTSConfig instance (uses env vars if not provided)
         """
         self.config = config or TTSConfig()
-        self.client = OpenAI(api_key=self.config.openai_api_key)
+        # Both clients share the process-wide "openai" pools
+        self.client = openai_client(api_key=self.config.openai_api_key)
+        self.async_client = async_openai_client(api_key=self.config.openai_api_key)
         print(f"✓ TTS Service initialized (model: {self.config.model}, voice: {self.config.voice})")
     
     async def synthesize(self, text: str, 
@@ -48,12 +51,14 @@ class TTSService:
             Audio data as bytes (MP3 format)
         """
         try:
-            response = self.client.audio.speech.create(
-                model=self.config.model,
-                voice=voice or self.config.voice,
-                input=text,
-                speed=speed or self.config.speed
-            )
+            with span("tts.synthesize", model=self.config.model, text_chars=len(text)) as s:
+                response = await self.async_client.audio.speech.create(
+                    model=self.config.model,
+                    voice=voice or self.config.voice,
+                    input=text,
+                    speed=speed or self.config.speed
+                )
+                s.set_attribute("audio_bytes", len(response.content))
             
             return response.content
         
@@ -0,0 +1,144 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from app.config.qdrant_config import QdrantConfig
+from app.config.vector_store_config import VectorStoreConfig
+
+
+class VectorStore(ABC):
+    """
+    Vector index used for catalog search and ingestion
+
+    Implemented by QdrantService (server or in-process Qdrant) and
+    NumpyVectorStore (brute-force matrix in this process). Both use
+    point_id() keys, qdrant_client Filter objects for payload filters
+    (see source_filter) and BatchQuery for batched searches, and serve
+    collection_name as an alias over versioned collections for blue/green
+    rebuilds. Results expose .id, .score and .payload; reads take a
+    with_payload PayloadSelection (all keys, named keys, or none) and
+    never return vectors.
+    """
+
+    collection_name: str
+
+    @property
+    @abstractmethod
+    def persistent(self) -> bool:
+        """Whether points outlive this process (and are visible to other processes)"""
+
+    # --- collections --------------------------------------------------------
+
+    @abstractmethod
+    def active_collection(self) -> str:
+        """Name of the physical collection currently served under collection_name"""
+
+    @abstractmethod
+    def create_collection_version(self) -> str:
+        """Create an empty versioned collection; returns its name (not yet published)"""
+
+    @abstractmethod
+    def publish(self, collection_name: str) -> Optional[str]:
+        """Serve collection_name; returns the previously served collection, or None"""
+
+    @abstractmethod
+    def drop_collection(self, collection_name: str):
+        """Delete a (no longer published) collection version"""
+
+    def clear_collection(self):
+        """Swap in an empty collection version and drop the old one"""
+        previous = self.publish(self.create_collection_version())
+        if previous:
+            self.drop_collection(previous)
+
+    def apply_tuning(self, collection_name: Optional[str] = None):
+        """Migrate an existing collection to the configured index settings (if any)"""
+
+    @abstractmethod
+    def collection_info(self, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """Collection metadata (points_count, status, ...) for health checks"""
+
+    # --- writes -------------------------------------------------------------
+
+    @abstractmethod
+    def add(self, vectors: List[List[float]], payloads: List[Dict[str, Any]],
+            keys: Optional[List[str]] = None,
+            collection_name: Optional[str] = None) -> List[str]:
+        """Upsert vectors with payloads; keyed points get point_id(key) IDs"""
+
+    @abstractmethod
+    def content_hashes(self, source: str, collection_name: Optional[str] = None) -> Dict[str, str]:
+        """Map point ID -> payload["content_hash"] for every point of a source"""
+
+    @abstractmethod
+    def copy_points(self, point_ids: List[str], source_collection: str,
+                    target_collection: str, batch_size: int = 256) -> int:
+        """Copy points (vector + payload) between collections; returns the number copied"""
+
+    @abstractmethod
+    def delete(self, point_ids: List[str], collection_name: Optional[str] = None):
+        """Delete points by ID"""
+
+    # --- reads --------------------------------------------------------------
+
+    @abstractmethod
+    def count(self, exact: bool = False) -> int:
+        """Number of points in the served collection"""
+
+    @abstractmethod
+    def search(self, query_vector: List[float], limit: int = 5, query_filter=None,
+               with_payload=True):
+        """Nearest points by cosine similarity, best first"""
+
+    @abstractmethod
+    async def search_async(self, query_vector: List[float], limit: int = 5, query_filter=None,
+                           with_payload=True):
+        """search() for use on an event loop"""
+
+    @abstractmethod
+    def search_batch(self, queries):
+        """One result list per BatchQuery, in order"""
+
+    @abstractmethod
+    async def search_batch_async(self, queries):
+        """search_batch() for use on an event loop"""
+
+    @abstractmethod
+    def retrieve(self, point_ids: List[str], with_payload=True):
+        """The points that exist among point_ids (payload only)"""
+
+    @abstractmethod
+    async def retrieve_async(self, point_ids: List[str], with_payload=True):
+        """retrieve() for use on an event loop"""
+
+    # --- lifecycle ----------------------------------------------------------
+
+    def flush(self):
+        """Persist pending writes (no-op where every write is already durable)"""
+
+    def close(self):
+        """Release blocking resources (connections, file handles)"""
+
+    async def aclose(self):
+        """Release async resources"""
+
+
+def create_vector_store(config: Optional[QdrantConfig] = None,
+                        store_config: Optional[VectorStoreConfig] = None) -> VectorStore:
+    """
+    Build the configured vector store
+
+    Args:
+        config: QdrantConfig (collection name, vector size, Qdrant settings)
+        store_config: VectorStoreConfig (backend; defaults from VECTOR_STORE_* env vars)
+
+    Returns:
+        QdrantService or NumpyVectorStore
+    """
+    config = config or QdrantConfig()
+    store_config = store_config or VectorStoreConfig()
+    if store_config.backend == "numpy":
+        from app.service.numpy_vector_store import NumpyVectorStore
+        return NumpyVectorStore(config, store_config)
+
+    from app.service.qdrant_service import QdrantService
+    return QdrantService(config)
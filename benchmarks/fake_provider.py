@@ -0,0 +1,179 @@
+"""
+Fake OpenAI-compatible provider
+
+Stands in for OpenRouter (chat completions) and OpenAI (Whisper STT and
+TTS) during benchmarks. Each endpoint sleeps for a configurable latency
+so the server's own overhead can be measured in isolation.
+
+When a chat request offers tools, the first response asks for them the
+way a capable model would: track_order per order ID in the message plus
+search_products for product requests, all in one parallel batch. Once
+tool results are in, it answers with text.
+
+Usage blocks report cached prompt tokens the way OpenAI's prompt cache
+does: the longest previously seen prompt prefix of at least 1024 tokens,
+in 128-token steps (~4 characters per token).
+
+    python -m benchmarks.fake_provider --port 9100 --llm-latency-ms 300
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+
+from app.service.intent_service import extract_intent
+
+LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "0"))
+STT_LATENCY_MS = float(os.getenv("FAKE_STT_LATENCY_MS", "0"))
+TTS_LATENCY_MS = float(os.getenv("FAKE_TTS_LATENCY_MS", "0"))
+TRANSCRIPT = os.getenv("FAKE_TRANSCRIPT", "Show me headphones under $100")
+CACHE_MIN_TOKENS = int(os.getenv("FAKE_CACHE_MIN_TOKENS", "1024"))
+CACHE_STEP_TOKENS = 128
+CACHE_ENTRIES = 50000
+
+PRODUCT_WORDS = re.compile(r"\b(?:show|find|search|looking|products?|cheaper|under|recommend|need|have)\b",
+                           re.IGNORECASE)
+
+app = FastAPI(title="Fake OpenAI-compatible provider")
+
+_prefix_cache: "OrderedDict[bytes, None]" = OrderedDict()
+
+
+def cached_prompt_tokens(messages: list) -> int:
+    """Tokens of the longest cached prefix; caches this prompt's prefixes"""
+    prompt = "".join(f"{m.get('role')}:{m.get('content') or ''}\n" for m in messages).encode()
+    digest, cached, position = hashlib.sha1(), 0, 0
+    for tokens in range(CACHE_MIN_TOKENS, len(prompt) // 4 + 1, CACHE_STEP_TOKENS):
+        digest.update(prompt[position:tokens * 4])
+        position = tokens * 4
+        key = digest.digest()
+        if key in _prefix_cache:
+            _prefix_cache.move_to_end(key)
+            cached = tokens
+        else:
+            _prefix_cache[key] = None
+            if len(_prefix_cache) > CACHE_ENTRIES:
+                _prefix_cache.popitem(last=False)
+    return cached
+
+
+def tool_calls_for(messages: list, tools: list) -> list:
+    """Tool calls for the latest user message, or [] once tools have answered"""
+    if not messages or messages[-1].get("role") != "user":
+        return []
+    text = str(messages[-1].get("content", ""))
+    names = {t["function"]["name"] for t in tools}
+    intent = extract_intent(text)
+
+    calls = []
+    if "track_order" in names:
+        calls += [("track_order", {"order_id": order_id}) for order_id in intent.order_ids]
+    if "search_products" in names and (not calls or PRODUCT_WORDS.search(text)):
+        arguments = {"query": text}
+        if intent.max_price is not None:
+            arguments["max_price"] = intent.max_price
+        calls.append(("search_products", arguments))
+    return [
+        {"id": f"call_{uuid.uuid4().hex[:12]}", "type": "function",
+         "function": {"name": name, "arguments": json.dumps(arguments)}}
+        for name, arguments in calls
+    ]
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    await asyncio.sleep(LLM_LATENCY_MS / 1000)
+
+    messages = body.get("messages", [])
+    prompt_chars = sum(len(str(m.get("content", ""))) for m in messages)
+    cached = min(cached_prompt_tokens(messages), prompt_chars // 4)
+    tool_calls = tool_calls_for(messages, body.get("tools") or [])
+    if tool_calls:
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": None, "tool_calls": tool_calls},
+                "finish_reason": "tool_calls",
+            }],
+            "usage": {"prompt_tokens": prompt_chars // 4, "completion_tokens": 20 * len(tool_calls),
+                      "total_tokens": prompt_chars // 4 + 20 * len(tool_calls),
+                      "prompt_tokens_details": {"cached_tokens": cached}},
+        }
+
+    content = "Here are a few options that match what you asked for."
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            # ~4 characters per token, close enough for load shaping
+            "prompt_tokens": prompt_chars // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": (prompt_chars + len(content)) // 4,
+            "prompt_tokens_details": {"cached_tokens": cached},
+        },
+    }
+
+
+@app.post("/v1/audio/transcriptions")
+async def transcriptions(request: Request):
+    await request.body()
+    await asyncio.sleep(STT_LATENCY_MS / 1000)
+    return {"text": TRANSCRIPT}
+
+
+@app.post("/v1/audio/speech")
+async def speech(request: Request):
+    body = await request.json()
+    await asyncio.sleep(TTS_LATENCY_MS / 1000)
+    # Roughly 1 KB of MP3 per 15 characters of input
+    size = max(1024, len(body.get("input", "")) * 70)
+    return Response(content=b"\xff\xfb" + b"\x00" * (size - 2), media_type="audio/mpeg")
+
+
+@app.get("/v1/models")
+async def models():
+    # Token-free request the server uses to open its pooled connections
+    return {"object": "list", "data": [{"id": "fake", "object": "model", "owned_by": "benchmark"}]}
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--llm-latency-ms", type=float, default=LLM_LATENCY_MS)
+    parser.add_argument("--stt-latency-ms", type=float, default=STT_LATENCY_MS)
+    parser.add_argument("--tts-latency-ms", type=float, default=TTS_LATENCY_MS)
+    args = parser.parse_args()
+
+    LLM_LATENCY_MS = args.llm_latency_ms
+    STT_LATENCY_MS = args.stt_latency_ms
+    TTS_LATENCY_MS = args.tts_latency_ms
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
@@ -0,0 +1,218 @@
+"""
+Differential fuzz + throughput benchmark for app.service.intent_service
+
+`legacy_extract` is the inline order-ID/price parsing process_query used
+before the shared intent module (six re.search calls, repeated keyword
+scans, chained .replace normalization). The fuzzer feeds both
+implementations random utterances assembled from order, price, keyword,
+filler and noise fragments and reports every disagreement; the
+throughput run compares calls/s on a realistic query mix.
+
+    python -m benchmarks.intent --cases 200000 --seconds 3
+
+Exits non-zero on unexpected disagreements. Two divergences are
+intentional and counted separately: a 5+ digit number inside a price
+phrase ("status of items under 50000") is no longer also taken as an
+order ID, and IDs are fully normalized (legacy kept tabs etc.).
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.service.intent_service import extract_intent, normalize_order_id
+from benchmarks.run import git_revision, save_results
+
+Result = Tuple[Optional[str], Optional[float], Optional[float], bool]
+
+
+def legacy_extract(user_text: str) -> Result:
+    """Verbatim logic of the previous process_query (order ID, price range, keyword flag)"""
+    lowered = user_text.lower()
+    order_keywords = ["track", "order", "status", "where is", "my order", "order number"]
+
+    order_id = None
+    order_id_match = re.search(r'\b(?:ORD|order)[\s\-_]?(\d{5,})\b', user_text, re.IGNORECASE)
+    if not order_id_match:
+        if any(keyword in lowered for keyword in order_keywords):
+            order_id_match = re.search(r'\b(\d{5,})\b', user_text)
+
+    if order_id_match:
+        matched_text = order_id_match.group(0).upper()
+        if matched_text.startswith("ORD") or matched_text.startswith("ORDER"):
+            order_id = matched_text.replace(" ", "").replace("-", "").replace("_", "")
+            if order_id.startswith("ORDER"):
+                order_id = order_id[5:]
+            if not order_id.startswith("ORD"):
+                order_id = "ORD" + order_id
+        else:
+            if order_id_match.lastindex and order_id_match.lastindex >= 1:
+                order_id = "ORD" + order_id_match.group(1)
+            else:
+                order_id = "ORD" + order_id_match.group(0)
+
+    min_price = max_price = None
+    between_match = re.search(
+        r"between\s*\$?\s*(\d+(?:\.\d+)?)\s*(?:and|-|to)\s*\$?\s*(\d+(?:\.\d+)?)", lowered)
+    under_match = re.search(r"(?:under|below|less than|up to)\s*\$?\s*(\d+(?:\.\d+)?)", lowered)
+    over_match = re.search(r"(?:over|above|more than|greater than)\s*\$?\s*(\d+(?:\.\d+)?)", lowered)
+    if between_match:
+        min_price = float(between_match.group(1))
+        max_price = float(between_match.group(2))
+    elif under_match:
+        max_price = float(under_match.group(1))
+    elif over_match:
+        min_price = float(over_match.group(1))
+
+    mentions_order = any(keyword in lowered for keyword in order_keywords)
+    return order_id, min_price, max_price, mentions_order
+
+
+def new_extract(user_text: str) -> Result:
+    intent = extract_intent(user_text)
+    return intent.order_id, intent.min_price, intent.max_price, intent.mentions_order
+
+
+# ============================================================================
+# FUZZING
+# ============================================================================
+
+FILLER = ["hi", "please", "can you", "show me", "I want", "headphones", "a laptop", "gift",
+          "for my mom", "thanks", "what about", "earbuds", "cheap", "the", "and", "or", "$",
+          "items", "something", "reorder", "ordered", "tracking", "statuses", "whereis"]
+KEYWORDS = ["track", "order", "status", "where is", "my order", "order number", "TRACK", "Order"]
+PRICE_WORDS = ["under", "below", "less than", "up to", "over", "above", "more than",
+               "greater than", "UNDER", "Over"]
+NOISE = ["-", "_", ",", ".", "?", "!", "#", "  ", "\t", "é", "ß", "İ", "🙂", "$$", "1", "0.5"]
+
+
+def random_number(rng: random.Random) -> str:
+    digits = rng.choice([1, 2, 3, 4, 5, 5, 6, 8])
+    number = str(rng.randint(10 ** (digits - 1), 10 ** digits - 1))
+    if rng.random() < 0.2:
+        number += f".{rng.randint(0, 99)}"
+    return number
+
+
+def random_fragment(rng: random.Random) -> str:
+    kind = rng.random()
+    if kind < 0.25:
+        prefix = rng.choice(["ORD", "ord", "Ord", "order", "ORDER", "order ", "ord-", "ORD_", "order-", "", "#"])
+        return prefix + random_number(rng)
+    if kind < 0.40:
+        return f"{rng.choice(PRICE_WORDS)}{rng.choice(['', ' ', ' $', '$', '  $ '])}{random_number(rng)}"
+    if kind < 0.50:
+        sep = rng.choice(["and", "-", "to", " - ", "and $"])
+        return f"between {rng.choice(['', '$'])}{random_number(rng)} {sep} {random_number(rng)}"
+    if kind < 0.65:
+        return rng.choice(KEYWORDS)
+    if kind < 0.75:
+        return rng.choice(NOISE)
+    return rng.choice(FILLER)
+
+
+def random_utterance(rng: random.Random) -> str:
+    parts = [random_fragment(rng) for _ in range(rng.randint(1, 8))]
+    joiner = rng.choice([" ", " ", "", ", "])
+    return joiner.join(parts)
+
+
+_PRICE_PHRASE = re.compile(
+    r"between\s*\$?\s*\d+(?:\.\d+)?\s*(?:and|-|to)\s*\$?\s*\d+(?:\.\d+)?"
+    r"|(?:under|below|less than|up to|over|above|more than|greater than)\s*\$?\s*\d+(?:\.\d+)?"
+)
+
+
+def intentional_divergence(text: str, legacy: Result, new: Result) -> bool:
+    """
+    Known, deliberate differences:
+    - legacy took a number from a price phrase as the order ID
+    - legacy only stripped spaces/dashes/underscores ("ORD\t12345")
+    """
+    if legacy[1:] != new[1:] or legacy[0] is None or legacy[0] == new[0]:
+        return False
+    if normalize_order_id(legacy[0]) == new[0]:
+        return True
+    digits = legacy[0][3:]
+    return any(digits in m.group(0) for m in _PRICE_PHRASE.finditer(text.lower()))
+
+
+def fuzz(cases: int, seed: int) -> Dict[str, object]:
+    rng = random.Random(seed)
+    mismatches: List[Dict[str, object]] = []
+    intentional = 0
+    for _ in range(cases):
+        text = random_utterance(rng)
+        legacy, new = legacy_extract(text), new_extract(text)
+        if legacy == new:
+            continue
+        if intentional_divergence(text, legacy, new):
+            intentional += 1
+        else:
+            mismatches.append({"text": text, "legacy": legacy, "new": new})
+    return {"cases": cases, "mismatches": len(mismatches), "intentional_divergences": intentional,
+            "examples": mismatches[:10]}
+
+
+# ============================================================================
+# THROUGHPUT
+# ============================================================================
+
+QUERIES = [
+    "Show me headphones under $100",
+    "What products do you have between $20 and $50?",
+    "Track my order ORD12345",
+    "where is order 12346",
+    "What is your return policy?",
+    "Do you have any smart home devices?",
+    "status of 12347 please",
+    "Which gaming accessories are over $60?",
+    "I need a gift under $40 for my dad, something with bluetooth",
+    "Hi",
+]
+
+
+def throughput(fn: Callable[[str], Result], seconds: float) -> float:
+    calls = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for query in QUERIES:
+            fn(query)
+        calls += len(QUERIES)
+    return calls / seconds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Intent extraction fuzz + throughput benchmark")
+    parser.add_argument("--cases", type=int, default=100000)
+    parser.add_argument("--seconds", type=float, default=2.0, help="duration of each throughput run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<timestamp>-<commit>.json)")
+    args = parser.parse_args()
+
+    print(f"▶ fuzzing {args.cases} utterances")
+    fuzz_result = fuzz(args.cases, args.seed)
+    print(f"  {fuzz_result['mismatches']} mismatches, "
+          f"{fuzz_result['intentional_divergences']} intentional divergences")
+    for example in fuzz_result["examples"]:
+        print(f"  ✗ {example['text']!r}: legacy={example['legacy']} new={example['new']}")
+
+    print("▶ throughput")
+    legacy_qps = throughput(legacy_extract, args.seconds)
+    new_qps = throughput(new_extract, args.seconds)
+    print(f"  legacy {legacy_qps:,.0f} calls/s, new {new_qps:,.0f} calls/s "
+          f"({new_qps / legacy_qps:.2f}x)")
+
+    path = save_results({
+        "benchmark": "intent",
+        "git": git_revision(),
+        "config": vars(args),
+        "fuzz": fuzz_result,
+        "throughput": {"legacy_calls_per_s": round(legacy_qps), "new_calls_per_s": round(new_qps),
+                       "speedup": round(new_qps / legacy_qps, 2)},
+    }, args.output)
+    print(f"📄 Results saved to {path}")
+    sys.exit(1 if fuzz_result["mismatches"] else 0)
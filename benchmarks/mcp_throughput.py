@@ -0,0 +1,181 @@
+"""
+Throughput benchmark for the MCP tool server over the stdio transport
+
+Launches `python -m app.mcp_server` as an MCP client would (in-memory
+Qdrant, synthetic catalog and orders), then issues a mix of
+search_products (with and without max_price), track_order and
+get_product_details calls at each requested concurrency over one client
+session, and reports calls/s, per-tool latency percentiles, result sizes
+and errors.
+
+The in-memory Qdrant evaluates payload filters in Python under the GIL
+(~40 ms per filtered search on 2k products), so with search_products in
+the mix throughput is bound by that stand-in; `--tools track_order
+get_product_details` measures the transport and dispatch path alone.
+
+    python -m benchmarks.mcp_throughput --products 5000 --calls 2000 --concurrency 1 8 32
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from benchmarks.run import REPO_ROOT, git_revision, percentile, save_results
+from benchmarks.synthetic_data import create_synthetic_csv_files
+
+SEARCH_QUERIES = [
+    "wireless headphones",
+    "something for the kitchen",
+    "gaming accessories",
+    "smart home devices",
+    "a gift for a runner",
+    "laptop",
+]
+
+ToolCall = Tuple[str, Dict[str, object]]
+
+
+TOOLS = ("search_products", "track_order", "get_product_details")
+
+
+def tool_mix(tools: List[str], order_ids: List[str], product_names: List[str],
+             seed: int) -> Callable[[], ToolCall]:
+    """Uniform mix over `tools`; half of the searches carry a max_price filter"""
+    rng = random.Random(seed)
+
+    def next_call() -> ToolCall:
+        name = rng.choice(tools)
+        if name == "search_products":
+            arguments: Dict[str, object] = {"query": rng.choice(SEARCH_QUERIES)}
+            if rng.random() < 0.5:
+                arguments["max_price"] = rng.choice([25, 50, 100, 250])
+            return name, arguments
+        if name == "track_order":
+            return name, {"order_id": rng.choice(order_ids)}
+        return name, {"product_id": rng.choice(product_names)}
+
+    return next_call
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "mean": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        "p50": round(percentile(latencies, 50), 2),
+        "p95": round(percentile(latencies, 95), 2),
+        "p99": round(percentile(latencies, 99), 2),
+    }
+
+
+async def drive(session: ClientSession, next_call: Callable[[], ToolCall],
+                total: int, concurrency: int) -> dict:
+    """Issue `total` tool calls with at most `concurrency` in flight on one session"""
+    latencies: Dict[str, List[float]] = {}
+    result_bytes: List[int] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in counter:
+            name, arguments = next_call()
+            start = time.perf_counter()
+            try:
+                result = await session.call_tool(name, arguments)
+                failed = result.isError
+                result_bytes.append(sum(len(c.text.encode()) for c in result.content if c.type == "text"))
+            except Exception:
+                failed = True
+            latencies.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+            errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - start
+
+    every = [ms for values in latencies.values() for ms in values]
+    return {
+        "calls": total,
+        "errors": errors,
+        "concurrency": concurrency,
+        "duration_s": round(duration, 3),
+        "throughput_cps": round(total / duration, 2) if duration else 0.0,
+        "latency_ms": summarize(every),
+        "per_tool_latency_ms": {name: summarize(values) for name, values in sorted(latencies.items())},
+        "mean_result_bytes": round(sum(result_bytes) / len(result_bytes), 1) if result_bytes else 0.0,
+    }
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    workdir = tempfile.mkdtemp(prefix="voicebot-mcp-bench-")
+    generated = create_synthetic_csv_files(workdir, args.products, args.orders, args.seed)
+
+    env = {
+        **os.environ,
+        "PYTHONPATH": REPO_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""),
+        "QDRANT_URL": ":memory:",
+    }
+    # .env in the repo must not override the stand-ins
+    env.pop("QDRANT_API_KEY", None)
+    params = StdioServerParameters(command=sys.executable, args=["-m", "app.mcp_server"],
+                                   env=env, cwd=workdir)
+
+    launched = time.perf_counter()
+    async with stdio_client(params) as (read_stream, write_stream):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            time_to_ready = time.perf_counter() - launched
+            tools = [t.name for t in (await session.list_tools()).tools]
+            print(f"✅ MCP server ready in {time_to_ready:.1f}s, tools: {', '.join(tools)}")
+
+            next_call = tool_mix(args.tools, generated["order_ids"], generated["product_names"], args.seed)
+            await drive(session, next_call, args.warmup, 4)
+
+            results = {}
+            for concurrency in args.concurrency:
+                print(f"▶ {args.calls} calls at concurrency {concurrency}")
+                result = await drive(session, next_call, args.calls, concurrency)
+                results[str(concurrency)] = result
+                print(f"  {result['throughput_cps']} calls/s, p50 {result['latency_ms']['p50']} ms, "
+                      f"p95 {result['latency_ms']['p95']} ms, {result['errors']} errors, "
+                      f"{result['mean_result_bytes']} B/result")
+
+    return {
+        "benchmark": "mcp_throughput",
+        "git": git_revision(),
+        "config": vars(args),
+        "time_to_ready_s": round(time_to_ready, 2),
+        "tools": tools,
+        "results": results,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="MCP tool server throughput benchmark (stdio)")
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--calls", type=int, default=1000, help="tool calls per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--tools", nargs="+", choices=TOOLS, default=list(TOOLS))
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<timestamp>-<commit>.json)")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    results = asyncio.run(run_benchmark(args))
+    path = save_results(results, args.output)
+    print(f"📄 Results saved to {path}")
+    errors = sum(r["errors"] for r in results["results"].values())
+    sys.exit(1 if errors else 0)
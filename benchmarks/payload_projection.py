@@ -0,0 +1,164 @@
+"""
+Payload projection benchmark: response size and parse time per search mode
+
+Indexes a synthetic catalog the way the server does (RAGService.sync_catalog)
+and runs the per-turn product search (30 hits, products filter) in each
+payload mode:
+
+    full       with_payload=True (every key, as before projection)
+    projected  PRODUCT_HIT_FIELDS (what RetrievalPipeline reads)
+    summary    the voice agent's search_products keys
+    ids        with_payload=False (IDs and scores only)
+    ids+fetch  ids, then retrieve() of the top --fetch hits (second stage;
+               its bytes / parse columns cover the first stage only)
+
+For each mode it reports the response body size and the time to parse it
+into qdrant_client models, plus the call latency. With an http(s) --url
+the body is the real REST response; with :memory: (the default) it is the
+same points serialized as a REST response, so sizes are a close proxy.
+
+    python -m benchmarks.payload_projection --url http://localhost:6333 --products 5000
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from qdrant_client.http import models
+
+from app.config.qdrant_config import QdrantConfig
+from app.service.qdrant_service import PayloadSelection, QdrantService, source_filter
+from app.service.rag_service import RAGService, catalog_sources
+from app.service.retrieval_service import PRODUCT_HIT_FIELDS
+from benchmarks.run import git_revision, percentile, save_results
+from benchmarks.synthetic_data import create_synthetic_csv_files
+
+QUERIES = [
+    "wireless headphones with noise cancelling",
+    "waterproof fitness tracker",
+    "cheap usb-c charger",
+    "smart home hub with voice control",
+    "outdoor security camera",
+    "rgb gaming headset",
+    "portable power bank with fast charging",
+    "robot vacuum for pet hair",
+]
+
+MODES: Dict[str, PayloadSelection] = {
+    "full": True,
+    "projected": PRODUCT_HIT_FIELDS,
+    "summary": ("summary", "source"),  # app.livekit_agent.SUMMARY_FIELDS (not imported: LiveKit deps)
+    "ids": False,
+}
+
+
+def rest_body(qdrant: QdrantService, http: Optional[httpx.Client], vector: List[float],
+              limit: int, with_payload: PayloadSelection) -> bytes:
+    """The query_points response body as it crosses the wire"""
+    if http is None:
+        points = qdrant.search(vector, limit=limit, query_filter=source_filter("products"),
+                               with_payload=with_payload)
+        return json.dumps({"result": models.QueryResponse(points=points).model_dump(mode="json")}).encode()
+
+    response = http.post(f"/collections/{qdrant.collection_name}/points/query", json={
+        "query": vector,
+        "limit": limit,
+        "filter": source_filter("products").model_dump(mode="json", exclude_none=True),
+        "with_payload": with_payload if isinstance(with_payload, bool) else list(with_payload),
+        "with_vector": False,
+    })
+    response.raise_for_status()
+    return response.content
+
+
+def parse(body: bytes) -> models.QueryResponse:
+    return models.QueryResponse.model_validate(json.loads(body)["result"])
+
+
+def timed(fn: Callable[[], object], repeats: int) -> List[float]:
+    fn()  # warm-up
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return sorted(latencies)
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    return {"mean": round(statistics.fmean(latencies), 3), "p50": round(percentile(latencies, 50), 3)}
+
+
+def bench_mode(qdrant: QdrantService, http: Optional[httpx.Client], vectors: List[List[float]],
+               name: str, with_payload: PayloadSelection, args: argparse.Namespace) -> Dict[str, object]:
+    bodies = [rest_body(qdrant, http, v, args.limit, with_payload) for v in vectors]
+    parse_ms = timed(lambda: [parse(b) for b in bodies], args.repeats)
+
+    def search_all():
+        for v in vectors:
+            points = qdrant.search(v, limit=args.limit, query_filter=source_filter("products"),
+                                   with_payload=with_payload)
+            if name == "ids+fetch":
+                qdrant.retrieve([p.id for p in points[:args.fetch]], with_payload=PRODUCT_HIT_FIELDS)
+
+    result = {
+        "bytes_per_response": round(statistics.fmean(len(b) for b in bodies)),
+        "parse_ms_per_response": summarize([ms / len(bodies) for ms in parse_ms]),
+        "search_ms_per_query": summarize([ms / len(vectors) for ms in timed(search_all, args.repeats)]),
+    }
+    print(f"  {name:>10}: {result['bytes_per_response']:>7} B, "
+          f"parse p50 {result['parse_ms_per_response']['p50']} ms, "
+          f"search p50 {result['search_ms_per_query']['p50']} ms")
+    return result
+
+
+def run(args: argparse.Namespace) -> dict:
+    qdrant = QdrantService(QdrantConfig(url=args.url, collection_name="bench_payload_projection"))
+    http = httpx.Client(base_url=args.url, timeout=30) if args.url.startswith("http") else None
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            create_synthetic_csv_files(tmp, n_products=args.products, n_orders=1, seed=args.seed)
+            rag = RAGService(qdrant)
+            print(f"▶ Indexing {args.products} products")
+            rag.sync_catalog(catalog_sources(f"{tmp}/data"))
+        vectors = [v.tolist() for v in rag.embedding_model.encode(QUERIES)]
+
+        results = {name: bench_mode(qdrant, http, vectors, name, selection, args)
+                   for name, selection in MODES.items()}
+        results["ids+fetch"] = bench_mode(qdrant, http, vectors, "ids+fetch", False, args)
+        full = results["full"]["bytes_per_response"]
+        for name, result in results.items():
+            result["bytes_vs_full"] = round(result["bytes_per_response"] / full, 3)
+    finally:
+        if http is not None:
+            http.close()
+        collection = qdrant.active_collection()
+        qdrant.drop_collection(collection)
+        qdrant.close()
+
+    return {
+        "benchmark": "payload_projection",
+        "git": git_revision(),
+        "config": vars(args),
+        "transport": "rest" if http is not None else "serialized (in-process)",
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search response size / parse time per payload mode")
+    parser.add_argument("--url", default=":memory:", help="Qdrant URL (http(s) measures real REST bodies)")
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=30, help="hits per search (the pipeline's product_results)")
+    parser.add_argument("--fetch", type=int, default=5, help="hits fetched in the ids+fetch second stage")
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<timestamp>-<commit>.json)")
+    args = parser.parse_args()
+
+    path = save_results(run(args), args.output)
+    print(f"📄 Results saved to {path}")
@@ -0,0 +1,135 @@
+"""
+Recall / latency benchmark for the Qdrant tuning profiles
+
+Loads N clustered synthetic 384-d vectors into one collection per profile
+(app.config.qdrant_config.TUNING_PROFILES), waits for indexing, then runs
+the same queries against each and compares the top-k with exact
+brute-force neighbours computed in NumPy.
+
+    python -m benchmarks.qdrant_profiles --url http://localhost:6333 --points 200000
+
+Run it against a real Qdrant server: the in-memory stand-in
+(--url :memory:) always searches exactly, so every profile reports
+recall 1.0 there and only the harness itself is exercised.
+"""
+
+import argparse
+import os
+import statistics
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from app.config.qdrant_config import TUNING_PROFILES, QdrantConfig
+from app.service.qdrant_service import QdrantService
+from benchmarks.run import git_revision, percentile, save_results
+
+
+def clustered_vectors(rng: np.random.Generator, n: int, dim: int, clusters: int) -> np.ndarray:
+    """Unit vectors around random centres, closer to real embeddings than uniform noise"""
+    centres = rng.normal(size=(clusters, dim))
+    vectors = centres[rng.integers(0, clusters, n)] + 0.35 * rng.normal(size=(n, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def exact_neighbours(data: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ data.T
+    top = np.argpartition(-scores, k, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+def wait_until_indexed(qdrant: QdrantService, timeout: float) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        info = qdrant.client.get_collection(qdrant.active_collection())
+        if str(info.status).lower().endswith("green"):
+            break
+        time.sleep(0.5)
+    return time.perf_counter() - start
+
+
+def bench_profile(profile: str, args: argparse.Namespace, data: np.ndarray,
+                  queries: np.ndarray, truth: np.ndarray) -> Dict[str, object]:
+    config = QdrantConfig(url=args.url, collection_name=f"bench_profile_{profile}", profile=profile)
+    qdrant = QdrantService(config)
+    try:
+        start = time.perf_counter()
+        for i in range(0, len(data), args.batch_size):
+            chunk = data[i:i + args.batch_size]
+            qdrant.add(chunk.tolist(), [{"i": i + j} for j in range(len(chunk))],
+                       keys=[str(i + j) for j in range(len(chunk))])
+        upload_s = time.perf_counter() - start
+        index_s = wait_until_indexed(qdrant, args.index_timeout)
+
+        latencies: List[float] = []
+        hits = 0
+        for query, expected in zip(queries, truth):
+            t = time.perf_counter()
+            points = qdrant.search(query.tolist(), limit=args.k)
+            latencies.append((time.perf_counter() - t) * 1000)
+            hits += len({p.payload["i"] for p in points} & set(expected.tolist()))
+
+        latencies.sort()
+        info = qdrant.client.get_collection(qdrant.active_collection())
+        return {
+            "settings": {k: getattr(config, k) for k in (
+                "hnsw_m", "hnsw_ef_construct", "hnsw_ef", "quantization",
+                "oversampling", "vectors_on_disk", "payload_on_disk")},
+            "recall_at_k": round(hits / (len(queries) * args.k), 4),
+            "latency_ms": {
+                "mean": round(statistics.fmean(latencies), 2),
+                "p50": round(percentile(latencies, 50), 2),
+                "p95": round(percentile(latencies, 95), 2),
+                "p99": round(percentile(latencies, 99), 2),
+            },
+            "upload_s": round(upload_s, 2),
+            "index_s": round(index_s, 2),
+            "indexed_vectors": info.indexed_vectors_count,
+        }
+    finally:
+        collection = qdrant.active_collection()
+        if collection != qdrant.collection_name:
+            qdrant.client.delete_collection(collection)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Qdrant tuning profile benchmark")
+    parser.add_argument("--url", default=os.getenv("QDRANT_URL", "http://localhost:6333"))
+    parser.add_argument("--profiles", nargs="+", choices=list(TUNING_PROFILES), default=list(TUNING_PROFILES))
+    parser.add_argument("--points", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--index-timeout", type=float, default=600)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<timestamp>-<commit>.json)")
+    args = parser.parse_args()
+
+    if args.url == ":memory:":
+        print("⚠️  In-memory Qdrant searches exactly: recall is always 1.0, use a real server to compare profiles")
+
+    rng = np.random.default_rng(args.seed)
+    data = clustered_vectors(rng, args.points, 384, args.clusters)
+    queries = clustered_vectors(rng, args.queries, 384, args.clusters)
+    truth = exact_neighbours(data, queries, args.k)
+
+    results = {}
+    for profile in args.profiles:
+        print(f"▶ {profile}")
+        results[profile] = bench_profile(profile, args, data, queries, truth)
+
+    print(f"\n{'profile':>12} {'recall':>7} {'p50 ms':>7} {'p95 ms':>7} {'index s':>8}")
+    for profile, r in results.items():
+        print(f"{profile:>12} {r['recall_at_k']:>7} {r['latency_ms']['p50']:>7} "
+              f"{r['latency_ms']['p95']:>7} {r['index_s']:>8}")
+
+    path = save_results({
+        "benchmark": "qdrant_profiles",
+        "git": git_revision(),
+        "config": vars(args),
+        "profiles": results,
+    }, args.output)
+    print(f"📄 Results saved to {path}")
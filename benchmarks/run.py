@@ -0,0 +1,399 @@
+"""
+End-to-end benchmark for the FastAPI assistant
+
+Starts app.server:app against local stand-ins (in-memory Qdrant, fake
+OpenAI-compatible LLM/STT/TTS, synthetic catalog and orders), drives
+/api/chat, /api/voice and /api/track-order at a fixed concurrency and
+writes throughput, latency percentiles, RSS and startup time to
+benchmarks/results/<timestamp>-<commit>.json.
+
+    python -m benchmarks.run --products 5000 --orders 5000 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import platform
+import random
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.synthetic_data import create_synthetic_csv_files
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+
+CHAT_QUERIES = [
+    "Show me headphones under $100",
+    "What products do you have between $20 and $50?",
+    "Do you have any smart home devices?",
+    "What is your return policy?",
+    "Track my order ORD10003",
+    "Which gaming accessories are over $60?",
+    "How long does shipping take?",
+    "I need a gift under $40",
+    "Track ORD10003 and show me cheaper earbuds under $50",
+]
+
+SCENARIOS = ("chat", "voice", "track-order")
+
+
+# ============================================================================
+# PROCESS HELPERS
+# ============================================================================
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_socket(port: int, timeout: float = 120.0) -> float:
+    """Block until something accepts TCP connections on port; return elapsed seconds"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return time.perf_counter() - start
+        except OSError:
+            time.sleep(0.01)
+    raise TimeoutError(f"Nothing listening on port {port} after {timeout}s")
+
+
+def wait_for_http(url: str, timeout: float = 120.0,
+                  ready: Callable[[httpx.Response], bool] = lambda r: r.status_code == 200) -> float:
+    """Poll url until ready(response) is true; return elapsed seconds"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            if ready(httpx.get(url, timeout=1.0)):
+                return time.perf_counter() - start
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.02)
+    raise TimeoutError(f"{url} not ready after {timeout}s")
+
+
+def _children(pid: int) -> List[int]:
+    children = []
+    try:
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/children") as f:
+                children.extend(int(c) for c in f.read().split())
+    except OSError:
+        pass
+    return children
+
+
+def _status_kb(pid: int, field: str) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def process_tree_memory_mb(pid: int) -> Dict[str, float]:
+    """
+    Resident memory of a process and all its descendants (Linux /proc)
+
+    Returns RSS and peak RSS (VmHWM) summed over the tree. With pre-fork
+    workers the sum over-counts pages shared copy-on-write, so the
+    proportional set size (Pss) is reported as well.
+    """
+    pids, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        pids.append(current)
+        stack.extend(_children(current))
+
+    pss_kb = 0
+    for p in pids:
+        try:
+            with open(f"/proc/{p}/smaps_rollup") as f:
+                for line in f:
+                    if line.startswith("Pss:"):
+                        pss_kb += int(line.split()[1])
+        except OSError:
+            pass
+
+    return {
+        "processes": len(pids),
+        "rss_mb": round(sum(_status_kb(p, "VmRSS") for p in pids) / 1024, 1),
+        "peak_rss_mb": round(sum(_status_kb(p, "VmHWM") for p in pids) / 1024, 1),
+        "pss_mb": round(pss_kb / 1024, 1),
+    }
+
+
+def git_revision() -> Dict[str, object]:
+    def run(*args: str) -> str:
+        try:
+            return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True,
+                                  text=True, timeout=30).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+
+    return {"commit": run("rev-parse", "--short", "HEAD") or "unknown",
+            "dirty": bool(run("status", "--porcelain", "--untracked-files=no"))}
+
+
+# ============================================================================
+# LOAD GENERATION
+# ============================================================================
+
+def make_wav(seconds: float = 2.0, rate: int = 16000) -> bytes:
+    """Silence + tone + silence, so silence trimming has something to do"""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        n = int(seconds * rate)
+        quiet = b"\x00\x00" * (n // 4)
+        tone = b"".join(struct.pack("<h", int(6000 * math.sin(i / 8))) for i in range(n // 2))
+        w.writeframes(quiet + tone + quiet)
+    return buf.getvalue()
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo, hi = math.floor(k), math.ceil(k)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def scrape_metrics(base_url: str, *wanted: str) -> Dict[str, float]:
+    """Series of the given metrics (name{labels} -> value) from the server's /metrics"""
+    wanted = tuple(f"{name}{{" for name in wanted)
+    text = httpx.get(f"{base_url}/metrics", timeout=10).text
+    return {name: float(value) for name, _, value in
+            (line.rpartition(" ") for line in text.splitlines() if line.startswith(wanted))}
+
+
+async def drive(request_fn: Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]],
+                base_url: str, total: int, concurrency: int, timeout: float = 60.0) -> dict:
+    """
+    Issue `total` requests with at most `concurrency` in flight
+
+    Returns throughput and latency percentiles (milliseconds).
+    """
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                start = time.perf_counter()
+                try:
+                    response = await request_fn(client, i)
+                    failed = response.status_code != 200 or "error" in response.json()
+                except (httpx.HTTPError, ValueError):
+                    failed = True
+                latencies.append((time.perf_counter() - start) * 1000)
+                errors += failed
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        duration = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "concurrency": concurrency,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(total / duration, 2) if duration else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2) if latencies else 0.0,
+        },
+    }
+
+
+def scenario_requests(order_ids: List[str], seed: int, sessions: int = 64) -> Dict[str, Callable]:
+    rng = random.Random(seed)
+    wav = make_wav()
+
+    async def chat(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.post("/api/chat", json={
+            "message": rng.choice(CHAT_QUERIES),
+            "session_id": f"bench-{i % sessions}",
+        })
+
+    async def voice(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.post("/api/voice", files={"audio": ("recording.wav", wav, "audio/wav")})
+
+    async def track_order(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.post("/api/track-order", json={"order_id": rng.choice(order_ids)})
+
+    return {"chat": chat, "voice": voice, "track-order": track_order}
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def server_command(args: argparse.Namespace, port: int) -> List[str]:
+    if args.workers:
+        # Production pre-fork mode (main.py --production)
+        return [sys.executable, os.path.join(REPO_ROOT, "main.py"), "--production",
+                "--workers", str(args.workers), "--host", "127.0.0.1", "--port", str(port)]
+    return [sys.executable, "-m", "uvicorn", "app.server:app",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    workdir = tempfile.mkdtemp(prefix="voicebot-bench-")
+    generated = create_synthetic_csv_files(workdir, args.products, args.orders, args.seed)
+
+    provider_port, server_port = free_port(), free_port()
+    provider_url = f"http://127.0.0.1:{provider_port}/v1"
+
+    env = {
+        **os.environ,
+        "PYTHONPATH": REPO_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""),
+        "QDRANT_URL": ":memory:",
+        "LLM_BASE_URL": provider_url,
+        "OPENAI_BASE_URL": provider_url,
+        "OPENAI_API_KEY": "bench",
+        "OPENROUTER_API_KEY": "bench",
+        "FAKE_LLM_LATENCY_MS": str(args.llm_latency_ms),
+        "FAKE_STT_LATENCY_MS": str(args.stt_latency_ms),
+        "FAKE_TTS_LATENCY_MS": str(args.tts_latency_ms),
+        "SESSION_SQLITE_PATH": os.path.join(workdir, "sessions.db"),
+        "FAST_BOOT": "true" if args.fast_boot else "false",
+        "CHAT_MODE": args.chat_mode,
+    }
+    # .env in the repo must not override the stand-ins
+    env.pop("QDRANT_API_KEY", None)
+
+    processes: List[subprocess.Popen] = []
+    try:
+        processes.append(subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.fake_provider", "--port", str(provider_port)],
+            cwd=REPO_ROOT, env=env))
+        wait_for_http(f"http://127.0.0.1:{provider_port}/health")
+
+        launched = time.perf_counter()
+        server = subprocess.Popen(server_command(args, server_port), cwd=workdir, env=env)
+        processes.append(server)
+        time_to_socket = wait_for_socket(server_port, args.startup_timeout)
+        wait_for_http(f"http://127.0.0.1:{server_port}/ready", args.startup_timeout)
+        time_to_ready = time.perf_counter() - launched
+
+        memory_after_startup = process_tree_memory_mb(server.pid)
+        base_url = f"http://127.0.0.1:{server_port}"
+        requests = scenario_requests(generated["order_ids"], args.seed, args.sessions)
+
+        results = {}
+        for name in args.scenarios:
+            print(f"▶ {name}: {args.requests} requests @ concurrency {args.concurrency}")
+            # Short warm-up so first-request effects don't skew percentiles
+            asyncio.run(drive(requests[name], base_url, min(args.concurrency, args.requests), args.concurrency))
+            results[name] = asyncio.run(drive(requests[name], base_url, args.requests, args.concurrency))
+            print(f"  {results[name]['throughput_rps']} req/s, "
+                  f"p50 {results[name]['latency_ms']['p50']} ms, "
+                  f"p99 {results[name]['latency_ms']['p99']} ms, "
+                  f"errors {results[name]['errors']}")
+        outbound = scrape_metrics(base_url, "voicebot_http_requests_total", "voicebot_http_connect_seconds_count")
+        llm_tokens = scrape_metrics(base_url, "voicebot_llm_tokens_total")
+        history = scrape_metrics(base_url, "voicebot_history_folds_total",
+                                 "voicebot_history_prompt_chars_sum", "voicebot_history_prompt_chars_count")
+        for name, value in {**outbound, **llm_tokens, **history}.items():
+            print(f"  {name} {value:g}")
+
+        return {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": {k: v for k, v in vars(args).items() if k != "output"},
+            "startup": {
+                "time_to_socket_s": round(time_to_socket, 3),
+                "time_to_ready_s": round(time_to_ready, 3),
+            },
+            "memory": {
+                "after_startup": memory_after_startup,
+                "after_load": process_tree_memory_mb(server.pid),
+            },
+            "scenarios": results,
+            # new vs reused provider connections over the whole run (incl. warm-up)
+            "outbound_http": outbound,
+            # input / cached_input / output tokens (the fake provider simulates a prefix cache)
+            "llm_tokens": llm_tokens,
+            # background summary folds and history characters sent per turn
+            "history": history,
+        }
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def save_results(results: dict, output: Optional[str] = None) -> str:
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{results['git']['commit']}.json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    return output
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="End-to-end voicebot benchmark")
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--sessions", type=int, default=64,
+                        help="chat sessions the requests rotate through (fewer = longer conversations)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--llm-latency-ms", type=float, default=200)
+    parser.add_argument("--stt-latency-ms", type=float, default=300)
+    parser.add_argument("--tts-latency-ms", type=float, default=150)
+    parser.add_argument("--startup-timeout", type=float, default=300)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="run main.py --production with N workers (0 = single uvicorn process)")
+    parser.add_argument("--fast-boot", action="store_true",
+                        help="start the server with FAST_BOOT (listen first, warm up in the background)")
+    parser.add_argument("--chat-mode", choices=["rag", "tools"], default="rag",
+                        help="CHAT_MODE for the server (tools: LLM calls the MCP tool server)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<timestamp>-<commit>.json)")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    results = run_benchmark(args)
+    path = save_results(results, args.output)
+    print(f"\n✅ Startup {results['startup']['time_to_ready_s']}s, "
+          f"RSS {results['memory']['after_load']['rss_mb']} MB")
+    print(f"📄 Results saved to {path}")
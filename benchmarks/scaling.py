@@ -0,0 +1,65 @@
+"""
+Multi-worker scaling benchmark for /api/chat
+
+Runs the end-to-end harness in production pre-fork mode with 1, 2, 4...
+workers (up to the core count) and reports throughput, speedup and
+parallel efficiency relative to one worker, plus the PSS of the whole
+process tree so copy-on-write model sharing is visible.
+
+    python -m benchmarks.scaling --requests 400 --concurrency 32
+"""
+
+import os
+
+from benchmarks.run import build_parser, git_revision, run_benchmark, save_results
+
+
+def worker_counts(max_workers: int):
+    counts, n = [], 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    counts.append(max_workers)
+    return counts
+
+
+if __name__ == "__main__":
+    parser = build_parser()
+    parser.description = "Multi-worker scaling benchmark for /api/chat"
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.set_defaults(scenarios=["chat"], concurrency=32, requests=400)
+    args = parser.parse_args()
+
+    runs = []
+    for workers in worker_counts(args.max_workers):
+        print(f"\n=== {workers} worker(s) ===")
+        args.workers = workers
+        result = run_benchmark(args)
+        chat = result["scenarios"]["chat"]
+        runs.append({
+            "workers": workers,
+            "throughput_rps": chat["throughput_rps"],
+            "latency_ms": chat["latency_ms"],
+            "errors": chat["errors"],
+            "time_to_ready_s": result["startup"]["time_to_ready_s"],
+            "memory": result["memory"]["after_load"],
+        })
+
+    baseline = runs[0]["throughput_rps"] or 1.0
+    for run in runs:
+        run["speedup"] = round(run["throughput_rps"] / baseline, 2)
+        run["efficiency"] = round(run["speedup"] / run["workers"], 2)
+
+    print(f"\n{'workers':>8} {'req/s':>8} {'speedup':>8} {'eff':>6} {'p99 ms':>8} {'PSS MB':>8}")
+    for run in runs:
+        print(f"{run['workers']:>8} {run['throughput_rps']:>8} {run['speedup']:>8} "
+              f"{run['efficiency']:>6} {run['latency_ms']['p99']:>8} {run['memory']['pss_mb']:>8}")
+
+    summary = {
+        "benchmark": "scaling",
+        "git": git_revision(),
+        "cpu_count": os.cpu_count(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "workers")},
+        "runs": runs,
+    }
+    print(f"\n📄 Results saved to {save_results(summary, args.output)}")
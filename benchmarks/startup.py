@@ -0,0 +1,114 @@
+"""
+Startup benchmark: import time, time-to-listening-socket and time-to-ready
+
+Launches app.server:app several times with FAST_BOOT on and off
+(in-memory Qdrant, synthetic catalog) and reports the median of each
+measurement. Exits non-zero when the fast-boot socket time exceeds the
+budget, so it can gate CI.
+
+    python -m benchmarks.startup --runs 5 --budget 1.0
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.run import (
+    REPO_ROOT, free_port, git_revision, save_results, wait_for_http, wait_for_socket,
+)
+from benchmarks.synthetic_data import create_synthetic_csv_files
+
+
+def measure_import(env: Dict[str, str]) -> float:
+    """Seconds to import app.server in a fresh interpreter"""
+    code = "import time; t = time.perf_counter(); import app.server; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, env=env,
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def measure_launch(env: Dict[str, str], workdir: str, fast_boot: bool, timeout: float) -> Dict[str, float]:
+    port = free_port()
+    launched = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.server:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env={**env, "FAST_BOOT": "true" if fast_boot else "false"},
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        time_to_socket = wait_for_socket(port, timeout)
+        wait_for_http(f"http://127.0.0.1:{port}/ready", timeout)
+        return {
+            "time_to_socket_s": time_to_socket,
+            "time_to_ready_s": time.perf_counter() - launched,
+        }
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def median(runs: List[Dict[str, float]], key: str) -> float:
+    return round(statistics.median(run[key] for run in runs), 3)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Server startup benchmark")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--budget", type=float, default=1.0,
+                        help="max fast-boot time-to-socket in seconds")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<timestamp>-<commit>.json)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="voicebot-startup-")
+    create_synthetic_csv_files(workdir, args.products, args.products, seed=42)
+    env = {
+        **os.environ,
+        "PYTHONPATH": REPO_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""),
+        "QDRANT_URL": ":memory:",
+        "OPENAI_API_KEY": "bench",
+        "OPENROUTER_API_KEY": "bench",
+    }
+    env.pop("QDRANT_API_KEY", None)
+
+    imports = [measure_import(env) for _ in range(args.runs)]
+    modes = {}
+    for fast_boot in (False, True):
+        mode = "fast_boot" if fast_boot else "blocking"
+        print(f"▶ {mode}: {args.runs} launches")
+        runs = [measure_launch(env, workdir, fast_boot, args.timeout) for _ in range(args.runs)]
+        modes[mode] = {
+            "time_to_socket_s": median(runs, "time_to_socket_s"),
+            "time_to_ready_s": median(runs, "time_to_ready_s"),
+            "runs": runs,
+        }
+
+    print(f"\n{'mode':>10} {'socket s':>9} {'ready s':>8}")
+    for mode, result in modes.items():
+        print(f"{mode:>10} {result['time_to_socket_s']:>9} {result['time_to_ready_s']:>8}")
+    print(f"import app.server: {round(statistics.median(imports), 3)}s")
+
+    socket_time = modes["fast_boot"]["time_to_socket_s"]
+    path = save_results({
+        "benchmark": "startup",
+        "git": git_revision(),
+        "config": vars(args),
+        "import_s": round(statistics.median(imports), 3),
+        "modes": modes,
+        "within_budget": socket_time <= args.budget,
+    }, args.output)
+    print(f"📄 Results saved to {path}")
+
+    if socket_time > args.budget:
+        print(f"❌ Fast-boot time-to-socket {socket_time}s exceeds the {args.budget}s budget")
+        sys.exit(1)
@@ -0,0 +1,161 @@
+"""
+Synthetic catalog and order generator
+
+Extends setup.py:create_csv_files to N products and N orders so the
+benchmarks can exercise realistic catalog sizes. Output is
+deterministic for a given seed.
+"""
+
+import csv
+import os
+import random
+import sys
+from contextlib import contextmanager
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from setup import create_csv_files
+
+CATEGORIES = {
+    "audio": ["Headphones", "Earbuds", "Speaker", "Soundbar", "Microphone"],
+    "wearables": ["Fitness Tracker", "Smartwatch", "Sleep Band", "Ring"],
+    "accessories": ["Power Bank", "USB-C Cable", "Charger", "Phone Case", "Stand"],
+    "electronics": ["Webcam", "Portable Monitor", "Keyboard", "Mouse", "Tablet"],
+    "gaming": ["Controller", "Headset", "Mouse Pad", "Racing Wheel"],
+    "smart-home": ["Smart Bulb", "Hub", "Smart Plug", "Thermostat", "Doorbell"],
+    "home": ["Air Purifier", "Robot Vacuum", "Humidifier", "Fan"],
+    "security": ["Indoor Camera", "Outdoor Camera", "Motion Sensor", "Smart Lock"],
+}
+BRANDS = ["SoundPro", "BudMax", "SmartFit", "PowerBank", "UltraView", "GamePad",
+          "LumiLight", "ProClean", "SecureCam", "AirPure", "Nimbus", "Voltix"]
+ADJECTIVES = ["Pro", "Max", "Mini", "Ultra", "Lite", "Plus", "Air", "Sport", "Elite", "Neo"]
+FEATURES = ["wireless", "bluetooth", "waterproof", "fast-charging", "noise-cancelling",
+            "voice-control", "usb-c", "long-battery", "compact", "hd", "rgb", "eco-friendly"]
+STATUSES = ["pending", "processing", "shipped", "delivered", "cancelled"]
+CARRIERS = ["UPS", "FedEx", "USPS", "DHL"]
+FIRST_NAMES = ["John", "Jane", "Bob", "Alice", "Maria", "Wei", "Priya", "Omar", "Lena", "Sam"]
+LAST_NAMES = ["Smith", "Doe", "Johnson", "Garcia", "Chen", "Patel", "Khan", "Novak", "Lee"]
+
+PRODUCT_COLUMNS = ["name", "description", "price", "category", "stock",
+                   "brand", "features", "warranty"]
+ORDER_COLUMNS = ["order_id", "customer_name", "status", "items", "total", "order_date",
+                 "shipping_address", "tracking_number", "estimated_delivery",
+                 "delivered_date", "cancelled_date", "cancellation_reason", "carrier"]
+
+
+@contextmanager
+def _working_directory(path: str):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def generate_products(n: int, rng: random.Random) -> List[dict]:
+    """Generate n unique products"""
+    products = []
+    for i in range(n):
+        category = rng.choice(list(CATEGORIES))
+        kind = rng.choice(CATEGORIES[category])
+        brand = rng.choice(BRANDS)
+        features = rng.sample(FEATURES, 4)
+        # Suffix keeps names unique at any catalog size
+        name = f"{brand} {kind} {rng.choice(ADJECTIVES)} {i + 1}"
+        products.append({
+            "name": name,
+            "description": (f"{kind} from {brand} with {features[0]} and {features[1]} support. "
+                            f"Designed for everyday use with {features[2]} and {features[3]}"),
+            "price": round(rng.uniform(9.99, 499.99), 2),
+            "category": category,
+            "stock": rng.randint(0, 250),
+            "brand": brand,
+            "features": "|".join(features),
+            "warranty": rng.choice(["1-year", "2-year", "5-year", "lifetime"]),
+        })
+    return products
+
+
+def generate_orders(n: int, products: List[dict], rng: random.Random) -> List[dict]:
+    """Generate n orders referencing the given products"""
+    orders = []
+    for i in range(n):
+        status = rng.choice(STATUSES)
+        picked = rng.sample(products, min(len(products), rng.randint(1, 3)))
+        quantities = [rng.randint(1, 3) for _ in picked]
+        day = rng.randint(1, 28)
+        orders.append({
+            "order_id": f"ORD{10000 + i}",
+            "customer_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "status": status,
+            # "Product x2, Product2 x1" - the format OrderService parses
+            "items": ", ".join(f"{p['name']} x{q}" for p, q in zip(picked, quantities)),
+            "total": round(sum(p["price"] * q for p, q in zip(picked, quantities)), 2),
+            "order_date": f"2024-11-{day:02d}",
+            "shipping_address": f"{rng.randint(1, 999)} Main St Springfield IL 62701",
+            "tracking_number": f"1Z{rng.randint(10**15, 10**16 - 1)}" if status in ("shipped", "delivered") else "",
+            "estimated_delivery": f"2024-12-{day:02d}",
+            "delivered_date": f"2024-12-{day:02d}" if status == "delivered" else "",
+            "cancelled_date": f"2024-11-{day:02d}" if status == "cancelled" else "",
+            "cancellation_reason": "Customer request" if status == "cancelled" else "",
+            "carrier": rng.choice(CARRIERS) if status != "cancelled" else "",
+        })
+    return orders
+
+
+def _write_csv(path: str, columns: List[str], rows: List[dict]):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def create_synthetic_csv_files(base_dir: str, n_products: int = 1000,
+                               n_orders: int = 1000, seed: int = 42) -> dict:
+    """
+    Create data/products.csv, data/policies.csv and data/orders.csv
+
+    Policies come from setup.create_csv_files; products and orders are
+    replaced with n_products / n_orders synthetic rows.
+
+    Args:
+        base_dir: Directory in which the data/ folder is created
+        n_products: Number of products to generate
+        n_orders: Number of orders to generate
+        seed: Random seed (same seed -> same files)
+
+    Returns:
+        Dict with the generated order IDs and product names
+    """
+    rng = random.Random(seed)
+
+    with _working_directory(base_dir):
+        create_csv_files()
+
+    products = generate_products(n_products, rng)
+    orders = generate_orders(n_orders, products, rng)
+
+    data_dir = os.path.join(base_dir, "data")
+    _write_csv(os.path.join(data_dir, "products.csv"), PRODUCT_COLUMNS, products)
+    _write_csv(os.path.join(data_dir, "orders.csv"), ORDER_COLUMNS, orders)
+
+    return {
+        "order_ids": [o["order_id"] for o in orders],
+        "product_names": [p["name"] for p in products],
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate synthetic catalog and orders")
+    parser.add_argument("--dir", default=".")
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    create_synthetic_csv_files(args.dir, args.products, args.orders, args.seed)
+    print(f"✅ Created {args.products} products and {args.orders} orders in {args.dir}/data")
@@ -0,0 +1,154 @@
+"""
+Crossover benchmark: in-process NumPy index vs Qdrant by collection size
+
+For each size, loads the same clustered synthetic 384-d vectors (with
+source / price payloads) into NumpyVectorStore and,
+when --qdrant-url is given, into QdrantService, then times unfiltered,
+filtered (source + price range) and 3-query batch searches. The
+crossover is the smallest size at which Qdrant's p50 beats the NumPy
+store's p50 for a query type.
+
+    python -m benchmarks.vector_store_crossover --qdrant-url http://localhost:6333 \\
+        --sizes 1000 5000 20000 50000 100000 200000
+
+Without --qdrant-url only the NumPy curves are measured; compare them
+with the round-trip latency of your Qdrant deployment. --qdrant-url
+:memory: works but is a brute-force scan in Python, not an HNSW server.
+"""
+
+import argparse
+import statistics
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from qdrant_client.models import FieldCondition, Range
+
+from app.config.qdrant_config import QdrantConfig
+from app.config.vector_store_config import VectorStoreConfig
+from app.service.qdrant_service import BatchQuery, source_filter
+from app.service.vector_store import VectorStore, create_vector_store
+from benchmarks.qdrant_profiles import clustered_vectors, wait_until_indexed
+from benchmarks.run import git_revision, percentile, save_results
+
+QUERY_TYPES = ("plain", "filtered", "batch3")
+
+
+def payloads(rng: np.random.Generator, n: int) -> List[Dict[str, object]]:
+    sources = rng.random(n) < 0.9
+    prices = rng.uniform(5, 500, n).round(2)
+    return [{"source": "products" if s else "policies", "price": float(p)} for s, p in zip(sources, prices)]
+
+
+def product_filter():
+    query_filter = source_filter("products")
+    query_filter.must.append(FieldCondition(key="price", range=Range(lte=100)))
+    return query_filter
+
+
+def time_queries(store: VectorStore, queries: np.ndarray, k: int) -> Dict[str, Dict[str, float]]:
+    runs = {
+        "plain": lambda q, i: store.search(q.tolist(), limit=k),
+        "filtered": lambda q, i: store.search(q.tolist(), limit=k, query_filter=product_filter()),
+        "batch3": lambda q, i: store.search_batch([
+            BatchQuery(queries[(i + j) % len(queries)].tolist(), limit=k, query_filter=source_filter("products"))
+            for j in range(3)
+        ]),
+    }
+    results = {}
+    for name, run in runs.items():
+        for i, q in enumerate(queries[:5]):  # warm caches / lazy payload columns
+            run(q, i)
+        latencies = []
+        for i, q in enumerate(queries):
+            start = time.perf_counter()
+            run(q, i)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        results[name] = {
+            "mean": round(statistics.fmean(latencies), 3),
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+        }
+    return results
+
+
+def bench_store(name: str, store: VectorStore, data: np.ndarray, meta: List[Dict[str, object]],
+                queries: np.ndarray, args: argparse.Namespace) -> Dict[str, object]:
+    start = time.perf_counter()
+    for i in range(0, len(data), args.batch_size):
+        chunk = data[i:i + args.batch_size]
+        store.add(chunk.tolist(), meta[i:i + len(chunk)], keys=[str(i + j) for j in range(len(chunk))])
+    store.flush()
+    load_s = time.perf_counter() - start
+    if name == "qdrant" and store.config.url != ":memory:":
+        load_s += wait_until_indexed(store, args.index_timeout)
+    result = {"load_s": round(load_s, 2), "latency_ms": time_queries(store, queries, args.k)}
+    print(f"  {name:>13}: " + ", ".join(
+        f"{q} p50 {result['latency_ms'][q]['p50']} ms" for q in QUERY_TYPES))
+    return result
+
+
+def crossover(results: Dict[str, Dict[str, dict]], numpy_name: str, query: str) -> Optional[int]:
+    for size, by_store in sorted(results.items(), key=lambda item: int(item[0])):
+        if "qdrant" in by_store and \
+                by_store["qdrant"]["latency_ms"][query]["p50"] < by_store[numpy_name]["latency_ms"][query]["p50"]:
+            return int(size)
+    return None
+
+
+def run(args: argparse.Namespace) -> dict:
+    rng = np.random.default_rng(args.seed)
+    queries = clustered_vectors(rng, args.queries, 384, args.clusters)
+    results: Dict[str, Dict[str, dict]] = {}
+
+    for size in args.sizes:
+        print(f"▶ {size} vectors")
+        data = clustered_vectors(rng, size, 384, args.clusters)
+        meta = payloads(rng, size)
+        by_store: Dict[str, dict] = {}
+        store = create_vector_store(QdrantConfig(collection_name=f"bench_np_{size}"),
+                                    VectorStoreConfig(backend="numpy"))
+        by_store["numpy"] = bench_store("numpy", store, data, meta, queries, args)
+        by_store["numpy"]["matrix_mb"] = round(size * 384 * np.dtype(np.float32).itemsize / 2**20, 1)
+        if args.qdrant_url:
+            store = create_vector_store(QdrantConfig(url=args.qdrant_url, collection_name=f"bench_crossover_{size}"),
+                                        VectorStoreConfig(backend="qdrant"))
+            try:
+                by_store["qdrant"] = bench_store("qdrant", store, data, meta, queries, args)
+            finally:
+                collection = store.active_collection()
+                store.drop_collection(collection)
+        results[str(size)] = by_store
+
+    crossovers = {
+        "numpy": {q: crossover(results, "numpy", q) for q in QUERY_TYPES}
+    } if args.qdrant_url else {}
+    for name, by_query in crossovers.items():
+        print(f"🔀 {name}: Qdrant faster from " + ", ".join(
+            f"{q}: {size if size else f'> {max(args.sizes)}'}" for q, size in by_query.items()))
+
+    return {
+        "benchmark": "vector_store_crossover",
+        "git": git_revision(),
+        "config": vars(args),
+        "results": results,
+        "crossover": crossovers,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="NumPy vs Qdrant vector store crossover benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000, 50000, 100000])
+    parser.add_argument("--qdrant-url", help="Qdrant to compare against (omit to measure NumPy only)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--index-timeout", type=float, default=600)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<timestamp>-<commit>.json)")
+    args = parser.parse_args()
+
+    path = save_results(run(args), args.output)
+    print(f"📄 Results saved to {path}")
@@ -1,13 +1,42 @@
+import argparse
 import uvicorn
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="E-Commerce Voicebot server")
+    parser.add_argument("--production", action="store_true",
+                        default=os.getenv("APP_ENV", "development") == "production",
+                        help="pre-fork multi-worker mode (no reload)")
+    parser.add_argument("--workers", type=int,
+                        default=int(os.getenv("APP_WORKERS", os.cpu_count() or 1)))
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("APP_PORT", 8000)))
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    uvicorn.run(
-        "app.server:app", 
-        host="0.0.0.0", 
-        port=int(os.getenv("APP_PORT", 8000)),
-        reload=True
-    )
\ No newline at end of file
+    args = parse_args()
+
+    if args.production:
+        # Workers must share sessions: a memory store per worker would lose
+        # the history whenever a turn lands on another worker
+        if args.workers > 1 and os.getenv("SESSION_BACKEND", "memory").lower() == "memory":
+            if "SESSION_BACKEND" in os.environ:
+                print(f"⚠️  SESSION_BACKEND=memory is per-process; using sqlite "
+                      f"so {args.workers} workers share sessions")
+            os.environ["SESSION_BACKEND"] = "sqlite"
+
+        from app.core.prefork import serve
+        from app.server import preload
+
+        serve("app.server:app", preload, workers=args.workers,
+              host=args.host, port=args.port)
+    else:
+        uvicorn.run(
+            "app.server:app",
+            host=args.host,
+            port=args.port,
+            reload=True
+        )
@@ -0,0 +1,91 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from app.config.qdrant_config import QdrantConfig
+from app.config.vector_store_config import VectorStoreConfig
+from app.service.catalog_indexer import CatalogIndexer, IndexerConfig, IndexStatus
+from app.service.numpy_vector_store import NumpyVectorStore
+from app.service.rag_service import RAGService, catalog_sources
+
+DIM = 8
+
+
+class HashEncoder:
+    """Stand-in for the sentence transformer: a fixed vector per text"""
+
+    def encode(self, texts):
+        return np.asarray([
+            np.frombuffer(hashlib.sha256(text.encode()).digest()[:DIM], dtype=np.uint8) + 1.0
+            for text in texts
+        ])
+
+
+def write_catalog(data_dir: str, prices):
+    pd.DataFrame({
+        "name": [f"Product {i}" for i in range(len(prices))],
+        "description": [f"Description {i}" for i in range(len(prices))],
+        "price": prices,
+        "category": "audio",
+        "stock": 5,
+        "brand": "Acme",
+    }).to_csv(os.path.join(data_dir, "products.csv"), index=False)
+    pd.DataFrame({
+        "category": ["returns"], "question": ["Can I return it?"], "answer": ["Within 30 days."],
+    }).to_csv(os.path.join(data_dir, "policies.csv"), index=False)
+
+
+def worker(path: str, sources) -> CatalogIndexer:
+    """One pre-forked worker: its own store instance on the shared path"""
+    store = NumpyVectorStore(QdrantConfig(url=":memory:", collection_name="catalog", vector_size=DIM),
+                             VectorStoreConfig(backend="numpy", path=path))
+    rag = RAGService(store, model=HashEncoder())
+    rag.load_tables(sources)
+    return CatalogIndexer(rag, sources, IndexerConfig(table_refresh_seconds=0.01,
+                                                      lock_path=os.path.join(path, "indexer.lock")))
+
+
+def versions(path: str):
+    return sorted(name for name in os.listdir(path) if os.path.isdir(os.path.join(path, name)))
+
+
+async def follow_briefly(indexer: CatalogIndexer):
+    indexer.start_following()
+    await asyncio.sleep(0.1)
+    indexer.stop()
+
+
+def test_workers_follow_each_others_reindexes_on_a_shared_numpy_index():
+    with tempfile.TemporaryDirectory() as data_dir, tempfile.TemporaryDirectory() as path:
+        sources = catalog_sources(data_dir)
+        write_catalog(data_dir, [10.0, 20.0, 30.0])
+        a = worker(path, sources)
+        a.rag.sync_catalog(sources)
+        b = worker(path, sources)
+        b.rag.refresh_tables()  # records the version its startup tables match
+
+        # Worker a re-indexes; b's follower reloads its tables from a's version
+        write_catalog(data_dir, [10.0, 25.0, 30.0, 40.0])
+        asyncio.run(a._reindex(IndexStatus()))
+        asyncio.run(follow_briefly(b))
+
+        published = a.qdrant.active_collection()
+        assert b.rag.tables_collection == published
+        assert sorted(b.rag.product_table.price.tolist()) == [10.0, 25.0, 30.0, 40.0]
+        assert versions(path) == [published]
+
+        # Worker b re-indexes next: it diffs against and replaces a's version
+        write_catalog(data_dir, [10.0, 25.0, 35.0, 40.0])
+        status = IndexStatus()
+        asyncio.run(b._reindex(status))
+        assert status.rows_copied == 4  # 3 unchanged products and the policy, from a's version
+        assert status.rows_to_embed == 1
+        asyncio.run(follow_briefly(a))
+
+        assert a.rag.tables_collection == b.qdrant.active_collection()
+        assert sorted(a.rag.product_table.price.tolist()) == [10.0, 25.0, 35.0, 40.0]
+        assert versions(path) == [b.qdrant.active_collection()]
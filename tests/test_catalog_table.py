@@ -0,0 +1,100 @@
+from app.service.catalog_table import ProductTable
+from app.service.intent_service import extract_intent
+from app.service.response_templates import fast_path_reply
+from app.service.retrieval_service import ProductHit, RetrievalContext
+
+PRODUCTS = [
+    {"name": "SoundPro Wireless Headphones", "price": 89.99, "stock": 50,
+     "category": "audio", "brand": "SoundPro", "text": "Premium wireless headphones"},
+    {"name": "BudMax Sport Earbuds", "price": 59.99, "stock": 100,
+     "category": "audio", "brand": "BudMax", "text": "Waterproof sport earbuds"},
+    {"name": "PulseSound Party Speaker", "price": 129.99, "stock": 0,
+     "category": "audio", "brand": "PulseSound", "text": "Portable party speaker"},
+    {"name": "SmartFit Fitness Tracker", "price": 49.99, "stock": 8,
+     "category": "wearables", "brand": "SmartFit", "text": "Heart-rate fitness tracker"},
+    {"name": "SafeCharge Laptop Power Adapter", "price": 39.99, "stock": 20,
+     "category": "accessories", "brand": "SafeCharge", "text": "65W USB-C laptop charger"},
+]
+
+
+def table() -> ProductTable:
+    return ProductTable([str(i) for i in range(len(PRODUCTS))], PRODUCTS)
+
+
+def parse(text: str):
+    return table().parse(text, extract_intent(text))
+
+
+def context(text: str) -> RetrievalContext:
+    """What RetrievalPipeline builds for the turn: table answer or search hits"""
+    t = table()
+    query = t.parse(text, extract_intent(text))
+    hits = [ProductHit(id=str(i), name=p["name"], price=p["price"], category=p["category"],
+                       description=p["text"], stock=p["stock"]) for i, p in enumerate(PRODUCTS)]
+    return RetrievalContext(intent=extract_intent(text), products=hits,
+                            catalog_answer=t.run(query) if query else None)
+
+
+def test_category_count_is_answered_from_the_table():
+    query = parse("How many audio products do you have?")
+    assert query is not None and query.op == "count" and query.category == "audio"
+    reply = fast_path_reply("How many audio products do you have?", context("How many audio products do you have?"))
+    assert reply.intent == "catalog"
+    assert reply.text == "We have 3 audio products."
+
+
+def test_brand_count_is_answered_from_the_table():
+    query = parse("how many SoundPro products do you sell")
+    assert query is not None and query.op == "count" and query.brand == "SoundPro"
+
+
+def test_count_needs_a_category_or_brand():
+    assert parse("how many products under $50") is None
+    assert parse("how many do you have under $100?") is None
+    query = parse("how many audio products under $100")
+    assert query is not None and query.op == "count"
+    assert query.category == "audio" and query.max_price == 100
+
+
+def test_count_of_a_named_product_is_a_stock_question():
+    text = "How many SoundPro Wireless Headphones do you have?"
+    assert parse(text) is None
+    reply = fast_path_reply(text, context(text))
+    assert reply.intent == "stock"
+    assert "50" in reply.text and "SoundPro Wireless Headphones" in reply.text
+
+
+def test_how_many_in_stock_is_not_a_row_count():
+    text = "how many headphones do you have in stock"
+    assert parse(text) is None
+    reply = fast_path_reply(text, context(text))
+    assert reply is None or reply.intent != "catalog"
+
+
+def test_how_many_left_is_not_a_row_count():
+    assert parse("how many audio products are left") is None
+    assert parse("how many SmartFit Fitness Trackers are available") is None
+
+
+def test_cheapest_in_category():
+    query = parse("what's the cheapest audio product")
+    assert query is not None and query.op == "top" and not query.descending
+    answer = table().run(query)
+    assert answer.rows[0]["name"] == "BudMax Sport Earbuds"
+
+
+def test_order_questions_are_not_catalog_questions():
+    assert parse("how many orders do I have?") is None
+    reply = fast_path_reply("how many orders do I have?", context("how many orders do I have?"))
+    assert reply is None or reply.intent != "catalog"
+
+
+def test_unfiltered_questions_refer_to_the_conversation():
+    assert parse("which one is the cheapest?") is None
+    assert parse("sort them by price") is None
+
+
+def test_top_by_name_token_alone_is_left_to_search():
+    # "laptop" only matches the power adapter's name
+    assert parse("most expensive laptop") is None
+    assert parse("what's the most expensive laptop?") is None
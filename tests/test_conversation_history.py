@@ -0,0 +1,107 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+from app.service.conversation_history import ConversationHistory, HistoryConfig
+from app.service.session_store import MemorySessionStore, SQLiteSessionStore
+
+CONFIG = HistoryConfig(keep_turns=2, fold_turns=2, max_turns=20, summarize=True)
+
+
+def sqlite_store():
+    return SQLiteSessionStore(os.path.join(tempfile.mkdtemp(), "sessions.db"))
+
+
+STORES = pytest.mark.parametrize("make_store", [MemorySessionStore, sqlite_store],
+                                 ids=["memory", "sqlite"])
+
+
+def turn(i: int):
+    return [{"role": "user", "content": f"question {i}"}, {"role": "assistant", "content": f"answer {i}"}]
+
+
+class Summarizer:
+    """Stand-in completion: the summary lists the folded questions"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self, system_prompt: str, text: str) -> str:
+        self.calls += 1
+        summary = text.split("Existing summary:\n")[1].split("\n\nNew turns:")[0]
+        questions = [line.split(": ", 1)[1] for line in text.splitlines() if line.startswith("Customer: ")]
+        return ", ".join(([] if summary == "(none)" else [summary]) + questions)
+
+
+async def chat(history: ConversationHistory, turns: range, windows=None):
+    for i in turns:
+        prompt = await history.aload("s")
+        if windows is not None:
+            windows.append(len(prompt.messages))
+        reply = turn(i)
+        await history.arecord("s", reply[0]["content"], reply[1]["content"], prompt)
+        await history.aclose()  # let the fold land before the next turn
+
+
+@STORES
+def test_fold_starts_once_keep_plus_fold_turns_exist(make_store):
+    store, summarizer = make_store(), Summarizer()
+    history = ConversationHistory(store, summarizer, CONFIG)
+
+    asyncio.run(chat(history, range(3)))
+    assert summarizer.calls == 0
+    assert store.get_summary("s") == ""
+
+    asyncio.run(chat(history, range(3, 4)))
+    assert summarizer.calls == 1
+    summary, messages = store.get_history("s")
+    assert summary == "question 0, question 1"
+    assert messages == turn(2) + turn(3)
+
+
+@STORES
+def test_fold_conflict_keeps_the_other_fold_and_every_turn(make_store):
+    store = make_store()
+    for i in range(4):
+        store.append_messages("s", turn(i), max_messages=40)
+
+    async def racing_summarizer(system_prompt: str, text: str) -> str:
+        # Another worker folds the first turn while this summary is generated
+        assert store.fold_messages("s", turn(0), "question 0")
+        return "stale"
+
+    history = ConversationHistory(store, racing_summarizer, CONFIG)
+    assert not asyncio.run(history.fold("s"))
+
+    summary, messages = store.get_history("s")
+    assert summary == "question 0"
+    assert messages == turn(1) + turn(2) + turn(3)
+
+
+@STORES
+def test_store_rejects_a_fold_whose_turns_are_no_longer_first(make_store):
+    store = make_store()
+    store.append_messages("s", turn(0) + turn(1), max_messages=40)
+
+    assert not store.fold_messages("s", turn(1), "summary")
+    assert store.get_history("s") == ("", turn(0) + turn(1))
+
+
+@STORES
+def test_load_window_stays_bounded_over_a_long_session(make_store):
+    store, summarizer = make_store(), Summarizer()
+    history = ConversationHistory(store, summarizer, CONFIG)
+    windows = []
+
+    asyncio.run(chat(history, range(40), windows))
+
+    # Once folding starts, every prompt carries keep_turns..keep_turns + fold_turns - 1
+    # turns, cycling with each fold instead of growing with the session
+    steady = windows[CONFIG.keep_turns + CONFIG.fold_turns:]
+    assert set(steady) == {2 * t for t in range(CONFIG.keep_turns, CONFIG.keep_turns + CONFIG.fold_turns)}
+    assert steady == steady[:CONFIG.fold_turns] * (len(steady) // CONFIG.fold_turns)
+    assert max(windows) <= 2 * history.window_turns
+    assert len(store.get_messages("s")) < 2 * (CONFIG.keep_turns + CONFIG.fold_turns)
+    assert store.get_summary("s").startswith("question 0, question 1")
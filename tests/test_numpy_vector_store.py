@@ -0,0 +1,168 @@
+import os
+import tempfile
+
+import numpy as np
+from qdrant_client.models import FieldCondition, Filter, MatchAny, MatchValue, Range
+
+from app.config.qdrant_config import QdrantConfig
+from app.config.vector_store_config import VectorStoreConfig
+from app.service.numpy_vector_store import NumpyVectorStore
+from app.service.qdrant_service import BatchQuery, QdrantService, source_filter
+
+DIM = 8
+CATEGORIES = ("audio", "wearables", "computers")
+
+
+def points(n: int = 40, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, DIM)).tolist()
+    payloads = [
+        {"source": "products" if i % 4 else "faqs", "name": f"Item {i}",
+         "price": round(10 + 7.5 * i, 2), "category": CATEGORIES[i % 3],
+         "content_hash": f"h{i}"}
+        for i in range(n)
+    ]
+    keys = [f"{p['source']}:{i}" for i, p in enumerate(payloads)]
+    return vectors, payloads, keys
+
+
+def stores(path=None):
+    """The same points in NumpyVectorStore and in-process Qdrant"""
+    config = QdrantConfig(url=":memory:", collection_name="parity", vector_size=DIM)
+    numpy_store = NumpyVectorStore(config, VectorStoreConfig(backend="numpy", path=path))
+    qdrant = QdrantService(config)
+    vectors, payloads, keys = points()
+    for store in (numpy_store, qdrant):
+        store.add(vectors, payloads, keys=keys)
+    return numpy_store, qdrant
+
+
+def query(seed: int):
+    return np.random.default_rng(seed).normal(size=DIM).tolist()
+
+
+def assert_same(numpy_points, qdrant_points):
+    assert [str(p.id) for p in numpy_points] == [str(p.id) for p in qdrant_points]
+    for a, b in zip(numpy_points, qdrant_points):
+        assert abs(a.score - b.score) < 1e-5
+        assert a.payload == b.payload
+
+
+FILTERS = [
+    None,
+    source_filter("products"),
+    Filter(must=[FieldCondition(key="price", range=Range(gte=50, lt=200))]),
+    Filter(must=[FieldCondition(key="category", match=MatchAny(any=["audio", "wearables"]))]),
+    Filter(must=[source_filter("products")],
+           must_not=[FieldCondition(key="category", match=MatchValue(value="audio"))]),
+    Filter(should=[FieldCondition(key="category", match=MatchValue(value="computers")),
+                   FieldCondition(key="price", range=Range(lte=40))]),
+    Filter(must=[FieldCondition(key="category", match=MatchValue(value="no such category"))]),
+]
+
+
+def test_filtered_search_matches_qdrant():
+    numpy_store, qdrant = stores()
+    for i, query_filter in enumerate(FILTERS):
+        for limit in (1, 5, 100):
+            assert_same(numpy_store.search(query(i), limit=limit, query_filter=query_filter),
+                        qdrant.search(query(i), limit=limit, query_filter=query_filter))
+
+
+def test_batch_search_matches_qdrant():
+    numpy_store, qdrant = stores()
+    queries = [
+        BatchQuery(query(i), limit=3 + i, query_filter=query_filter,
+                   with_payload=(True, False, ["name", "price"])[i % 3])
+        for i, query_filter in enumerate(FILTERS)
+    ]
+    numpy_results, qdrant_results = numpy_store.search_batch(queries), qdrant.search_batch(queries)
+    assert len(numpy_results) == len(qdrant_results) == len(queries)
+    for numpy_points, qdrant_points in zip(numpy_results, qdrant_results):
+        assert_same(numpy_points, qdrant_points)
+
+
+def test_payload_projection_matches_qdrant():
+    numpy_store, qdrant = stores()
+    ids = list(qdrant.content_hashes("products"))[:5] + ["00000000-0000-0000-0000-000000000000"]
+    for with_payload in (True, False, ["name"], ["name", "missing"], []):
+        assert_same(numpy_store.search(query(1), limit=4, with_payload=with_payload),
+                    qdrant.search(query(1), limit=4, with_payload=with_payload))
+        by_id = lambda found: sorted(((str(p.id), p.payload) for p in found), key=lambda x: x[0])
+        assert by_id(numpy_store.retrieve(ids, with_payload=with_payload)) == \
+            by_id(qdrant.retrieve(ids, with_payload=with_payload))
+
+
+def test_content_hashes_match_qdrant():
+    numpy_store, qdrant = stores()
+    for source in ("products", "faqs", "policies"):
+        assert numpy_store.content_hashes(source) == qdrant.content_hashes(source)
+
+
+def lifecycle(store):
+    """Blue/green rebuild: copy half the points into a new version, publish, drop the old one"""
+    live = store.active_collection()
+    ids = sorted(store.content_hashes("products"))
+    staging = store.create_collection_version()
+    assert store.active_collection() == live  # not served before publish
+    copied = store.copy_points(ids[:10], live, staging)
+    previous = store.publish(staging)
+    store.drop_collection(previous)
+    return {
+        "copied": copied,
+        "previous_was_live": previous == live,
+        "served_new": store.active_collection() == staging,
+        "count": store.count(exact=True),
+        "hashes": store.content_hashes("products"),
+        "top": [str(p.id) for p in store.search(query(3), limit=5)],
+    }
+
+
+def test_publish_and_drop_lifecycle_matches_qdrant():
+    numpy_store, qdrant = stores()
+    numpy_run, qdrant_run = lifecycle(numpy_store), lifecycle(qdrant)
+    assert numpy_run == qdrant_run
+    assert numpy_run["copied"] == numpy_run["count"] == 10
+    assert numpy_run["previous_was_live"] and numpy_run["served_new"]
+
+
+def test_publish_and_drop_lifecycle_with_path_matches_qdrant():
+    with tempfile.TemporaryDirectory() as path:
+        numpy_store, qdrant = stores(path)
+        old = numpy_store.active_collection()
+        numpy_run, qdrant_run = lifecycle(numpy_store), lifecycle(qdrant)
+        assert numpy_run == qdrant_run
+
+        # The published version survives a restart; the dropped one is gone from disk
+        assert not os.path.exists(os.path.join(path, old))
+        reopened = NumpyVectorStore(QdrantConfig(url=":memory:", collection_name="parity", vector_size=DIM),
+                                    VectorStoreConfig(backend="numpy", path=path))
+        assert reopened.active_collection() == numpy_store.active_collection()
+        assert reopened.content_hashes("products") == qdrant_run["hashes"]
+        assert [str(p.id) for p in reopened.search(query(3), limit=5)] == qdrant_run["top"]
+
+
+def test_other_process_sees_published_versions_without_restarting():
+    with tempfile.TemporaryDirectory() as path:
+        config = QdrantConfig(url=":memory:", collection_name="parity", vector_size=DIM)
+        writer = NumpyVectorStore(config, VectorStoreConfig(backend="numpy", path=path))
+        vectors, payloads, keys = points()
+        writer.add(vectors, payloads, keys=keys)
+        writer.flush()
+        reader = NumpyVectorStore(config, VectorStoreConfig(backend="numpy", path=path))
+        old = reader.active_collection()
+        assert reader.count() == len(keys)
+
+        staging = writer.create_collection_version()
+        writer.add(vectors[:5], payloads[:5], keys=keys[:5], collection_name=staging)
+        writer.drop_collection(writer.publish(staging))
+
+        assert reader.active_collection() == staging
+        assert reader.count() == 5
+        assert old not in reader._collections
+        assert [str(p.id) for p in reader.search(query(3), limit=5)] == \
+            [str(p.id) for p in writer.search(query(3), limit=5)]
+
+        # The reader's next publish replaces the writer's version, not the one it last saw
+        rebuilt = reader.create_collection_version()
+        assert reader.publish(rebuilt) == staging
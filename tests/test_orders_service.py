@@ -0,0 +1,31 @@
+from app.service.orders_service import OrderService, parse_items
+
+
+def test_items_without_quantity_default_to_one():
+    assert parse_items("SoundPro Wireless Headphones, BudMax Sport Earbuds x2") == [
+        {"name": "SoundPro Wireless Headphones", "quantity": 1},
+        {"name": "BudMax Sport Earbuds", "quantity": 2},
+    ]
+
+
+def test_quantity_suffix_still_separates_items():
+    assert parse_items("BudMax Sport Earbuds x2 PowerBank Pro 20000mAh x1") == [
+        {"name": "BudMax Sport Earbuds", "quantity": 2},
+        {"name": "PowerBank Pro 20000mAh", "quantity": 1},
+    ]
+
+
+def test_trailing_item_without_quantity():
+    assert parse_items("BudMax Sport Earbuds x2 USB-C Cable") == [
+        {"name": "BudMax Sport Earbuds", "quantity": 2},
+        {"name": "USB-C Cable", "quantity": 1},
+    ]
+
+
+def test_single_item():
+    assert parse_items("SmartFit Fitness Tracker") == [{"name": "SmartFit Fitness Tracker", "quantity": 1}]
+
+
+def test_orders_csv_items():
+    order = OrderService("./data/orders.csv").track_order("ORD12346")
+    assert [item["quantity"] for item in order["items"]] == [2, 1]
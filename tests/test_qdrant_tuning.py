@@ -0,0 +1,67 @@
+from qdrant_client.models import Disabled
+
+from app.config.qdrant_config import QdrantConfig
+from app.service.qdrant_service import QdrantService
+
+# Local mode ignores update_collection, so tuning goes to a client that
+# applies diffs the way the server does: a None field keeps the current value
+SECTIONS = ("hnsw_config", "optimizers_config")
+
+
+class DiffClient:
+    def __init__(self):
+        self.collections = {}
+
+    def _apply(self, config, params):
+        for section in SECTIONS:
+            if params.get(section) is not None:
+                for key, value in params[section].model_dump().items():
+                    if value is not None:
+                        config[section][key] = value
+        quantization = params.get("quantization_config")
+        if quantization == Disabled.DISABLED:
+            config["quantization_config"] = None
+        elif quantization is not None:
+            config["quantization_config"] = quantization
+
+    def create_collection(self, collection_name, vectors_config, on_disk_payload, **params):
+        config = {section: {} for section in SECTIONS}
+        config.update(quantization_config=None, vectors_on_disk=vectors_config.on_disk,
+                      on_disk_payload=on_disk_payload)
+        self._apply(config, params)
+        self.collections[collection_name] = config
+
+    def update_collection(self, collection_name, vectors_config, collection_params, **params):
+        config = self.collections[collection_name]
+        config["vectors_on_disk"] = vectors_config[""].on_disk
+        config["on_disk_payload"] = collection_params.on_disk_payload
+        self._apply(config, params)
+
+    def get_aliases(self):
+        class Aliases:
+            aliases = []
+        return Aliases()
+
+
+def service(profile: str, client: DiffClient) -> QdrantService:
+    qdrant = QdrantService(QdrantConfig(url=":memory:", collection_name="tuning",
+                                        vector_size=8, profile=profile))
+    qdrant.client = client
+    return qdrant
+
+
+def test_migrating_low_memory_to_default_resets_everything():
+    client = DiffClient()
+    name = service("low_memory", client).create_collection_version()
+    low_memory = client.collections[name]
+    assert low_memory["optimizers_config"]["memmap_threshold"] == 20000
+    assert low_memory["quantization_config"] is not None
+
+    service("default", client).apply_tuning(name)
+
+    config = client.collections[name]
+    assert config["hnsw_config"] == {"m": 16, "ef_construct": 100}
+    assert config["optimizers_config"] == {"indexing_threshold": 20000, "memmap_threshold": 0}
+    assert config["quantization_config"] is None
+    assert not config["vectors_on_disk"]
+    assert not config["on_disk_payload"]
@@ -0,0 +1,80 @@
+from app.service.intent_service import extract_intent
+from app.service.response_templates import fast_path_reply, is_stock_question
+from app.service.retrieval_service import PolicyHit, ProductHit, RetrievalContext
+
+HEADPHONES = ProductHit(id="1", name="SoundPro Wireless Headphones", price=89.99, category="audio",
+                        description="Premium wireless headphones", stock=50)
+TRACKER = ProductHit(id="2", name="SmartFit Fitness Tracker", price=49.99, category="wearables",
+                     description="Heart-rate fitness tracker", stock=0)
+
+
+def reply(text: str):
+    return fast_path_reply(text, RetrievalContext(intent=extract_intent(text), products=[HEADPHONES, TRACKER]))
+
+
+def test_stock_phrasings_get_the_stock_template():
+    for text in (
+        "Is the SoundPro Wireless Headphones in stock?",
+        "Do you have any SoundPro Wireless Headphones?",
+        "How many SoundPro Wireless Headphones are left?",
+        "Are the SoundPro Wireless Headphones available?",
+    ):
+        result = reply(text)
+        assert result is not None and result.intent == "stock", text
+        assert "50" in result.text
+
+
+def test_out_of_stock_product():
+    result = reply("Is the SmartFit Fitness Tracker sold out?")
+    assert result.intent == "stock"
+    assert "out of stock" in result.text
+
+
+def test_available_in_another_sense_goes_to_the_llm():
+    text = "What colors are available for the SoundPro Wireless Headphones?"
+    assert not is_stock_question(text, extract_intent(text))
+    assert reply(text) is None
+
+
+def test_extra_content_words_go_to_the_llm():
+    for text in (
+        "Is the SoundPro Wireless Headphones in stock in black?",
+        "Do you have any SoundPro Wireless Headphones with a longer warranty?",
+        "How many SoundPro Wireless Headphones are left and do they come with a case?",
+    ):
+        assert reply(text) is None, text
+
+
+def test_bare_stock_words_are_not_a_stock_question():
+    for text in ("What is your stock policy?", "Check availability of the SoundPro Wireless Headphones"):
+        assert not is_stock_question(text, extract_intent(text)), text
+
+
+RETURNS = PolicyHit(question="What is your return policy?", category="returns", score=0.9,
+                    answer="We accept returns within 30 days. Items must be unused.")
+SHIPPING = PolicyHit(question="What are your shipping options?", category="shipping", score=0.5,
+                     answer="Standard shipping takes 5-7 days.")
+
+
+def faq(text: str):
+    ctx = RetrievalContext(intent=extract_intent(text), products=[HEADPHONES, TRACKER],
+                           policies=[RETURNS, SHIPPING])
+    return fast_path_reply(text, ctx)
+
+
+def test_policy_question_gets_the_stored_answer():
+    result = faq("What is your return policy?")
+    assert result.intent == "faq"
+    assert result.text.startswith("We accept returns within 30 days.")
+
+
+def test_product_question_never_gets_a_policy_answer():
+    for text in (
+        "Tell me about noise cancelling headphones",
+        "Which fitness tracker is best for running?",
+    ):
+        assert faq(text) is None, text
+
+
+def test_policy_question_about_a_named_product_goes_to_the_llm():
+    assert faq("Can I return the SoundPro Wireless Headphones if they don't fit?") is None
@@ -0,0 +1,81 @@
+import os
+import sqlite3
+import tempfile
+import time
+
+import pytest
+
+from app.service.session_store import SessionStore, SQLiteSessionStore
+
+
+def message(content: str):
+    return {"role": "user", "content": content}
+
+
+def sqlite_store(ttl_seconds: int) -> SQLiteSessionStore:
+    return SQLiteSessionStore(os.path.join(tempfile.mkdtemp(), "sessions.db"), ttl_seconds)
+
+
+def test_expired_session_does_not_come_back_on_the_next_write():
+    store = sqlite_store(ttl_seconds=1)
+    store.append_messages("s", [message("old secret")], max_messages=10)
+    assert store.fold_messages("s", [], "old summary")
+    time.sleep(1.2)
+    assert store.get_history("s") == ("", [])
+
+    store.append_messages("s", [message("new")], max_messages=10)
+
+    assert store.get_messages("s") == [message("new")]
+    assert store.get_summary("s") == ""
+
+
+def test_fold_of_an_expired_session_is_rejected():
+    store = sqlite_store(ttl_seconds=1)
+    store.append_messages("s", [message("old")], max_messages=10)
+    time.sleep(1.2)
+
+    assert not store.fold_messages("s", [message("old")], "summary")
+    assert store.get_history("s") == ("", [])
+
+
+def test_writes_delete_expired_sessions():
+    store = sqlite_store(ttl_seconds=1)
+    store.append_messages("idle", [message("hi")], max_messages=10)
+    store.fold_messages("idle", [], "summary")
+    time.sleep(1.2)
+
+    store.append_messages("active", [message("hi")], max_messages=10)
+
+    conn = sqlite3.connect(store.path)
+    assert conn.execute("SELECT session_id FROM sessions").fetchall() == [("active",)]
+    assert conn.execute("SELECT session_id FROM session_summaries").fetchall() == []
+
+
+def test_writes_keep_the_summary_alive():
+    store = sqlite_store(ttl_seconds=1)
+    store.append_messages("s", [message("a")], max_messages=10)
+    store.fold_messages("s", [], "summary")
+    for content in ("b", "c", "d"):
+        time.sleep(0.4)
+        store.append_messages("s", [message(content)], max_messages=10)
+
+    assert store.get_summary("s") == "summary"
+    assert len(store.get_messages("s")) == 4
+
+
+def test_incomplete_backend_fails_at_construction():
+    class NoFold(SessionStore):
+        def get_messages(self, session_id):
+            return []
+
+        def get_summary(self, session_id):
+            return ""
+
+        def append_messages(self, session_id, messages, max_messages):
+            pass
+
+        def clear(self, session_id):
+            pass
+
+    with pytest.raises(TypeError, match="fold_messages"):
+        NoFold()
@@ -0,0 +1,32 @@
+import pytest
+
+from app.core.telemetry import MetricsRegistry, _Metric
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    counter = registry.counter("test_total", "Help with a \\ backslash\nand a newline", ("tool",))
+    counter.inc(tool='say "hi"\\now\nplease')
+
+    lines = registry.render_prometheus().splitlines()
+    assert lines == [
+        "# HELP test_total Help with a \\\\ backslash\\nand a newline",
+        "# TYPE test_total counter",
+        'test_total{tool="say \\"hi\\"\\\\now\\nplease"} 1.0',
+    ]
+
+
+def test_histogram_bucket_labels_keep_le_unescaped():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("test_seconds", "Latency", ("stage",), buckets=(0.1,))
+    histogram.observe(0.05, stage='a"b')
+
+    assert 'test_seconds_bucket{stage="a\\"b",le="0.1"} 1' in registry.render_prometheus()
+
+
+def test_metric_without_render_fails_at_construction():
+    class Incomplete(_Metric):
+        type_name = "gauge"
+
+    with pytest.raises(TypeError, match="render"):
+        Incomplete("test", "help")